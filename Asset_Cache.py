@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from io import BytesIO
+
+ASSET_CACHE_DIR = "asset_cache"  # Folder holding the cached assets, one subfolder per URL
+REVALIDATE_INTERVAL = 3600  # Seconds a cached asset is used before it is checked with the server again
+
+logger = logging.getLogger(__name__)
+
+class AssetCache:
+    """Disk cache of remote images and their resized variants, keyed by URL.
+
+    `variants` maps a variant name to its size: a (width, height) tuple, or a scale that
+    keeps the aspect ratio. Variants are stored as PNG next to the downloaded original, so a
+    cached asset is served without any network I/O or resizing. Once an asset is older than
+    the revalidation interval it is still served, and a conditional request (ETag or
+    Last-Modified) checks it with the server in the background.
+    """
+
+    def __init__(self, client, variants, cache_dir=ASSET_CACHE_DIR, revalidate_interval=REVALIDATE_INTERVAL):
+        self.client = client
+        self.variants = variants
+        self.cache_dir = cache_dir
+        self.revalidate_interval = revalidate_interval
+        self.lock = threading.Lock()
+        self.revalidating = set()  # URLs being checked in the background
+
+    def asset_dir(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32])
+
+    def variant_path(self, url, variant):
+        size = self.variants[variant]
+        suffix = f"{size[0]}x{size[1]}" if isinstance(size, tuple) else f"{size:g}x"
+        return os.path.join(self.asset_dir(url), f"{variant}-{suffix}.png")
+
+    def read_meta(self, url):
+        try:
+            with open(os.path.join(self.asset_dir(url), "meta.json"), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def write_file(self, path, data):
+        """Writes a file atomically, so readers see the old or the new content, never a partial one."""
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def get(self, url, variant):
+        """Returns the PNG bytes of a variant, downloading the asset only when it isn't cached.
+
+        Raises the client's exceptions if the asset has to be downloaded and can't be.
+        """
+        meta = self.read_meta(url)
+        if meta is not None:
+            try:
+                with open(self.variant_path(url, variant), "rb") as file:
+                    data = file.read()
+            except OSError:
+                data = self.build_variant(url, variant)  # Variant size changed, or the file was removed
+            if data is not None:
+                if time.time() - meta.get("checked", 0) >= self.revalidate_interval:
+                    self.revalidate_in_background(url)
+                return data
+        self.download(url)
+        with open(self.variant_path(url, variant), "rb") as file:
+            return file.read()
+
+    def download(self, url, meta=None):
+        """Fetches the asset, conditionally when `meta` holds validators. Returns True if it changed."""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        response = self.client.get(url, headers=headers)
+        if meta and response.status_code == 304:
+            self.store_meta(url, dict(meta, checked=time.time()))
+            return False
+        response.raise_for_status()
+        self.store(url, response.content, {
+            "url": url,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "checked": time.time()
+        })
+        return True
+
+    def store(self, url, content, meta):
+        """Saves the original and all its variants, then the metadata that marks them complete."""
+        from PIL import Image  # Loaded on first use, only needed when an asset changes
+
+        image = Image.open(BytesIO(content))
+        image.load()
+        with self.lock:
+            os.makedirs(self.asset_dir(url), exist_ok=True)
+            self.write_file(os.path.join(self.asset_dir(url), "original"), content)
+            for variant in self.variants:
+                self.write_file(self.variant_path(url, variant), self.resize(image, self.variants[variant]))
+            self.write_file(os.path.join(self.asset_dir(url), "meta.json"), json.dumps(meta).encode("utf-8"))
+        logger.info(f"Cached {url} with variants {', '.join(self.variants)}")
+
+    def store_meta(self, url, meta):
+        with self.lock:
+            self.write_file(os.path.join(self.asset_dir(url), "meta.json"), json.dumps(meta).encode("utf-8"))
+
+    def build_variant(self, url, variant):
+        """Resizes a missing variant from the cached original. Returns None if there is no original."""
+        from PIL import Image
+
+        try:
+            image = Image.open(os.path.join(self.asset_dir(url), "original"))
+            image.load()
+        except OSError:
+            return None
+        data = self.resize(image, self.variants[variant])
+        with self.lock:
+            self.write_file(self.variant_path(url, variant), data)
+        return data
+
+    def resize(self, image, size):
+        from PIL import Image
+
+        if not isinstance(size, tuple):
+            size = (max(1, int(image.width * size)), max(1, int(image.height * size)))
+        output = BytesIO()
+        image.resize(size, Image.Resampling.LANCZOS).save(output, format="PNG")
+        return output.getvalue()
+
+    def revalidate(self, url):
+        """Checks a cached asset with the server, replacing it if it changed. Returns True if it did."""
+        try:
+            changed = self.download(url, self.read_meta(url))
+        except Exception as e:
+            logger.warning(f"Could not revalidate {url}, keeping the cached copy: {e}")
+            return False
+        logger.info(f"Revalidated {url}: {'updated' if changed else 'not modified'}")
+        return changed
+
+    def revalidate_in_background(self, url):
+        with self.lock:
+            if url in self.revalidating:
+                return
+            self.revalidating.add(url)
+
+        def run():
+            try:
+                self.revalidate(url)
+            finally:
+                with self.lock:
+                    self.revalidating.discard(url)
+
+        threading.Thread(target=run, name="asset-revalidate", daemon=True).start()
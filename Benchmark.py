@@ -0,0 +1,218 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+MOCK_URL = "http://127.0.0.1"
+PORT = 8099
+READY_TIMEOUT = 120  # Seconds the mock gets to generate its data and answer
+SCALES = [1000, 10000, 100000]  # Usage records, a tenth as many customers and rate tables
+REPEAT = 3
+USAGE_DAYS = 60
+REGRESSION_THRESHOLD = 0.10  # Slowdown of the median reported as a regression by -compare
+OUTPUT_FILE = os.path.join("benchmarks", "benchmark.json")  # Kept out of the repository by .gitignore
+
+def start_mock(args, scale):
+    """Starts Mock_DM_API.py sized for the scale and returns its process once it answers."""
+    process = subprocess.Popen(
+        [sys.executable, "Mock_DM_API.py", "-port", str(args.port),
+         "-usage-records", str(scale), "-usage-days", str(USAGE_DAYS), "-usage-page-size", str(args.usage_page_size),
+         "-instances", str(max(1, scale // 10)), "-series", str(max(1, scale // 40)), "-versions", "4",
+         "-latency-ms", str(args.latency_ms), "-error-rate", str(args.error_rate), "-log-level", "WARNING"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"{MOCK_URL}:{args.port}"
+    deadline = time.time() + READY_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The mock API exited during startup, check mock_dm_api_{args.port}.log")
+        try:
+            if requests.get(base_url + "/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"The mock API did not answer within {READY_TIMEOUT} seconds")
+
+def stop_mock(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def timed(function, repeat, setup=None):
+    """Calls function `repeat` times, after `setup` each time, and returns its last result and the run times in seconds."""
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    return result, seconds
+
+def summarize(benchmark, scale, seconds, **details):
+    """Builds the result entry of one benchmark at one scale."""
+    entry = {
+        "benchmark": benchmark,
+        "scale": scale,
+        "runs_ms": [round(run * 1000, 3) for run in seconds],
+        "median_ms": round(statistics.median(seconds) * 1000, 3),
+        "min_ms": round(min(seconds) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3)
+    }
+    entry.update(details)
+    print(f"{benchmark:<28} scale {scale:>8}  median {entry['median_ms']:>10.1f} ms  {details}")
+    return entry
+
+def run_reporting_benchmarks(reporting, mock_url, scale, repeat, store_dir):
+    """Times the usage download, the dashboard transform and its serializations, and the /data endpoint."""
+    reporting.config = {
+        "site": "benchmark",
+        "geo": "com",
+        "basic_Auth": "YmVuY2htYXJrOmJlbmNobWFyaw==",
+        "api_host": mock_url,
+        "store_file": os.path.join(store_dir, f"usage_store_{scale}.db"),
+        "store_sync_interval_seconds": 3600,
+        "prewarm_interval_seconds": 0
+    }
+    reporting.usage_client = None
+    results = []
+
+    records, seconds = timed(lambda: reporting.fetch_data(USAGE_DAYS, "uat"), repeat)
+    results.append(summarize("fetch_data", scale, seconds, records=len(records)))
+
+    frame, seconds = timed(lambda: reporting.ingest_usage_records(records), repeat)
+    results.append(summarize("ingest_usage_records", scale, seconds, rows=len(frame)))
+
+    body, seconds = timed(lambda: reporting.dumps_json({"data": reporting.frame_to_records(frame)}), repeat)
+    results.append(summarize("serialize_records", scale, seconds, bytes=len(body)))
+
+    body, seconds = timed(lambda: reporting.dumps_json(reporting.frame_to_columns(frame)), repeat)
+    results.append(summarize("serialize_columnar", scale, seconds, bytes=len(body)))
+
+    # The /data endpoint end to end: downloaded into an empty store and cache, then answered from the cache
+    client = reporting.app.test_client()
+    request_body = {"number_days": USAGE_DAYS, "environment": "uat"}
+
+    def empty_store():
+        reporting.usage_cache.clear()
+        if os.path.exists(reporting.config["store_file"]):
+            os.remove(reporting.config["store_file"])
+
+    response, seconds = timed(lambda: client.post("/data", json=request_body), repeat, setup=empty_store)
+    results.append(summarize("get_data_cold", scale, seconds, status=response.status_code, bytes=len(response.data)))
+    response, seconds = timed(lambda: client.post("/data", json=request_body), repeat)
+    results.append(summarize("get_data_cached", scale, seconds, status=response.status_code, bytes=len(response.data)))
+    return results
+
+def run_tool_benchmarks(tool, mock_url, scale, repeat):
+    """Times the customer list download, line item formatting and the rate table filter."""
+    tool.config.update(site="benchmark", geo="com", jwt="benchmark", api_host=mock_url)
+    base_url = tool.api_base_url(tool.UAT_OPTION)
+    headers = tool.build_api_headers()
+    results = []
+
+    customers, seconds = timed(lambda: tool.load_customer_names(base_url + "/instances/", headers, []), repeat)
+    results.append(summarize("load_customer_names", scale, seconds, customers=len(customers)))
+
+    # Line items of one customer, then as many rows formatted and sorted as the scale, as render_line_items does
+    line_items_url = base_url + f"/instances/{customers[0]['id']}/line-items"
+    response, seconds = timed(lambda: tool.api_client.get(line_items_url, headers=headers), repeat)
+    results.append(summarize("get_customer_line_items", scale, seconds, line_items=len(response.json())))
+    items = [dict(item, activationId=f"{item['activationId']}-{number}")
+             for number, item in enumerate(itertools.islice(itertools.cycle(response.json()), scale))]
+    rows, seconds = timed(lambda: sorted(((item["activationId"], tool.line_item_row(item)) for item in items), key=lambda entry: entry[1]), repeat)
+    results.append(summarize("line_item_formatting", scale, seconds, rows=len(rows)))
+
+    tables = tool.api_client.get(base_url + "/rate-tables", headers=headers).json()
+    index, seconds = timed(lambda: tool.RateTableIndex(tables), repeat)
+    results.append(summarize("rate_table_index", scale, seconds, rate_tables=len(tables)))
+    selected, seconds = timed(lambda: tool.filter_series(index), repeat)
+    results.append(summarize("filter_series", scale, seconds, rate_tables=len(tables), selected=len(selected)))
+    return results
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def compare(previous_file, results):
+    """Prints the change of each median against a previous run and returns the number of regressions."""
+    with open(previous_file, "r") as file:
+        previous = {(entry["benchmark"], entry["scale"]): entry for entry in json.load(file)["results"]}
+    regressions = 0
+    print(f"\nCompared with {previous_file}:")
+    for entry in results:
+        before = previous.get((entry["benchmark"], entry["scale"]))
+        if before is None or not before["median_ms"]:
+            continue
+        change = entry["median_ms"] / before["median_ms"] - 1
+        flag = "REGRESSION" if change > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"{entry['benchmark']:<28} scale {entry['scale']:>8}  {before['median_ms']:>10.1f} -> {entry['median_ms']:>10.1f} ms  {change:+7.1%} {flag}")
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks the tool and the reporter against a local mock of the Dynamic Monetization APIs")
+    parser.add_argument('-config', "--config", help="Configuration in config.json the tool is loaded with, its API host is replaced by the mock", default='default')
+    parser.add_argument('-scales', "--scales", type=int, nargs="+", default=SCALES, help="Usage records per run, with a tenth as many customers and rate tables")
+    parser.add_argument('-repeat', "--repeat", type=int, default=REPEAT, help="Runs of each benchmark, the median is reported")
+    parser.add_argument('-port', "--port", type=int, default=PORT, help="Port of the mock API")
+    parser.add_argument('-latency-ms', "--latency-ms", type=float, default=0, help="Latency the mock adds to every request")
+    parser.add_argument('-error-rate', "--error-rate", type=float, default=0.0, help="Share of mock requests failing with 503, to include retries")
+    parser.add_argument('-usage-page-size', "--usage-page-size", type=int, default=1000, help="Usage records per page")
+    parser.add_argument('-output', "--output", default=OUTPUT_FILE, help="JSON file the results are written to")
+    parser.add_argument('-compare', "--compare", help="Results of a previous run to compare the medians with")
+    args = parser.parse_args()
+
+    # Both modules read their settings when imported: the tool its command line, the reporter nothing until configured
+    sys.argv = [sys.argv[0], "-config", args.config]
+    import Reporting as reporting
+    import Elastic_Access_Standalone_Tool as tool
+
+    mock_url = f"{MOCK_URL}:{args.port}"
+    results = []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for scale in args.scales:
+            process = start_mock(args, scale)
+            try:
+                results.extend(run_reporting_benchmarks(reporting, mock_url, scale, args.repeat, store_dir))
+                results.extend(run_tool_benchmarks(tool, mock_url, scale, args.repeat))
+            finally:
+                stop_mock(process)
+
+    output = {
+        "version": git_version(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "scales": args.scales,
+            "repeat": args.repeat,
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "usage_page_size": args.usage_page_size,
+            "usage_days": USAGE_DAYS
+        },
+        "results": results
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(output, file, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        sys.exit(1 if compare(args.compare, results) else 0)
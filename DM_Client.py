@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 5  # Seconds to open a connection
+READ_TIMEOUT = 30  # Seconds to wait for the server between bytes of the response
+MAX_RETRIES = 3  # Retries after the first attempt
+BACKOFF_BASE = 0.5  # Seconds, doubled on each retry before jitter is applied
+BACKOFF_MAX = 10  # Longest wait between attempts, also caps Retry-After
+POOL_SIZE = 10  # Keep-alive connections held per host
+STATS_LOG_INTERVAL = 50  # Requests between pool and retry statistics in the log
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+logger = logging.getLogger(__name__)
+
+class DMClient:
+    """Pooled HTTP client shared by all calls to the Dynamic Monetization APIs.
+
+    Connections are kept alive per host, every call has a connect and read timeout, and
+    429 and 5xx responses, timeouts and connection errors are retried with jittered
+    exponential backoff. Non-idempotent requests (POST) are only retried when the server
+    cannot have acted on them: a 429 or a connection that was never opened.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, pool_size=POOL_SIZE):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "timeouts": 0, "connection_errors": 0}
+
+    @classmethod
+    def from_config(cls, config, pool_size=None):
+        """Creates a client from the optional http_* settings in config.json."""
+        return cls(
+            connect_timeout=config.get("http_connect_timeout", CONNECT_TIMEOUT),
+            read_timeout=config.get("http_read_timeout", READ_TIMEOUT),
+            max_retries=config.get("http_max_retries", MAX_RETRIES),
+            backoff_base=config.get("http_backoff_seconds", BACKOFF_BASE),
+            pool_size=pool_size or config.get("http_pool_size", POOL_SIZE)
+        )
+
+    def count(self, stat):
+        with self.stats_lock:
+            self.stats[stat] += 1
+            return self.stats[stat]
+
+    def backoff_delay(self, attempt, response=None):
+        """Returns the wait before the next attempt: full jitter over an exponential cap, or Retry-After if longer."""
+        delay = random.uniform(0, min(BACKOFF_MAX, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+        return delay
+
+    def request(self, method, url, timeout=None, retries=None, **kwargs):
+        """Sends a request, retrying transient failures.
+
+        `timeout` is a (connect, read) tuple or a single number of seconds and overrides the
+        client default for this call, as does `retries`. The last response is returned whatever
+        its status; the last exception is raised once retries run out.
+        """
+        method = method.upper()
+        timeout = timeout or self.timeout
+        retries = self.max_retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS
+        if self.count("requests") % STATS_LOG_INTERVAL == 0:
+            self.log_stats()
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.count("timeouts" if isinstance(e, requests.Timeout) else "connection_errors")
+                # A request whose connection never opened can't have reached the server
+                if attempt > retries or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                    self.count("failures")
+                    logger.error(f"{method} {url} failed after {attempt} attempts: {str(e)}")
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed: {str(e)}, retrying in {delay:.2f} seconds (attempt {attempt}/{retries + 1})")
+            else:
+                retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+                if not retryable:
+                    return response
+                if attempt > retries:
+                    self.count("failures")
+                    logger.error(f"{method} {url} returned {response.status_code} after {attempt} attempts")
+                    return response
+                delay = self.backoff_delay(attempt, response)
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f} seconds (attempt {attempt}/{retries + 1})")
+                response.close()
+            self.count("retries")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def pool_stats(self):
+        """Returns the number of hosts pooled, connections opened and requests sent over them."""
+        pools = self.adapter.poolmanager.pools
+        hosts = connections = pool_requests = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts += 1
+            connections += pool.num_connections
+            pool_requests += pool.num_requests
+        return {"hosts": hosts, "connections_opened": connections, "pool_requests": pool_requests}
+
+    def get_stats(self):
+        """Returns a snapshot of the retry and pool statistics."""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats.update(self.pool_stats())
+        sent = stats["pool_requests"]
+        stats["connection_reuse"] = round(1 - stats["connections_opened"] / sent, 3) if sent else 0.0
+        return stats
+
+    def log_stats(self):
+        stats = self.get_stats()
+        logger.info(
+            f"HTTP client: {stats['requests']} requests, {stats['retries']} retries, {stats['failures']} failures, "
+            f"{stats['timeouts']} timeouts, {stats['connection_errors']} connection errors | "
+            f"{stats['connections_opened']} connections opened to {stats['hosts']} hosts for "
+            f"{stats['pool_requests']} requests ({stats['connection_reuse']:.0%} reused)"
+        )
@@ -1,39 +1,64 @@
+import time
+STARTUP_STARTED = time.perf_counter()  # Startup phases are timed from here, imports included
 import tkinter as tk
-from tkinter import messagebox, Toplevel, Text, Scrollbar, ttk
-from PIL import Image, ImageTk
+from tkinter import messagebox, filedialog, Toplevel, Text, Scrollbar, ttk
 # from tkcalendar import Calendar
-import time
 import requests
 import json
 import datetime
 import subprocess
+import sys
 import threading
 import webbrowser
 import argparse
 import atexit
 import logging
 import traceback
-import socket
+import functools
+import itertools
 import re
 import uuid
+import os
+import csv
+import bisect
+import queue
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import ttkbootstrap as ttkb
-from ttkbootstrap.dialogs import DatePickerDialog
 from ttkbootstrap import Button
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.image import MIMEImage
+from DM_Client import DMClient
+from Asset_Cache import AssetCache, ASSET_CACHE_DIR, REVALIDATE_INTERVAL
+from Log_Setup import setup_logging, LOG_LEVELS
 
  
 UAT_OPTION = "-uat"
 REPORTING_APP_URL = "127.0.0.1"
 PORT = 5000
 PERMANENT_EPOCH = 253402300799999
+REPORTER_SHUTDOWN_TIMEOUT = 10  # Seconds the reporter gets to finish requests in progress
+REPORTER_START_TIMEOUT = 30  # Seconds the reporter gets to answer its health check after being started
+REPORTER_PROBE_TIMEOUT = 0.5  # Seconds a health check waits for an answer
+REPORTER_POLL_INTERVAL = 0.1  # Seconds between health checks while the reporter starts
+REPORTER_TOKEN_ENV = "REPORTING_SHUTDOWN_TOKEN"  # Environment variable handing the reporter its shutdown token
+REPORTER_TOKEN_HEADER = "X-Shutdown-Token"
+API_WORKERS = 4  # Threads running API calls off the Tk event loop
+API_POLL_INTERVAL = 50  # Milliseconds between checks for finished API calls
+RATE_TABLE_CACHE_TTL = 300  # Seconds cached rate tables are used before they are fetched again
+CUSTOMER_PAGE_SIZE = 500  # Instances per page of the customer list
+CUSTOMER_PAGE_WORKERS = 4  # Customer list pages fetched at the same time
+CUSTOMER_DIRECTORY_TTL = 300  # Seconds a customer list is shown before it is reloaded in the background
+LINE_ITEM_CACHE_TTL = 120  # Seconds cached line items are shown before they are fetched again
+BULK_IMPORT_WORKERS = 4  # Import rows provisioned at the same time
+BATCH_PUBLISH_WORKERS = 4  # Rate tables posted at the same time
+BULK_PROGRESS_INTERVAL = 200  # Milliseconds between progress view updates
+EMAIL_CLOSE_TIMEOUT = 30  # Seconds queued emails get to be sent when the application closes
+EMAIL_POLL_INTERVAL = 200  # Milliseconds between checks for sent emails
 ICON = "Revethon2025.ico"
 FONT = ("Arial", 10, "normal")
 CONFIG_FILE = "config.json"
 LOG_FILE = "rate_table_editor.log"
+LOGO_VARIANTS = {"tab": (250, 56), "email": 0.25}  # Logo sizes on the tabs and in emails, a scale keeps the aspect ratio
 EXAMPLE_RATE_TABLE = [{
     "effectiveFrom": "",
     "series": "NewSeries",
@@ -51,31 +76,57 @@ series_window = None  # Global variable to track the rate table window
 # Create command line argument options
 parser = argparse.ArgumentParser()
 parser.add_argument('-config', "--config", help="Specify the configuration to override default config.json file", default="default")
+parser.add_argument('-log-level', "--log-level", choices=LOG_LEVELS, default="INFO", help="Lowest level written to the log, DEBUG includes helper calls")
+parser.add_argument('-startup-report', "--startup-report", action="store_true", help="Print how long each startup phase took once the window is drawn, then exit")
 # Get what was passed if anything
 args = parser.parse_args()
 config_parameter = args.config
 reporter_process = None
+reporter_lock = threading.Lock()  # Held while the reporter is started, so two requests don't start two
+reporter_token = secrets.token_urlsafe(32)  # Lets this process, and only it, stop the reporter it started
 
-# Add logging
-# Configure logging
-logging.basicConfig(
-    filename=LOG_FILE, 
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+def log_function_call(func=None, *, level=logging.DEBUG, sample_every=1):
+    """Decorator to log function calls and their results.
 
-def log_function_call(func):
-    """Decorator to log function calls and their results."""
+    Calls are logged at `level`, and only every `sample_every`-th of them. Nothing is formatted unless
+    the level is enabled, so hot helpers cost one check. Errors are always logged.
+    """
+    if func is None:
+        return lambda func: log_function_call(func, level=level, sample_every=sample_every)
+    calls = itertools.count(1)
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             result = func(*args, **kwargs)
-            logging.info(f"Called: {func.__name__} | Args: {args}, Kwargs: {kwargs} | Result: {result}")
-            return result
         except Exception as e:
             logging.error(f"Error in {func.__name__} at line {traceback.extract_tb(e.__traceback__)[-1][1]}: {e}")
-            raise e
+            raise
+        if logging.root.isEnabledFor(level) and next(calls) % sample_every == 0:
+            logging.log(level, "Called: %s | Args: %r, Kwargs: %r | Result: %r", func.__name__, args, kwargs, result)
+        return result
     return wrapper
 
+############################################################################################################
+# Startup Timing
+############################################################################################################
+startup_phases = []  # (phase, seconds) in the order the phases finished
+startup_mark = STARTUP_STARTED
+
+def startup_phase(phase):
+    """Records how long a startup phase took since the previous one finished."""
+    global startup_mark
+    now = time.perf_counter()
+    startup_phases.append((phase, now - startup_mark))
+    startup_mark = now
+
+def startup_report():
+    """Returns the startup phases and their total as one line."""
+    phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in startup_phases)
+    return f"Startup: {phases} | total {(startup_mark - STARTUP_STARTED) * 1000:.0f} ms"
+
+startup_phase("imports")
+
 def read_config():
     """Reads configuration from a file and returns it as a dictionary."""
     try:
@@ -94,21 +145,73 @@ def read_config():
         logging.error(f"Error reading config: {e}")
         return {}
 
-def initialize_reporter():
-    global reporter_process
+def reporter_port():
+    return config["port"] if "port" in config else PORT
+
+def reporter_health(port):
+    """Returns the /health answer of the reporter on the port, or None when nothing answers there."""
     try:
-        reporter_process = subprocess.Popen(["python", "Reporting.py", "-config", config_parameter], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        response = requests.get(f"http://{REPORTING_APP_URL}:{port}/health", timeout=REPORTER_PROBE_TIMEOUT)
+        if response.status_code == 200 and response.json().get("service") == "reporting":
+            return response.json()
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+def ensure_reporter():
+    """Starts the reporter unless one is already running on the configured port, and waits until it is ready.
+
+    Returns the dashboard URL. Safe to run off the Tk thread.
+    """
+    with reporter_lock:
+        return start_reporter_if_needed()
+
+def start_reporter_if_needed():
+    global reporter_process
+    port = reporter_port()
+    health = reporter_health(port)
+    if health is not None:
+        if health.get("config") != config_parameter:
+            raise RuntimeError(f"Port {port} is used by a reporter for the {health.get('config')} configuration")
+        logging.info(f"Reusing reporter on port {port}, PID {health.get('pid')}")
+        return f"http://{REPORTING_APP_URL}:{port}"
+
+    started = time.perf_counter()
+    if reporter_process is None or reporter_process.poll() is not None:
+        reporter_process = subprocess.Popen(
+            [sys.executable, "Reporting.py", "-config", config_parameter],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=dict(os.environ, **{REPORTER_TOKEN_ENV: reporter_token})
+        )
         logging.info(f"Started Reporting Process on PID: {reporter_process.pid}")
-    except Exception as e:
-        logging.error(f"Error starting reporting: {e}")
-        messagebox.ERROR("Error","Error opening reporting, please check the log file")
+    # Ready as soon as the health check answers, however long the server takes to start
+    deadline = started + config.get("reporter_start_timeout_seconds", REPORTER_START_TIMEOUT)
+    while time.perf_counter() < deadline:
+        if reporter_process.poll() is not None:
+            raise RuntimeError(f"The reporter exited during startup (code {reporter_process.returncode}), check reporting.log")
+        if reporter_health(port) is not None:
+            logging.info(f"Reporter ready on port {port} after {time.perf_counter() - started:.2f} seconds")
+            return f"http://{REPORTING_APP_URL}:{port}"
+        time.sleep(REPORTER_POLL_INTERVAL)
+    raise RuntimeError(f"The reporter did not answer on port {port} within {config.get('reporter_start_timeout_seconds', REPORTER_START_TIMEOUT)} seconds")
 
 def build_base_url():
-    base_url = f"https://{config['site']}"
-    if env_var.get() == UAT_OPTION:
-        base_url += "-uat"
-    base_url += f".flexnetoperations.{config['geo']}/dynamicmonetization/provisioning/api/v1.0"
-    return base_url
+    return api_base_url(env_var.get())
+
+def api_base_url(env_option):
+    """Returns the provisioning API URL of an environment. Safe to call off the Tk thread.
+
+    `api_host` in config.json replaces the tenant host, e.g. to run against Mock_DM_API.py.
+    """
+    if config.get("api_host"):
+        base_url = config["api_host"].rstrip("/")
+    else:
+        base_url = f"https://{config['site']}"
+        if env_option == UAT_OPTION:
+            base_url += "-uat"
+        base_url += f".flexnetoperations.{config['geo']}"
+    return base_url + "/dynamicmonetization/provisioning/api/v1.0"
     
 def build_api_headers():
     headers = {
@@ -117,6 +220,229 @@ def build_api_headers():
     }
     return headers
 
+############################################################################################################
+# Background API Calls
+############################################################################################################
+api_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="api")
+api_results = queue.Queue()  # (channel, generation, callback, error_callback, result, error) waiting for the Tk thread
+api_requests = {}  # channel -> (generation, future) of the latest request, until its result is delivered
+api_generations = itertools.count(1)  # Never reused, so a superseded result can't match a later request
+api_busy = {}  # channel -> busy text shown while the request runs
+
+def run_in_background(channel, work, on_done, busy_text="Loading...", on_error=None):
+    """Runs `work()` on the API executor and hands its result to `on_done` on the Tk thread.
+
+    `work` must not touch any widget, so URLs, headers and widget values are read before the
+    call. A new request on the same channel supersedes the previous one: it is cancelled if it
+    hasn't started yet and its result is dropped otherwise. Errors go to `on_error`, or to an
+    error message box when none is given.
+    """
+    previous = api_requests.get(channel)
+    generation = next(api_generations)
+    if previous:
+        previous[1].cancel()
+
+    def deliver(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        api_results.put((channel, generation, on_done, on_error, None if error else future.result(), error))
+
+    future = api_executor.submit(work)
+    api_requests[channel] = (generation, future)
+    future.add_done_callback(deliver)
+    set_busy(channel, busy_text)
+    return future
+
+def cancel_background(channel):
+    """Drops the pending request of a channel so its result is never delivered."""
+    previous = api_requests.pop(channel, None)
+    if previous:
+        previous[1].cancel()
+    set_busy(channel, None)
+
+def set_busy(channel, busy_text):
+    """Shows the busy text of the latest running request in the status line, with a busy cursor."""
+    if busy_text:
+        api_busy[channel] = busy_text
+    else:
+        api_busy.pop(channel, None)
+    if api_busy:
+        result_label.config(text=f"⏳ {list(api_busy.values())[-1]}")
+        root.config(cursor="watch")
+    else:
+        if result_label.cget("text").startswith("⏳"):
+            result_label.config(text="")
+        root.config(cursor="")
+
+def process_api_results():
+    """Delivers finished background requests on the Tk thread, skipping superseded ones."""
+    while True:
+        try:
+            channel, generation, on_done, on_error, result, error = api_results.get_nowait()
+        except queue.Empty:
+            break
+        if api_requests.get(channel, (None,))[0] != generation:
+            continue  # A newer request on this channel is on its way, or the channel was cancelled
+        del api_requests[channel]
+        set_busy(channel, None)
+        try:
+            if error is None:
+                on_done(result)
+            elif on_error:
+                on_error(error)
+            else:
+                logging.error(f"Background request {channel} failed: {error}")
+                messagebox.showerror("Error", f"Request failed: {str(error)}")
+        except Exception as e:
+            logging.error(f"Error handling result of {channel}: {e}")
+    root.after(API_POLL_INTERVAL, process_api_results)
+
+############################################################################################################
+# Rate Table Cache
+############################################################################################################
+rate_table_cache = {}  # (site, environment) -> (fetched, RateTableIndex of the rate tables returned by the API)
+rate_table_cache_lock = threading.Lock()
+
+def rate_table_cache_key():
+    """Returns the cache key of the selected site and environment. Call on the Tk thread."""
+    return (config['site'], env_var.get())
+
+def get_rate_table_index(key, url, headers):
+    """Returns the indexed rate tables of a site and environment, fetching them when missing or stale.
+
+    The index is built once per fetch and shared, callers copy a table before changing it. Safe to run off the Tk thread.
+    """
+    with rate_table_cache_lock:
+        entry = rate_table_cache.get(key)
+    if entry and time.time() - entry[0] < config.get("rate_table_cache_ttl_seconds", RATE_TABLE_CACHE_TTL):
+        return entry[1]
+
+    response = api_client.get(url, headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to retrieve rate tables: {response.status_code}")
+    try:
+        rate_tables = response.json()
+    except json.JSONDecodeError:
+        raise RuntimeError("Failed to parse rate tables data.")
+    index = RateTableIndex(rate_tables)
+    with rate_table_cache_lock:
+        rate_table_cache[key] = (time.time(), index)
+    logging.info(f"Cached {len(rate_tables)} rate tables in {len(index.series)} series for {key}")
+    return index
+
+def invalidate_rate_tables(key):
+    """Forgets the cached rate tables of a site and environment so the next use fetches them again."""
+    with rate_table_cache_lock:
+        rate_table_cache.pop(key, None)
+
+############################################################################################################
+# Rate Table Model
+############################################################################################################
+class RateTableItem:
+    """One item of a rate table. Slotted, as tables can hold thousands of items."""
+    __slots__ = ("name", "version", "rate")
+
+    def __init__(self, name, version, rate):
+        self.name = str(name)
+        self.version = str(version)
+        self.rate = float(rate)
+
+    def to_payload(self):
+        return {"name": self.name, "version": self.version, "rate": self.rate}
+
+class RateTable:
+    """A rate table as edited and posted by the tool. `effective_from` is in epoch milliseconds, as the API expects."""
+    __slots__ = ("series", "version", "effective_from", "items")
+
+    def __init__(self, series, version, effective_from, items):
+        self.series = series
+        self.version = version
+        self.effective_from = effective_from
+        self.items = items
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a rate table from API or file data.
+
+        `effectiveFrom` may be epoch milliseconds or a date string as shown in the tool; an empty one starts today.
+        """
+        effective_from = data.get("effectiveFrom", "")
+        if isinstance(effective_from, str):
+            effective_from = convert_date_to_epoch(effective_from.split()[0] if effective_from.strip() else get_default_date())
+        return cls(
+            str(data.get("series", "")),
+            str(data.get("version", "")),
+            int(effective_from),
+            [RateTableItem(item["name"], item["version"], item["rate"]) for item in data.get("items", [])]
+        )
+
+    def start_date(self):
+        return convert_epoch_to_date(self.effective_from).split()[0]
+
+    def next_version(self):
+        return str(int(self.version) + 1) if self.version.isdigit() else "1"
+
+    def to_payload(self):
+        return {
+            "series": self.series,
+            "version": self.version,
+            "effectiveFrom": self.effective_from,
+            "items": [item.to_payload() for item in self.items]
+        }
+
+def version_number(version):
+    """Returns a rate table version as a number for ordering, non-numeric versions order first."""
+    try:
+        return float(version)
+    except (TypeError, ValueError):
+        return 0.0
+
+class RateTableIndex:
+    """Rate tables of one site and environment indexed by series, built once per fetch.
+
+    Each series keeps its tables ordered by start, with the highest version started before each
+    position, so the current and future tables of a series are found with one bisect.
+    """
+    __slots__ = ("tables", "ordered", "rank", "by_key", "names", "series")
+
+    def __init__(self, tables):
+        # A table without a series can't be listed, selected or versioned
+        self.tables = [table for table in tables if isinstance(table, dict) and table.get("series")]
+        if len(self.tables) < len(tables):
+            logging.warning(f"Skipped {len(tables) - len(self.tables)} rate tables without a series")
+        tables = self.tables
+        # Newest series and version first, as listed in the Existing Rate Tables window
+        self.ordered = sorted(tables, key=lambda table: (table.get("series", ""), version_number(table.get("version", 0))), reverse=True)
+        self.rank = {id(table): position for position, table in enumerate(self.ordered)}
+        self.by_key = {}
+        for table in self.ordered:
+            self.by_key.setdefault((str(table.get("series", "")), str(table.get("version", ""))), table)
+        self.names = list(dict.fromkeys(table.get("series") for table in tables))
+
+        grouped = {}
+        for table in tables:
+            grouped.setdefault(table.get("series", ""), []).append(table)
+        self.series = {}  # series -> (start epochs ascending, tables in that order, highest version started before each position)
+        for series, series_tables in grouped.items():
+            series_tables.sort(key=lambda table: int(table.get("effectiveFrom") or 0))
+            latest = [None]
+            for table in series_tables:
+                best = latest[-1]
+                latest.append(table if best is None or version_number(table.get("version", 0)) > version_number(best.get("version", 0)) else best)
+            self.series[series] = ([int(table.get("effectiveFrom") or 0) for table in series_tables], series_tables, latest)
+
+    def current_and_future(self, now_ms):
+        """Returns the latest version in effect of every series and all tables starting later, in display order."""
+        selected = []
+        for starts, series_tables, latest in self.series.values():
+            position = bisect.bisect_left(starts, now_ms)
+            selected.extend(series_tables[position:])
+            if latest[position] is not None:
+                selected.append(latest[position])
+        selected.sort(key=lambda table: self.rank[id(table)])
+        return selected
+
 @log_function_call
 def load_json(file_path):
     try:
@@ -126,7 +452,7 @@ def load_json(file_path):
         logging.error(f"Error loading JSON: {e}")
         return None
 
-@log_function_call
+@log_function_call(sample_every=100)
 def convert_epoch_to_date(epoch_ms):
     try:
         epoch_sec = int(epoch_ms) / 1000  # Convert milliseconds to seconds
@@ -136,27 +462,23 @@ def convert_epoch_to_date(epoch_ms):
         return "Invalid Date"
 
 def start_reporting():
-    """Opens the reporting dashboard in Chrome."""
-    port = config["port"] if "port" in config else PORT
-    def open_browser():
-        time.sleep(3)
-        url = REPORTING_APP_URL + f":{port}"
+    """Opens the reporting dashboard in the browser, starting the reporter first if it isn't running."""
+    def open_dashboard(url):
         try:
-            chrome_path = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-            webbrowser.register("chrome", None, webbrowser.BackgroundBrowser(chrome_path))
-            webbrowser.get("chrome").open(url)
-        except webbrowser.Error:
-            try:
-                chrome_path = "C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe"
-                webbrowser.register("chrome", None, webbrowser.BackgroundBrowser(chrome_path))
-                webbrowser.get("chrome").open(url)
-            except webbrowser.Error as e:
-                logging.error(f"Error Opening Browser: {e}")
-                messagebox.showerror("Error", "Error opening chrome. Please check the log file")
-    messagebox.showinfo("Starting Reporting Dashboard", "Starting Reporting Dashboard. Please wait...")
-    threading.Thread(target=open_browser, daemon=True).start()
+            # The system default browser, unless a browser known to webbrowser is configured
+            browser = webbrowser.get(config["browser"]) if config.get("browser") else webbrowser
+            browser.open(url)
+        except webbrowser.Error as e:
+            logging.error(f"Error Opening Browser: {e}")
+            messagebox.showerror("Error", f"Error opening the browser. Open {url} manually.")
 
-@log_function_call
+    def failed(error):
+        logging.error(f"Error starting reporting: {error}")
+        messagebox.showerror("Error", f"Error opening reporting: {str(error)}")
+
+    run_in_background("reporter", ensure_reporter, open_dashboard, "Starting Reporting Dashboard...", on_error=failed)
+
+@log_function_call(sample_every=100)
 def convert_date_to_epoch(date_str, date_format='%Y-%m-%d'):
     try:
         dt = datetime.datetime.strptime(date_str, date_format)
@@ -165,366 +487,304 @@ def convert_date_to_epoch(date_str, date_format='%Y-%m-%d'):
         logging.error(f"Date conversion error: {e}")
         return 0
 
-def filter_series(input_series):
+def filter_series(index):
     """Filters out historic rate tables and returns only the latest versions and future tables."""
-    current_epoch = int(time.time()) * 1000
-    latest_versions = {}
-    total_series = []
-    
-    for item in input_series:
-        item_series = item.get("series", "")
-        item_version = float(item.get("version", 0))
-        effective_from = item.get("effectiveFrom", "").split()[0]  # Strips the time, keeping only the date
-
-        # Convert effective_from date to epoch
-        effective_from_epoch = convert_date_to_epoch(effective_from)
-
-        if effective_from_epoch >= current_epoch:
-            total_series.append(item)
-        elif item_series not in latest_versions or float(item_version) > float(latest_versions[item_series]["version"]):
-            latest_versions[item_series] = item               
-        
-    total_series.extend(latest_versions.values())
-
-    # Sort the list again
-    total_series.sort(key=lambda x: x['series'], reverse=True)
-    return total_series
+    return index.current_and_future(int(time.time() * 1000))
 
 def get_rate_tables(filtered=False):
-    """Fetches rate tables from the API and displays them in a new window."""
+    """Loads the rate tables, from the cache while fresh, and displays them in a new window."""
+    key = rate_table_cache_key()
+    url = build_base_url() + "/rate-tables"
+    headers = build_api_headers()
+    run_in_background(
+        "rate_tables",
+        lambda: get_rate_table_index(key, url, headers),
+        lambda index: show_rate_tables(index, filtered),
+        "Loading rate tables..."
+    )
+
+def refresh_rate_tables(filtered=False):
+    """Drops the cached rate tables of the selected environment and loads them again."""
+    invalidate_rate_tables(rate_table_cache_key())
+    get_rate_tables(filtered)
+
+def show_rate_tables(index, filtered=False):
+    """Displays rate tables in a new window."""
     global series_window  # Use the global variable to track the rate table window
 
     # Close any previously opened rate table window
     if series_window is not None and series_window.winfo_exists():
         series_window.destroy()
 
-    url = build_base_url() + "/rate-tables"
-    headers = build_api_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            if not data:
-                messagebox.showinfo("Info", "No Rate Tables Exist, loading an example Rate Table")
-                data = EXAMPLE_RATE_TABLE
-
-            if isinstance(data, list):
-                data.sort(key=lambda x: (x.get('series', ''), float(x.get('version', 0))), reverse=True)
-
-                # Convert epoch timestamps
-                for rate_table in data:
-                    if 'effectiveFrom' in rate_table and rate_table['effectiveFrom']:
-                        rate_table['effectiveFrom'] = convert_epoch_to_date(rate_table['effectiveFrom'])
-                    if 'created' in rate_table and rate_table['created']:
-                        rate_table['created'] = convert_epoch_to_date(rate_table['created'])
-
-                # Apply filtering if button was clicked
-                if filtered:
-                    data = filter_series(data)
-
-            with open("rate_tables.json", "w") as file:
-                json.dump(data, file, indent=4)
-        except json.JSONDecodeError:
-            messagebox.showerror("Error", "Failed to parse rate tables data.")
-    else:
-        messagebox.showerror("Error", f"Failed to retrieve rate tables: {response.status_code}")
+    if not index.tables:
+        messagebox.showinfo("Info", "No Rate Tables Exist, loading an example Rate Table")
+        index = RateTableIndex([dict(rate_table) for rate_table in EXAMPLE_RATE_TABLE])
 
-    try:
-        with open("rate_tables.json", "r") as file:
-            data = json.load(file)
-            series_window = Toplevel(root)
-            series_window.title("Existing Rate Tables")
-            window_width = 600  # Adjust as necessary
-            window_height = 550  # Adjust as necessary
-            series_window.geometry(f"{window_width}x{window_height}+{x+250}+{y+100}")
-            series_window.iconbitmap(ICON)
-
-            series_label = tk.Label(series_window, text="Select a Rate Table Series and Version:", padx=0, pady=5)
-            series_label.pack()
-
-            series_var = tk.StringVar(series_window)
-            sorted_series = sorted(data, key=lambda x: (x.get('series', ''), float(x.get('version', 0))), reverse=True)
-
-            # if selected, filter list
-            if filter_var.get():
-                sorted_series = filter_series(sorted_series)
-            series_options = [f"{item.get('series', '')} - v{item.get('version', 'N/A')}" for item in sorted_series]
-
-            if series_options:
-                series_var.set(series_options[0])
-
-            series_option = tk.OptionMenu(series_window, series_var, *series_options, command=lambda _: show_series())
-            series_option.pack()
-
-            series_text_area = Text(series_window, wrap="word", height=8, width=50)
-            series_text_area.pack(side="top", fill="both", expand=True)
-
-            def format_date(date_str):
-                """Formats a date string to only include the date part."""
-                return date_str.split()[0] if date_str else ""
-
-            def show_series():
-                """Displays the selected rate table series and version in the text area."""
-                selected_series_version = series_var.get()
-                selected_series, selected_version = selected_series_version.split(" - v")
-                series_data = [
-                    item for item in sorted_series 
-                    if item.get('series', '') == selected_series and str(item.get('version', 'N/A')) == selected_version
-                ]
-                if series_data:
-                    series_info = series_data[0]
-                    series_info['effectiveFrom'] = format_date(series_info.get('effectiveFrom', ''))
-                    series_info['created'] = format_date(series_info.get('created', ''))
-
-                    # Clear the text area and configure it for bold text
-                    series_text_area.config(state="normal")
-                    series_text_area.delete("1.0", "end")
-
-                    # Add bold tag
-                    series_text_area.tag_configure("bold", font=("Arial", 10, "bold"))
-
-                    # Insert formatted text with bold tags
-                    series_text_area.insert("end", "Series Name:\t\t", "bold")
-                    series_text_area.insert("end", f"{series_info.get('series', '')}\n")
-
-                    series_text_area.insert("end", "Series Version:\t\t", "bold")
-                    series_text_area.insert("end", f"{series_info.get('version', '')}\n\n")
-
-                    series_text_area.insert("end", "Start Date:\t\t", "bold")
-                    series_text_area.insert("end", f"{series_info.get('effectiveFrom', '')}\n")
-
-                    series_text_area.insert("end", "Created Date:\t\t", "bold")
-                    series_text_area.insert("end", f"{series_info.get('created', '')}\n\n")
-
-                    series_text_area.insert("end", "Item Name\t\t\tVersion\t\tRate\n", "bold")
-                    series_text_area.insert("end", f"{'-'*65}\n")
-
-                    for item in series_info.get("items", []):
-                        series_text_area.insert(
-                            "end", 
-                            f"{item.get('name', '')}\t\t\t{item.get('version', '')}\t\t{str(item.get('rate', ''))}\n"
-                        )
-
-                    series_text_area.config(state="disabled")
-
-            def copy_to_main():
-                """Copies the selected rate table series to the main text area and makes it editable."""
-                text_data = series_text_area.get("1.0", "end").strip()  
-
-                # Clean up the text data
-                text_data = "\n".join(
-                    line for line in text_data.splitlines() 
-                    if not re.match(r"^\s*Created Date", line) and "------" not in line
+    # Apply filtering if button was clicked, or if selected
+    sorted_series = filter_series(index) if filtered or filter_var.get() else index.ordered
+
+    series_window = Toplevel(root)
+    series_window.title("Existing Rate Tables")
+    window_width = 600  # Adjust as necessary
+    window_height = 550  # Adjust as necessary
+    series_window.geometry(f"{window_width}x{window_height}+{x+250}+{y+100}")
+    series_window.iconbitmap(ICON)
+
+    series_label = tk.Label(series_window, text="Select a Rate Table Series and Version:", padx=0, pady=5)
+    series_label.pack()
+
+    series_var = tk.StringVar(series_window)
+    # Dropdown label -> rate table, dates are only formatted for the table shown
+    series_options = {f"{item.get('series', '')} - v{item.get('version', 'N/A')}": item for item in sorted_series}
+
+    if series_options:
+        series_var.set(next(iter(series_options)))
+
+    series_option = tk.OptionMenu(series_window, series_var, *series_options, command=lambda _: show_series())
+    series_option.pack()
+
+    series_text_area = Text(series_window, wrap="word", height=8, width=50)
+    series_text_area.pack(side="top", fill="both", expand=True)
+
+    def format_date(epoch_ms):
+        """Formats an epoch timestamp to only include the date part."""
+        return convert_epoch_to_date(epoch_ms).split()[0] if epoch_ms else ""
+
+    def selected_rate_table():
+        """Returns the rate table picked in the dropdown, or None."""
+        return series_options.get(series_var.get())
+
+    def show_series():
+        """Displays the selected rate table series and version in the text area."""
+        series_info = selected_rate_table()
+        if series_info:
+            # The table is shared with the cache, so the dates are formatted without changing it
+            start_date = format_date(series_info.get('effectiveFrom', ''))
+            created_date = format_date(series_info.get('created', ''))
+
+            # Clear the text area and configure it for bold text
+            series_text_area.config(state="normal")
+            series_text_area.delete("1.0", "end")
+
+            # Add bold tag
+            series_text_area.tag_configure("bold", font=("Arial", 10, "bold"))
+
+            # Insert formatted text with bold tags
+            series_text_area.insert("end", "Series Name:\t\t", "bold")
+            series_text_area.insert("end", f"{series_info.get('series', '')}\n")
+
+            series_text_area.insert("end", "Series Version:\t\t", "bold")
+            series_text_area.insert("end", f"{series_info.get('version', '')}\n\n")
+
+            series_text_area.insert("end", "Start Date:\t\t", "bold")
+            series_text_area.insert("end", f"{start_date}\n")
+
+            series_text_area.insert("end", "Created Date:\t\t", "bold")
+            series_text_area.insert("end", f"{created_date}\n\n")
+
+            series_text_area.insert("end", "Item Name\t\t\tVersion\t\tRate\n", "bold")
+            series_text_area.insert("end", f"{'-'*65}\n")
+
+            for item in series_info.get("items", []):
+                series_text_area.insert(
+                    "end", 
+                    f"{item.get('name', '')}\t\t\t{item.get('version', '')}\t\t{str(item.get('rate', ''))}\n"
                 )
 
-                # Enable and clear the main text area
-                main_text_area.config(state="normal")
-                main_text_area.delete("1.0", "end")
-
-                # Configure bold tags
-                main_text_area.tag_configure("bold", font=("Arial", 10, "bold"))
-
-                # Insert formatted text with bold tags
-                lines = text_data.split('\n')
-                for line in lines:
-                    if line.startswith("Series Name:"):
-                        main_text_area.insert("end", "Series Name:\t\t", "bold")
-                        main_text_area.insert("end", line.split("Series Name:")[1].strip() + "\n")
-                    
-                    elif line.startswith("Series Version:"):
-                        main_text_area.insert("end", "Series Version:\t\t", "bold")
-                        main_text_area.insert("end", line.split("Series Version:")[1].strip() + "\n")
-                    
-                    elif line.startswith("Start Date:"):
-                        main_text_area.insert("end", "Start Date:\t\t", "bold")
-                        main_text_area.insert("end", line.split("Start Date:")[1].strip() + "\n")
-                    
-                    elif line.startswith("Created Date:"):
-                        main_text_area.insert("end", "Created Date:\t\t", "bold")
-                        main_text_area.insert("end", line.split("Created Date:")[1].strip() + "\n")
-                    
-                    elif line.startswith("Item Name"):
-                        main_text_area.insert("end", "Item Name\t\t\tVersion\t\tRate\n", "bold")
-                    
-                    elif "------" in line:
-                        main_text_area.insert("end", f"{'-'*65}\n")
-                    
-                    else:
-                        main_text_area.insert("end", line + "\n")
-
-                # Keep the text area editable
-                main_text_area.config(state="normal")
-
-                result_label.config(text="Rate table successfully copied and is now editable")
-                date_button.config(state=tk.NORMAL)
-                post_site_button.config(state=tk.NORMAL)
-                increment_version_button.config(state=tk.NORMAL)
-                clear_editor_button.config(state=tk.NORMAL)
-
-                series_window.destroy()
-
-            def delete_rate_table():
-                """Deletes the selected rate table series and version."""
-                selected_series_version = series_var.get()
-                selected_series, selected_version = selected_series_version.split(" - v")
-                
-                url = build_base_url() + f"/rate-tables/?series={selected_series}&version={selected_version}"
-                headers = build_api_headers()
-                
-                response = requests.delete(url, headers=headers)
-                if response.status_code == 204:
-                    messagebox.showinfo("Success", "Rate table deleted")
-                    result_label.config(text="Rate table successfully deleted")
-                    series_window.destroy()
+            series_text_area.config(state="disabled")
+
+    def copy_to_main():
+        """Copies the selected rate table series to the rate table editor."""
+        series_info = selected_rate_table()
+        if series_info is None:
+            return
+        try:
+            load_rate_table_editor(RateTable.from_dict(series_info))
+        except (KeyError, TypeError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to load rate table: {str(e)}")
+            return
+        result_label.config(text="Rate table successfully copied and is now editable")
+        series_window.destroy()
+
+    def delete_rate_table():
+        """Deletes the selected rate table series and version."""
+        selected_series_version = series_var.get()
+        selected_series, selected_version = selected_series_version.split(" - v")
+
+        url = build_base_url() + f"/rate-tables/?series={selected_series}&version={selected_version}"
+        headers = build_api_headers()
+        cache_key = rate_table_cache_key()
+        window = series_window
+
+        def deleted(response):
+            if response.status_code == 204:
+                invalidate_rate_tables(cache_key)
+                messagebox.showinfo("Success", "Rate table deleted")
+                result_label.config(text="Rate table successfully deleted")
+                if window.winfo_exists():
+                    window.destroy()
+            else:
+                if response.status_code == 409:
+                    messagebox.showwarning("Warning", "Rate Table is already in effect and cannot be deleted")
                 else:
-                    if response.status_code == 409:
-                        messagebox.showwarning("Warning", "Rate Table is already in effect and cannot be deleted")
-                        series_window.lift()  # Keep window in focus
-                        series_window.focus_force()
-    
-        copy_button = tk.Button(series_window, text="Copy to Rate Table Editor", command=copy_to_main, width=25)
-        copy_button.pack(side="left", padx=10, pady=10)
-
-        delete_button = Button(
-            series_window, 
-            text="Delete Rate Table", 
-            command=delete_rate_table, 
-            bootstyle="danger"
-            )
-        delete_button.pack(side="left", padx=10, pady=10)
-        
-        close_button = tk.Button(series_window, text="Close", command=series_window.destroy, width=8)
-        close_button.pack(side="right", padx=10, pady=10)
+                    messagebox.showerror("Error", f"Failed to delete Rate Table: {response.status_code}\n{response.text}")
+                if window.winfo_exists():
+                    window.lift()  # Keep window in focus
+                    window.focus_force()
+
+        run_in_background(
+            f"delete_rate_table_{selected_series_version}",
+            lambda: api_client.delete(url, headers=headers),
+            deleted,
+            "Deleting rate table...",
+            on_error=lambda error: messagebox.showerror("Error", f"Request failed: {str(error)}")
+        )
 
-        show_series()
-    except FileNotFoundError:
-        messagebox.showerror("Error", "No rate tables found.")
+    copy_button = tk.Button(series_window, text="Copy to Rate Table Editor", command=copy_to_main, width=25)
+    copy_button.pack(side="left", padx=10, pady=10)
 
-def increment_version():
-    """Increments the value of 'Series Version' in the main text UI."""
-    text_data = main_text_area.get("1.0", "end").strip()
-    
-    if not text_data:
-        messagebox.showerror("Error", "No data available to increment version.")
-        return
+    delete_button = Button(
+        series_window, 
+        text="Delete Rate Table", 
+        command=delete_rate_table, 
+        bootstyle="danger"
+        )
+    delete_button.pack(side="left", padx=10, pady=10)
 
-    main_text_area.config(state="normal")
-    main_text_area.delete("1.0", "end")
+    refresh_button = tk.Button(series_window, text="Refresh", command=lambda: refresh_rate_tables(filtered), width=8)
+    refresh_button.pack(side="left", padx=10, pady=10)
 
-    # Add bold tag configuration
-    main_text_area.tag_configure("bold", font=("Arial", 10, "bold"))
+    close_button = tk.Button(series_window, text="Close", command=series_window.destroy, width=8)
+    close_button.pack(side="right", padx=10, pady=10)
 
-    # Split lines and handle bold text for specific fields
-    for line in text_data.split("\n"):
-        if line.startswith("Series Name:"):
-            main_text_area.insert("end", "Series Name:\t\t", "bold")
-            main_text_area.insert("end", line.split("Series Name:")[1].strip() + "\n")
-        
-        elif line.startswith("Series Version:"):
-            main_text_area.insert("end", "Series Version:\t\t", "bold")
-            version_number = int(line.split("\t")[-1]) + 1 if line.split("\t")[-1].isdigit() else 1
-            main_text_area.insert("end", f"{version_number}\n")
-        
-        elif line.startswith("Start Date:"):
-            main_text_area.insert("end", "Start Date:\t\t", "bold")
-            main_text_area.insert("end", line.split("Start Date:")[1].strip() + "\n")
-        
-        elif line.startswith("Created Date:"):
-            main_text_area.insert("end", "Created Date:\t\t", "bold")
-            main_text_area.insert("end", line.split("Created Date:")[1].strip() + "\n")
-        
-        elif line.startswith("Item Name"):
-            main_text_area.insert("end", "Item Name\t\t\tVersion\t\tRate\n", "bold")
-        
-        elif "------" in line:
-            main_text_area.insert("end", f"{'-'*65}\n")
-        
-        else:
-            main_text_area.insert("end", line + "\n")
+    show_series()
+
+############################################################################################################
+# Rate Table Editor
+############################################################################################################
+editor_table = None  # RateTable shown in the editor
+item_grid_rows = {}  # Treeview iid -> RateTableItem shown in that row
+ITEM_GRID_COLUMNS = ("name", "version", "rate")
+
+def load_rate_table_editor(rate_table):
+    """Shows a rate table in the editor grid, replacing the welcome message or the previous table."""
+    global editor_table
+    # Fill the fields before the table is attached, so their write traces can't copy stale values into it
+    editor_table = None
+    editor_series_var.set(rate_table.series)
+    editor_version_var.set(rate_table.version)
+    editor_start_var.set(rate_table.start_date())
+    editor_table = rate_table
+
+    item_grid.delete(*item_grid.get_children())
+    item_grid_rows.clear()
+    for item in rate_table.items:
+        item_grid_rows[item_grid.insert("", "end", values=(item.name, item.version, item.rate))] = item
+
+    main_text_area.pack_forget()
+    editor_frame.pack(padx=config.get('rate_table_editor_padding',230), before=result_label)
+    date_button.config(state=tk.NORMAL)
+    post_site_button.config(state=tk.NORMAL)
+    increment_version_button.config(state=tk.NORMAL)
+    clear_editor_button.config(state=tk.NORMAL)
+
+def on_editor_header_changed(*_):
+    """Writes the series and version fields to the rate table in the editor."""
+    if editor_table is not None:
+        editor_table.series = editor_series_var.get().strip()
+        editor_table.version = editor_version_var.get().strip()
+
+def on_item_grid_double_click(event):
+    """Edits the double-clicked cell of the item grid."""
+    iid = item_grid.identify_row(event.y)
+    column = item_grid.identify_column(event.x)
+    if iid and column:
+        edit_item_cell(iid, ITEM_GRID_COLUMNS[int(column[1:]) - 1])
+
+def edit_item_cell(iid, field):
+    """Opens an entry over one cell of the item grid. Enter or leaving the cell writes it to that item only."""
+    bbox = item_grid.bbox(iid, field)
+    if not bbox:
+        return
+    item = item_grid_rows[iid]
+    entry = ttk.Entry(item_grid)
+    entry.insert(0, str(getattr(item, field)))
+    entry.select_range(0, "end")
+    entry.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
+    entry.focus_set()
+    closed = False
+
+    def close(save):
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        value = entry.get().strip()
+        entry.destroy()
+        if not save:
+            return
+        try:
+            setattr(item, field, float(value) if field == "rate" else value)
+        except ValueError:
+            messagebox.showerror("Error", f"Rate must be a number, got '{value}'")
+            return
+        item_grid.set(iid, field, getattr(item, field))
+
+    entry.bind("<Return>", lambda _: close(True))
+    entry.bind("<FocusOut>", lambda _: close(True))
+    entry.bind("<Escape>", lambda _: close(False))
+
+def add_rate_table_item():
+    """Appends an empty item to the rate table in the editor and starts editing its name."""
+    if editor_table is None:
+        return
+    item = RateTableItem("", "1", 0)
+    editor_table.items.append(item)
+    iid = item_grid.insert("", "end", values=(item.name, item.version, item.rate))
+    item_grid_rows[iid] = item
+    item_grid.see(iid)
+    item_grid.after_idle(lambda: edit_item_cell(iid, "name"))
+
+def delete_rate_table_items():
+    """Removes the selected items from the rate table in the editor."""
+    selection = item_grid.selection()
+    if editor_table is None or not selection:
+        return
+    removed = {id(item_grid_rows.pop(iid)) for iid in selection}
+    editor_table.items = [item for item in editor_table.items if id(item) not in removed]
+    item_grid.delete(*selection)
+    result_label.config(text=f"{len(selection)} items removed")
 
-    main_text_area.config(state="normal")
+def increment_version():
+    """Increments the series version of the rate table in the editor."""
+    if editor_table is None:
+        messagebox.showerror("Error", "No data available to increment version.")
+        return
+    editor_table.version = editor_table.next_version()
+    editor_version_var.set(editor_table.version)
     result_label.config(text="Series Version incremented successfully")
 
 def rate_table_start_date():
     """Opens a date picker dialog to select a start date for the rate table."""
+    from ttkbootstrap.dialogs import DatePickerDialog  # Loaded on first use to keep startup fast
     date_picker = DatePickerDialog()
     selected_date = date_picker.date_selected  # Corrected way to fetch selected date
-    if selected_date:
-        result_label.config(text=f"Selected Date: {selected_date}")
-
-    text_data = main_text_area.get("1.0", "end").strip()
-
-    if "Start Date:" in text_data:
-        main_text_area.config(state="normal")
-        main_text_area.delete("1.0", "end")
-
-        # Add bold tag configuration
-        main_text_area.tag_configure("bold", font=("Arial", 10, "bold"))
-
-        for line in text_data.split("\n"):
-            if line.startswith("Series Name:"):
-                main_text_area.insert("end", "Series Name:\t\t", "bold")
-                main_text_area.insert("end", line.split("Series Name:")[1].strip() + "\n")
-            
-            elif line.startswith("Series Version:"):
-                main_text_area.insert("end", "Series Version:\t\t", "bold")
-                main_text_area.insert("end", line.split("Series Version:")[1].strip() + "\n")
-            
-            elif line.startswith("Start Date:"):
-                main_text_area.insert("end", "Start Date:\t\t", "bold")
-                main_text_area.insert("end", f"{selected_date}\n")
-            
-            elif line.startswith("Created Date:"):
-                main_text_area.insert("end", "Created Date:\t\t", "bold")
-                main_text_area.insert("end", line.split("Created Date:")[1].strip() + "\n")
-            
-            elif line.startswith("Item Name"):
-                main_text_area.insert("end", "Item Name\t\t\tVersion\t\tRate\n", "bold")
-            
-            elif "------" in line:
-                main_text_area.insert("end", f"{'-'*65}\n")
-            
-            else:
-                main_text_area.insert("end", line + "\n")
-
-        main_text_area.config(state="normal")
+    if selected_date and editor_table is not None:
+        editor_table.effective_from = convert_date_to_epoch(str(selected_date))
+        editor_start_var.set(editor_table.start_date())
         result_label.config(text="Start Date updated Successfully")
 
 def post_to_site():
-    """Posts the current contents of the Main UI to the configured site and writes it to a file."""
-    text_data = main_text_area.get("1.0", "end").strip()
-    if not text_data:
+    """Posts the rate table in the editor to the configured site."""
+    if editor_table is None or not editor_table.items:
         messagebox.showerror("Error", "No data to post.")
         return
+    if not editor_table.series or not editor_table.version:
+        messagebox.showerror("Error", "The rate table needs a series name and version.")
+        return
     
     try:
-        lines = text_data.split("\n")
-        rate_table = {"items": []}
-        processing_items = False  # Flag to track when to process item lines
-
-        for line in lines:
-            line = line.strip()
-
-            # Identify metadata before processing items
-            if line.startswith("Series Name:"):
-                rate_table["series"] = line.split("\t")[-1].strip()
-            elif line.startswith("Series Version:"):
-                rate_table["version"] = line.split("\t")[-1].strip()
-            elif line.startswith("Start Date:"):
-                rate_table["effectiveFrom"] = convert_date_to_epoch(line.split("\t")[-1].strip())
-            elif line.startswith("Item Name"):
-                processing_items = True  # Begin processing items after this line
-                continue  # Skip the header line itself
-            
-            # Process items after "Item Name"
-            if processing_items and line and "\t" in line:
-                parts = re.split(r'\t+', line)  # Handle multiple tab spaces
-                if len(parts) >= 3:
-                    rate_table["items"].append({
-                        "name": parts[0].strip(),
-                        "version": parts[1].strip(),
-                        "rate": float(parts[2].strip())
-                    })
+        rate_table = editor_table.to_payload()
         ############################################################
         # Write to JSON file  Enable for debug only
         ############################################################
@@ -534,21 +794,167 @@ def post_to_site():
         # Determine API endpoint
         api_url = build_base_url() + "/rate-tables"
         headers = build_api_headers()
-        response = requests.post(api_url, headers=headers, json=rate_table)
+        cache_key = rate_table_cache_key()
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to process data: {str(e)}")
+        return
 
+    def posted(response):
+        post_site_button.config(state=tk.NORMAL)
+        if response.status_code in [200, 201, 409]:
+            invalidate_rate_tables(cache_key)  # The server holds a table the cache may not have
         if response.status_code in [200, 201]:
+            result_label.config(text="Rate Table posted successfully")
             messagebox.showinfo("Success", "Rate Table posted successfully")
         else:
             if response.status_code == 409:
                 messagebox.showwarning("Warning", "Rate Table with the specified Series and Version already exists")
+            else:
+                messagebox.showerror("Error", f"Failed to post Rate Table: {response.status_code}\n{response.text}")
+
+    def post_failed(error):
+        post_site_button.config(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Failed to post Rate Table: {str(error)}")
+
+    # Don't let the same table be posted twice while the first post is in flight
+    post_site_button.config(state=tk.DISABLED)
+    run_in_background(
+        "post_rate_table",
+        lambda: api_client.post(api_url, headers=headers, json=rate_table),
+        posted,
+        "Posting rate table...",
+        on_error=post_failed
+    )
+
+############################################################################################################
+# Batch Publishing
+############################################################################################################
+def read_rate_table_batch(file_paths):
+    """Reads rate tables from JSON files, each holding one table or an array of tables, ready to post.
+
+    Directories are expanded to the JSON files they contain.
+    """
+    expanded = []
+    for path in file_paths:
+        if os.path.isdir(path):
+            expanded.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".json")))
+        else:
+            expanded.append(path)
+
+    rate_tables = []
+    for file_path in expanded:
+        with open(file_path, "r", encoding="utf-8-sig") as file:
+            data = json.load(file)
+        for rate_table in (data if isinstance(data, list) else [data]):
+            if not rate_table.get("series") or not rate_table.get("version") or not rate_table.get("items"):
+                raise ValueError(f"{os.path.basename(file_path)}: every rate table needs a series, a version and items")
+            rate_tables.append(RateTable.from_dict(rate_table).to_payload())
+    return rate_tables
+
+def publish_rate_tables(rate_tables, key, url, headers):
+    """Posts the rate tables missing on the server, several at a time. Safe to run off the Tk thread.
+
+    The batch is diffed against a fresh copy of the server's rate tables by series and version.
+    Tables already present or rejected with 409 are skipped, and a table repeated in the batch is
+    posted for its first row only. Returns one result per table, in batch order.
+    """
+    invalidate_rate_tables(key)
+    present = set(get_rate_table_index(key, url, headers).by_key)
+
+    results = [None] * len(rate_tables)
+    first_rows = {}  # (series, version) -> row posting it
+    for row, rate_table in enumerate(rate_tables, start=1):
+        identity = (rate_table["series"], rate_table["version"])
+        if identity in present:
+            message = "Already on the server"
+        elif identity in first_rows:
+            message = f"Repeat of row {first_rows[identity]}"
+        else:
+            first_rows[identity] = row
+            continue
+        results[row - 1] = {"row": row, "series": identity[0], "version": identity[1], "status": "skipped", "message": message}
+
+    def post(row):
+        rate_table = rate_tables[row - 1]
+        result = {"row": row, "series": rate_table["series"], "version": rate_table["version"]}
+        try:
+            response = api_client.post(url, headers=headers, json=rate_table)
+            if response.status_code in [200, 201]:
+                result.update(status="posted", message="")
+            elif response.status_code == 409:
+                result.update(status="skipped", message="Already on the server (409)")
+            else:
+                result.update(status="failed", message=f"{response.status_code} {response.text}")
+        except Exception as e:
+            result.update(status="failed", message=str(e))
+        return result
+
+    if first_rows:
+        workers = min(config.get("batch_publish_workers", BATCH_PUBLISH_WORKERS), len(first_rows))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish") as executor:
+            for result in executor.map(post, first_rows.values()):
+                results[result["row"] - 1] = result
+        invalidate_rate_tables(key)
+    return results
+
+def batch_publish():
+    """Publishes rate tables from JSON files to the selected environment and shows what was posted."""
+    file_paths = filedialog.askopenfilenames(
+        title="Select rate tables to publish",
+        filetypes=[("JSON", "*.json"), ("All files", "*.*")]
+    )
+    if not file_paths:
+        return
+    try:
+        rate_tables = read_rate_table_batch(file_paths)
     except Exception as e:
-        messagebox.showerror("Error", f"Failed to process data: {str(e)}")
+        messagebox.showerror("Error", f"Failed to read rate tables: {str(e)}")
+        return
+
+    environment = "UAT" if env_var.get() == UAT_OPTION else "Production"
+    if not messagebox.askyesno("Batch Publish", f"Publish {len(rate_tables)} rate tables to {config['site']} {environment}? Tables already there are skipped."):
+        return
+
+    key = rate_table_cache_key()
+    url = build_base_url() + "/rate-tables"
+    headers = build_api_headers()
+    run_in_background(
+        "batch_publish",
+        lambda: publish_rate_tables(rate_tables, key, url, headers),
+        show_publish_summary,
+        f"Publishing {len(rate_tables)} rate tables..."
+    )
+
+def show_publish_summary(results):
+    """Shows the outcome of a batch publish per rate table."""
+    counts = {status: sum(1 for result in results if result["status"] == status) for status in ("posted", "skipped", "failed")}
+    summary = f"{counts['posted']} posted, {counts['skipped']} skipped, {counts['failed']} failed"
+    logging.info(f"Batch publish finished: {summary}")
+    result_label.config(text=f"Batch publish: {summary}")
+
+    summary_window = Toplevel(root)
+    summary_window.title("Batch Publish")
+    summary_window.geometry(f"700x400+{x+200}+{y+100}")
+    summary_window.iconbitmap(ICON)
+    ttk.Label(summary_window, text=summary, font=("Arial", 10, "bold")).pack(pady=10)
+    columns = ("row", "series", "version", "status", "message")
+    summary_table = ttk.Treeview(summary_window, columns=columns, show="headings", height=12)
+    for column in columns:
+        summary_table.heading(column, text=column.capitalize(), anchor="w")
+        summary_table.column(column, width={"message": 300, "row": 50}.get(column, 120), anchor="w", stretch=True)
+    for result in sorted(results, key=lambda result: (result["status"] != "failed", result["row"])):
+        summary_table.insert("", "end", values=[result[column] for column in columns])
+    summary_table.pack(expand=True, fill="both", padx=20)
+    tk.Button(summary_window, text="Close", command=summary_window.destroy, width=8).pack(side="right", padx=20, pady=10)
 
 def clear_editor():
-    """Clears the contents of the Main UI."""
-    main_text_area.config(state="normal")
-    main_text_area.delete("1.0", "end")
-    main_text_area.config(state="normal")
+    """Clears the rate table editor and shows the welcome message again."""
+    global editor_table
+    editor_table = None
+    item_grid.delete(*item_grid.get_children())
+    item_grid_rows.clear()
+    editor_frame.pack_forget()
+    main_text_area.pack(padx=config.get('rate_table_editor_padding',230), before=result_label)
     increment_version_button.config(state=tk.DISABLED)
     date_button.config(state=tk.DISABLED)
     post_site_button.config(state=tk.DISABLED)
@@ -563,182 +969,437 @@ def open_api_ref():
     """Opens the Rate Table API Reference in the default web browser."""
     webbrowser.open("https://fnoapi-dynamicmonetization.redoc.ly")
 
-def register_customer():
-    """Registers a new customer using DAPI."""
-    customer_id = customer_id_entry.get().strip()
-    customer_name = customer_name_entry.get().strip()
-    
-    # Validate inputs
-    if not customer_id or not customer_name:
-        messagebox.showerror("Error", "Customer ID and Customer Name are required.")
-        return
-
-    # Determine API URL
-    url = build_base_url() + "/instances"
-    headers = build_api_headers()
-
+def find_instance(url, headers, customer_id):
+    """Returns the id of the default instance of an account, or None when the account has none."""
+    query_params = {
+        "accountId": customer_id,
+        "default": True
+    }
+    response = api_client.get(url=url, headers=headers, params=query_params)
+    if response.status_code in [200, 201]:
+        exists_data = response.json().get("content")
+        if exists_data:
+            return exists_data[0].get("id")
+    return None
+
+def create_instance(url, headers, customer_id, customer_name):
+    """Registers an account and returns the POST response."""
     payload = {
         "shortName": customer_name,
         "accountId": customer_id
     }
+    return api_client.post(url, headers=headers, json=payload)
 
-    try:
-        # Check to see if the customer already exists
-        query_params = {
-            "accountId": customer_id,
-            "default": True
+def build_line_item(token_number, start_epoch, end_epoch, rate_table_series, activation_id=None):
+    """Returns the payload of a new elastic token line item."""
+    return {
+        "activationId": activation_id or generate_uuid(),
+        "state": "DEPLOYED",
+        "quantity": int(token_number),
+        "start": start_epoch,
+        "end": end_epoch,
+        "used": 0,
+        "attributes": {
+            "elastic": True,
+            "rateTableSeries": rate_table_series
         }
+    }
 
-        check_exists_response = requests.get(url=url,headers=headers,params=query_params)
-        if check_exists_response.status_code in [200, 201]:
-            exists_data = check_exists_response.json().get("content")
-            if len(exists_data) > 0:
-                customer_instance_id = exists_data[0].get("id")
-
-                # Ask if you want to continue
-                confirm_continue = messagebox.askyesno("Customer Exists: ", f"Customer Account ID: {customer_id} Already Exists. Would you like to entitle additional tokens?")
-                if confirm_continue:
-                    return customer_instance_id
-                else:
-                    return 0 #Zero means customer exists
-
-        response = requests.post(url, headers=headers, json=payload)
+def put_line_item(url, headers, line_item_payload):
+    """Creates or updates a line item and returns the PUT response."""
+    return api_client.put(url, headers=headers, data=json.dumps(line_item_payload))
 
-        if response.status_code in [200, 201]:
-            response_data = response.json()
-            elastic_instance_id = response_data.get("id", "Unknown")
+def read_entitlement_form():
+    """Returns the New Customer form values, with the dates as epochs. Call on the Tk thread."""
+    end_date = end_date_label.cget("text")
+    return {
+        "customer_id": customer_id_entry.get().strip(),
+        "customer_name": customer_name_entry.get().strip(),
+        "token_number": token_number_entry.get().strip(),
+        "rate_table": rate_table_var.get(),
+        "start_epoch": convert_date_to_epoch(start_date_label.cget("text")),
+        "end_epoch": PERMANENT_EPOCH if end_date == "Permanent" else convert_date_to_epoch(end_date)
+    }
 
-            messagebox.showinfo("Success", f"Customer registered successfully!\nElastic Instance ID: {elastic_instance_id}")
-            return elastic_instance_id
+def register_customer(form, url, headers):
+    """Registers the customer of the form unless it exists. Safe to run off the Tk thread.
 
-        else:
-            messagebox.showerror("Error", f"Failed to register customer: {response.status_code}\n{response.text}")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Request failed: {str(e)}")
+    Returns the instance ID and whether the customer already existed.
+    """
+    customer_instance_id = find_instance(url, headers, form["customer_id"])
+    if customer_instance_id:
+        return customer_instance_id, True
+
+    response = create_instance(url, headers, form["customer_id"], form["customer_name"])
+    if response.status_code not in [200, 201]:
+        raise RuntimeError(f"Failed to register customer: {response.status_code}\n{response.text}")
+    return response.json().get("id", "Unknown"), False
+
+def update_rate_table_dropdown(new_rate_table_list):
+    """Fills the New Customer rate table dropdown, selecting the first series."""
+    if new_rate_table_list:
+        rate_table_dropdown["values"] = new_rate_table_list  # Update dropdown values
+        rate_table_var.set(new_rate_table_list[0])  # Set first value as default
+    else:
+        rate_table_dropdown["values"] = []  # Clear dropdown if no data
+        rate_table_var.set("")  # Reset selection
 
-def get_rate_tables_names():
-    """Fetches the names of rate tables from the API."""
+def refresh_rate_table_dropdown():
+    """Reloads the rate table dropdown in the background."""
+    key = rate_table_cache_key()
     url = build_base_url() + "/rate-tables"
     headers = build_api_headers()
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        try:
-            data = response.json()
-            table_list = []
-            for entry in data:
-                if entry["series"] not in table_list:
-                    table_list.append(entry["series"])
-            return table_list
-        except json.JSONDecodeError:
-            messagebox.showerror("Error", "Failed to parse rate tables data.")
-    else:
-        messagebox.showerror("Error", f"Failed to retrieve rate tables: {response.status_code}")
+    run_in_background(
+        "rate_table_names",
+        lambda: get_rate_table_index(key, url, headers).names,
+        update_rate_table_dropdown,
+        "Loading rate tables..."
+    )
 
 def generate_uuid():
     """Generates a new UUID."""
     return str(uuid.uuid4())
 
 # After Registering, map the token line items
-def map_token_line_item(instance_id):
-    """Maps token line items to a customer instance."""
+def map_token_line_item(form, url, instance_id, headers):
+    """Entitles the tokens of the form to a customer instance and returns the new line item. Safe to run off the Tk thread."""
+    line_item_payload = build_line_item(form["token_number"], form["start_epoch"], form["end_epoch"], form["rate_table"])
+    response = put_line_item(url + f"/{instance_id}/line-items", headers, line_item_payload)
+    if response.status_code not in [200, 201]:
+        raise RuntimeError(f"Failed to Entitle tokens to customer: {response.status_code}\n{response.text}")
+    return line_item_payload
+
+# Register Customer Function
+def create_and_map_customer():
+    """Creates and maps a new customer."""
     customer_id = customer_id_entry.get().strip()
+    customer_name = customer_name_entry.get().strip()
     token_number = token_number_entry.get().strip()
     start_date = start_date_label.cget("text")
     end_date = end_date_label.cget("text")
     selected_rate_table = rate_table_var.get()
-    start_epoch = convert_date_to_epoch(start_date)
-    
-    if end_date == "Permanent":
-        end_epoch = PERMANENT_EPOCH
-    else:
-        end_epoch = convert_date_to_epoch(end_date)
-    
-    # Call API
-    url = build_base_url() + f"/instances/{instance_id}/line-items"
+    isPermanent = permanent_var.get()
+    if not customer_id or not token_number or not start_date or not end_date or not selected_rate_table or end_date =="Select End Date" or start_date == "Select Start Date":
+        messagebox.showerror("Error","All fields are required.")
+        return
+    elif not customer_name:
+        messagebox.showerror("Error", "Customer ID and Customer Name are required.")
+        return
+    elif not isPermanent and start_date >= end_date:
+        messagebox.showerror("Error","End Date must be after Start Date.")
+        return
+
+    form = read_entitlement_form()
+    url = build_base_url() + "/instances"
     headers = build_api_headers()
+    directory_key = customer_directory_key()
 
-    line_item_payload = {
-        "activationId": generate_uuid(),
-        "state": "DEPLOYED",
-        "quantity": int(token_number),
-        "start": start_epoch,
-        "end": end_epoch,
-        "used": 0,
-        "attributes": {
-            "elastic": True,
-            "rateTableSeries": selected_rate_table
-        }
-    }
-    json_payload = json.dumps(line_item_payload)
+    def failed(error):
+        logging.error(f"Error entitling {customer_id}: {error}")
+        messagebox.showerror("Error", f"Request failed: {str(error)}")
+
+    def entitled(instance_id, line_item):
+        patch_line_item(instance_id, line_item)
+        messagebox.showinfo("Success: ", f"{token_number} Tokens successfully entitled to: {customer_id}")
+
+    def registered(result):
+        instance_id, existed = result
+        if existed:
+            if not messagebox.askyesno("Customer Exists: ", f"Customer Account ID: {customer_id} Already Exists. Would you like to entitle additional tokens?"):
+                return
+        else:
+            add_customer_to_directory(directory_key, {"accountId": customer_id, "shortName": customer_name, "id": instance_id})
+            messagebox.showinfo("Success", f"Customer registered successfully!\nElastic Instance ID: {instance_id}")
+        run_in_background(
+            f"entitle_customer_{customer_id}",
+            lambda: map_token_line_item(form, url, instance_id, headers),
+            lambda line_item: entitled(instance_id, line_item),
+            "Entitling tokens...",
+            on_error=failed
+        )
+
+    run_in_background(
+        f"register_customer_{customer_id}",
+        lambda: register_customer(form, url, headers),
+        registered,
+        "Registering customer...",
+        on_error=failed
+    )
+    # The form was read, clear it for the next customer while the request runs
+    customer_id_entry.delete(0, tk.END)
+    customer_name_entry.delete(0, tk.END)
+    token_number_entry.delete(0, tk.END)
+    start_date_label.config(text=get_default_date())
+    end_date_label.config(text="Select End Date")
+    permanent_var.set(0) # Reset checkbox            
+
+############################################################################################################
+# Bulk Import
+############################################################################################################
+# Accepted spellings of the import columns, compared lowercased without spaces, dashes and underscores
+BULK_IMPORT_COLUMNS = {
+    "accountId": ("accountid", "customerid", "account"),
+    "name": ("name", "shortname", "customername"),
+    "quantity": ("quantity", "tokens", "tokenquantity", "tokennumber"),
+    "start": ("start", "startdate"),
+    "end": ("end", "enddate"),
+    "rateTableSeries": ("ratetableseries", "ratetable", "series"),
+    "email": ("email", "emailaddress", "contactemail")
+}
+BULK_REPORT_COLUMNS = ("row", "accountId", "status", "instanceId", "activationId", "message")
+bulk_import_stops = []  # Stop events of the imports started, set when the application closes
+
+def read_bulk_import_file(file_path):
+    """Reads entitlement rows from a CSV file or a JSON array and maps their columns to BULK_IMPORT_COLUMNS."""
+    with open(file_path, "r", newline="", encoding="utf-8-sig") as file:
+        if file_path.lower().endswith(".json"):
+            records = json.load(file)
+            if not isinstance(records, list):
+                raise ValueError("The JSON file must hold an array of entitlements")
+        else:
+            records = list(csv.DictReader(file))
+
+    aliases = {alias: column for column, names in BULK_IMPORT_COLUMNS.items() for alias in names}
+    rows = []
+    for record in records:
+        row = {column: "" for column in BULK_IMPORT_COLUMNS}
+        for key, value in record.items():
+            column = aliases.get(re.sub(r"[\s_-]", "", str(key)).lower())
+            if column:
+                row[column] = "" if value is None else str(value).strip()
+        rows.append(row)
+    return rows
+
+def bulk_activation_id(row):
+    """Derives the activation ID of an import row, so importing the same row again finds its line item.
+
+    The raw values are used so a row without a start date keeps its ID when imported on another day.
+    """
+    identity = f"{row['accountId']}|{row['quantity']}|{row['start']}|{row['end']}|{row['rateTableSeries']}"
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, identity))
+
+def provision_bulk_row(number, row, base_url, headers):
+    """Registers the account of one import row if needed and entitles its tokens. Safe to run off the Tk thread.
 
+    Re-running an import skips rows whose line item already exists.
+    """
+    result = {"row": number, "accountId": row["accountId"], "status": "failed", "instanceId": "", "activationId": "", "message": ""}
+    try:
+        if not row["accountId"] or not row["quantity"] or not row["rateTableSeries"]:
+            raise ValueError("accountId, quantity and rateTableSeries are required")
+        if not row["quantity"].isdigit() or int(row["quantity"]) <= 0:
+            raise ValueError("quantity must be a positive whole number of tokens")
+        start_epoch = convert_date_to_epoch(row["start"] or get_default_date())
+        end_epoch = PERMANENT_EPOCH if row["end"] in ("", "Permanent") else convert_date_to_epoch(row["end"])
+        if not start_epoch or not end_epoch:
+            raise ValueError("start and end must be dates as YYYY-MM-DD")
+        if end_epoch <= start_epoch:
+            raise ValueError("end must be after start")
+        activation_id = bulk_activation_id(row)
+        result["activationId"] = activation_id
+
+        instances_url = base_url + "/instances"
+        instance_id = find_instance(instances_url, headers, row["accountId"])
+        created = False
+        if not instance_id:
+            response = create_instance(instances_url, headers, row["accountId"], row["name"] or row["accountId"])
+            if response.status_code in [200, 201]:
+                instance_id = response.json().get("id")
+                created = True
+            elif response.status_code == 409:
+                instance_id = find_instance(instances_url, headers, row["accountId"])  # Registered in the meantime
+            if not instance_id:
+                raise RuntimeError(f"Failed to register customer: {response.status_code} {response.text}")
+        result["instanceId"] = instance_id
+
+        line_items_url = base_url + f"/instances/{instance_id}/line-items"
+        if not created:
+            response = api_client.get(line_items_url, headers=headers)
+            if response.status_code == 200 and any(item.get("activationId") == activation_id for item in response.json()):
+                result["status"] = "skipped"
+                result["message"] = "Already entitled"
+                return result
+
+        line_item_payload = build_line_item(row["quantity"], start_epoch, end_epoch, row["rateTableSeries"], activation_id)
+        response = put_line_item(line_items_url, headers, line_item_payload)
+        if response.status_code not in [200, 201]:
+            raise RuntimeError(f"Failed to Entitle tokens to customer: {response.status_code} {response.text}")
+        result["status"] = "registered" if created else "entitled"
+        result["message"] = f"{row['quantity']} tokens entitled"
+        result["lineItem"] = line_item_payload  # For the customer's email, not part of the report
+    except Exception as e:
+        result["message"] = str(e)
+    return result
+
+def bulk_import():
+    """Imports entitlements from a CSV or JSON file into the selected environment, showing progress per row."""
+    file_path = filedialog.askopenfilename(
+        title="Select entitlements to import",
+        filetypes=[("CSV or JSON", "*.csv *.json"), ("All files", "*.*")]
+    )
+    if not file_path:
+        return
     try:
-        response = requests.put(url, headers=headers, data=json_payload)
+        rows = read_bulk_import_file(file_path)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to read {file_path}: {str(e)}")
+        return
+    if not rows:
+        messagebox.showinfo("Info", "The file holds no entitlements.")
+        return
 
-        if response.status_code in [200, 201]:         
-            messagebox.showinfo("Success: ", f"{token_number} Tokens successfully entitled to: {customer_id}")
+    environment = "UAT" if env_var.get() == UAT_OPTION else "Production"
+    if not messagebox.askyesno("Bulk Import", f"Import {len(rows)} entitlements into {config['site']} {environment}?"):
+        return
 
+    directory_key = customer_directory_key()
+    base_url = build_base_url()
+    headers = build_api_headers()
+    results = queue.Queue()
+    stop = threading.Event()
+    bulk_import_stops.append(stop)
+    workers = config.get("bulk_import_workers", BULK_IMPORT_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk_import")
+
+    def provision(number, row):
+        if stop.is_set():
+            results.put({"row": number, "accountId": row["accountId"], "status": "cancelled", "instanceId": "", "activationId": "", "message": "Import stopped"})
         else:
-            messagebox.showerror("Error", f"Failed to Entitle tokens to customer: {response.status_code}\n{response.text}")
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Request failed: {str(e)}")   
+            results.put(provision_bulk_row(number, row, base_url, headers))
+
+    for number, row in enumerate(rows, start=1):
+        executor.submit(provision, number, row)
+    executor.shutdown(wait=False)
+    logging.info(f"Bulk import of {len(rows)} rows from {file_path} started with {workers} workers")
+
+    # Progress view
+    import_window = Toplevel(root)
+    import_window.title("Bulk Import")
+    import_window.geometry(f"900x500+{x+100}+{y+100}")
+    import_window.iconbitmap(ICON)
+    progress_label = ttk.Label(import_window, text=f"0 of {len(rows)} rows done", font=FONT)
+    progress_label.pack(pady=10)
+    progress_bar = ttk.Progressbar(import_window, maximum=len(rows), length=860)
+    progress_bar.pack(padx=20)
+    report_table = ttk.Treeview(import_window, columns=BULK_REPORT_COLUMNS, show="headings", height=15)
+    for column in BULK_REPORT_COLUMNS:
+        report_table.heading(column, text=column, anchor="w")
+        report_table.column(column, width=60 if column == "row" else 150, anchor="w", stretch=True)
+    report_table.pack(expand=True, fill="both", padx=20, pady=10)
+    import_button_frame = tk.Frame(import_window)
+    import_button_frame.pack(fill="x", padx=20, pady=10)
+
+    report = []
+    def save_report():
+        report_path = filedialog.asksaveasfilename(title="Save import report", defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if report_path:
+            with open(report_path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=BULK_REPORT_COLUMNS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(sorted(report, key=lambda result: result["row"]))
+
+    save_button = ttk.Button(import_button_frame, text="Save Report", command=save_report, state=tk.DISABLED)
+    save_button.pack(side="left")
+    stop_button = ttk.Button(import_button_frame, text="Stop", command=stop.set)
+    stop_button.pack(side="left", padx=10)
+    email_customers_button = ttk.Button(
+        import_button_frame,
+        text="Email Customers",
+        command=lambda: email_imported_customers(rows, report),
+        state=tk.DISABLED
+    )
+    if config.get("email_enabled", True):
+        email_customers_button.pack(side="left")
+    ttk.Button(import_button_frame, text="Close", command=import_window.destroy).pack(side="right")
 
-# Register Customer Function
-def create_and_map_customer():
-    """Creates and maps a new customer."""
-    customer_id = customer_id_entry.get().strip()
-    token_number = token_number_entry.get().strip()
-    start_date = start_date_label.cget("text")
-    end_date = end_date_label.cget("text")
-    selected_rate_table = rate_table_var.get()
-    isPermanent = permanent_var.get()
-    if not customer_id or not token_number or not start_date or not end_date or not selected_rate_table or end_date =="Select End Date" or start_date == "Select Start Date":
-        messagebox.showerror("Error","All fields are required.")
+    def show_progress():
+        window_open = import_window.winfo_exists()
+        while True:
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                break
+            report.append(result)
+            if result["instanceId"]:
+                line_item_cache.pop(result["instanceId"], None)  # Fetch the new line items when next shown
+            if result["status"] == "registered":
+                name = rows[result["row"] - 1]["name"] or result["accountId"]
+                add_customer_to_directory(directory_key, {"accountId": result["accountId"], "shortName": name, "id": result["instanceId"]})
+            if window_open:
+                report_table.insert("", "end", values=[result[column] for column in BULK_REPORT_COLUMNS])
+
+        counts = {status: sum(1 for result in report if result["status"] == status) for status in ("registered", "entitled", "skipped", "failed", "cancelled")}
+        summary = ", ".join(f"{count} {status}" for status, count in counts.items() if count)
+        if window_open:
+            progress_bar["value"] = len(report)
+            progress_label.config(text=f"{len(report)} of {len(rows)} rows done: {summary}")
+        if len(report) < len(rows):
+            root.after(BULK_PROGRESS_INTERVAL, show_progress)
+            return
+        logging.info(f"Bulk import of {file_path} finished: {summary}")
+        if window_open:
+            stop_button.config(state=tk.DISABLED)
+            save_button.config(state=tk.NORMAL)
+            if any(result.get("lineItem") and rows[result["row"] - 1]["email"] for result in report):
+                email_customers_button.config(state=tk.NORMAL)
+
+    show_progress()
+
+def email_imported_customers(rows, report):
+    """Emails each imported customer with an email address one digest of the line items just entitled to them."""
+    digests = {}  # (accountId, instanceId, email) -> line items, in file order
+    for result in sorted(report, key=lambda result: result["row"]):
+        email = rows[result["row"] - 1]["email"]
+        if email and result.get("lineItem"):
+            digests.setdefault((result["accountId"], result["instanceId"], email), []).append(result["lineItem"])
+    if not digests:
+        messagebox.showinfo("Info", "No imported entitlements have an email address.")
         return
-    elif not isPermanent and start_date >= end_date:
-        messagebox.showerror("Error","End Date must be after Start Date.")
+    if not messagebox.askyesno("Email Customers", f"Email {len(digests)} customers the entitlements imported for them?"):
         return
-    else:
-        elastic_instance_id = register_customer()
-        if (elastic_instance_id != 0): #if it's 0 that means customer exists
-            map_token_line_item(elastic_instance_id)
-        customer_id_entry.delete(0, tk.END)
-        customer_name_entry.delete(0, tk.END)
-        token_number_entry.delete(0, tk.END)
-        start_date_label.config(text=get_default_date())
-        end_date_label.config(text="Select End Date")
-        permanent_var.set(0) # Reset checkbox            
+    try:
+        outbox = get_email_outbox()
+    except KeyError as e:
+        messagebox.showerror("Configuration Error", f"Missing configuration key: {str(e)}")
+        return
+
+    def queue_all():
+        # Everything is queued first, so the outbox sends the digests back to back on one connection
+        jobs = []
+        for (account_id, instance_id, email), line_items in digests.items():
+            msg, recipients = build_line_item_email(email, "Token Order Details", account_id, instance_id, line_items)
+            jobs.append(outbox.send(msg, recipients, label=f"{email} ({account_id})"))
+        return jobs
+
+    def delivered(jobs):
+        failed = [job for job in jobs if job.status != "sent"]
+        summary = f"{len(jobs) - len(failed)} of {len(jobs)} customer emails sent"
+        logging.info(f"Bulk import emails: {summary}")
+        if failed:
+            details = "\n".join(f"{job.label}: {job.error}" for job in failed[:10])
+            messagebox.showwarning("Email Customers", f"{summary}. Not sent:\n{details}")
+        else:
+            messagebox.showinfo("Email Customers", summary)
+
+    run_in_background(
+        "bulk_email",
+        queue_all,
+        lambda jobs: when_emails_done("bulk_email", jobs, delivered, f"Emailing {len(digests)} customers..."),
+        f"Emailing {len(digests)} customers..."
+    )
 
 def tab_selected_changed(event):
     """Update customer dropdown values when the 'Manage Existing Customers' tab is selected."""
-    global customer_data
+    build_tab(notebook.select())  # Tabs are built the first time they are shown
     if notebook.select() == notebook.tabs()[0]:
         result_label.config(text="")
 
     elif notebook.select() == notebook.tabs()[1]:
         # **Refresh Rate Tables on New Customer Registration Tab**
-        new_rate_table_list = get_rate_tables_names()
-
-        if new_rate_table_list:
-            rate_table_dropdown["values"] = new_rate_table_list  # Update dropdown values
-            rate_table_var.set(new_rate_table_list[0])  # Set first value as default
-        else:
-            rate_table_dropdown["values"] = []  # Clear dropdown if no data
-            rate_table_var.set("")  # Reset selection
+        refresh_rate_table_dropdown()
 
     elif notebook.select() == notebook.tabs()[2]:  # Only update on the third tab
-        customer_data = load_customer_names()  # Reload customer list
-        
-        # Update dropdown values
-        customer_dropdown["values"] = [c["accountId"] for c in customer_data]
-        
-        # Set the first customer by default if available
-        if customer_data:
-            selected_account_var.set(customer_data[0]["accountId"])
-            get_customer_line_items()
-        else:
-            selected_account_var.set("")  # Clear selection if no customers exist
+        refresh_customer_list()  # Reload customer list and the first customer's line items
 
 def on_env_change():
     """Reload customer names and refresh rate table dropdown when the environment selection changes."""
@@ -751,120 +1412,322 @@ def on_env_change():
         return
     
     elif notebook.select() == notebook.tabs()[1] or notebook.select() == notebook.tabs()[2]: 
-        global customer_data
-        customer_data = load_customer_names()  # Reload customer list
-
-        # Update the customer dropdown and their line items
-        customer_dropdown["values"] = [c["accountId"] for c in customer_data]
-        if customer_data:
-            selected_account_var.set(customer_data[0]["accountId"])  # Set first option
-        else:
-            selected_account_var.set("")  # Clear selection if no data
-        get_customer_line_items()  # Refresh line items
+        # Line items of the previous environment are no longer wanted
+        cancel_background("line_items")
+        refresh_customer_list()  # Reload customer list and their line items
         
         if notebook.select() == notebook.tabs()[1]:  #If on the New Customers Tab
             # **Refresh Rate Tables on New Customer Registration Tab**
-            new_rate_table_list = get_rate_tables_names()
+            refresh_rate_table_dropdown()
+
+def compile_exclude_matcher(excluded_prefixes):
+    """Returns a function telling whether an account ID starts with any excluded prefix, ignoring case."""
+    if not excluded_prefixes:
+        return lambda account_id: False
+    pattern = re.compile("|".join(re.escape(prefix) for prefix in excluded_prefixes), re.IGNORECASE)
+    return lambda account_id: pattern.match(account_id) is not None
+
+def fetch_instance_page(url, headers, page):
+    """Fetches one page of customer instances."""
+    response = api_client.get(url, headers=headers, params={"size": CUSTOMER_PAGE_SIZE, "page": page})
+    if response.status_code not in [200, 201]:
+        raise RuntimeError(f"Failed to get customer list: {response.status_code}\n{response.text}")
+    return response.json()
+
+def load_customer_names(url, headers, excluded_prefixes):
+    """Loads all customers from the API, filtering out excluded account IDs. Safe to run off the Tk thread.
+
+    The first page tells how many pages there are, the rest are fetched concurrently.
+    """
+    first_page = fetch_instance_page(url, headers, 0)
+    instances = list(first_page.get("content", []))
+    total_pages = first_page.get("totalPages")
+    if total_pages is None:
+        # No page count in the response, walk the pages until a short one
+        total_pages, content = 1, instances
+        while len(content) == CUSTOMER_PAGE_SIZE:
+            content = fetch_instance_page(url, headers, total_pages).get("content", [])
+            instances.extend(content)
+            total_pages += 1
+    elif total_pages > 1:
+        workers = min(config.get("customer_page_workers", CUSTOMER_PAGE_WORKERS), total_pages - 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="instances") as executor:
+            for page in executor.map(lambda number: fetch_instance_page(url, headers, number), range(1, total_pages)):
+                instances.extend(page.get("content", []))
+
+    is_excluded = compile_exclude_matcher(excluded_prefixes)
+    customer_data = [
+        {"accountId": entry["accountId"], "shortName": entry["shortName"], "id": entry["id"]}
+        for entry in instances
+        if not is_excluded(entry.get("accountId", ""))
+    ]
+    logging.info(f"Loaded {len(customer_data)} of {len(instances)} customers from {max(total_pages, 1)} pages")
+    return customer_data
 
-            if new_rate_table_list:
-                rate_table_dropdown["values"] = new_rate_table_list  # Update dropdown values
-                rate_table_var.set(new_rate_table_list[0])  # Set first value as default
-            else:
-                rate_table_dropdown["values"] = []  # Clear dropdown if no data
-                rate_table_var.set("")  # Reset selection
+############################################################################################################
+# Customer Directory
+############################################################################################################
+customer_directories = {}  # (site, environment) -> customer directory
+customer_directories_lock = threading.Lock()
+
+def build_customer_directory(customers):
+    """Builds a directory of customers sorted by account ID, ignoring case.
+
+    `keys` holds the lowercased account IDs in the same order as `entries` so prefixes can
+    be looked up with bisect, `by_account` finds a customer by exact account ID.
+    """
+    entries = sorted(customers, key=lambda c: c["accountId"].lower())
+    return {
+        "entries": entries,
+        "keys": [c["accountId"].lower() for c in entries],
+        "by_account": {c["accountId"]: c for c in entries},
+        "fetched": time.time()
+    }
+
+customer_directory = build_customer_directory([])  # Directory shown in customer_dropdown
+
+def customer_directory_key():
+    """Returns the directory key of the selected site and environment. Call on the Tk thread."""
+    return (config['site'], env_var.get())
+
+def find_customers(directory, prefix):
+    """Returns the customers whose account ID starts with prefix, ignoring case, in sorted order."""
+    prefix = prefix.lower()
+    keys = directory["keys"]
+    start = bisect.bisect_left(keys, prefix)
+    end = bisect.bisect_left(keys, prefix + "\uffff", start)
+    return directory["entries"][start:end]
+
+def reload_customer_directory(key, url, headers, excluded_prefixes):
+    """Reloads a directory from the API. Returns it with whether it differs from the cached one."""
+    customers = load_customer_names(url, headers, excluded_prefixes)
+    with customer_directories_lock:
+        previous = customer_directories.get(key)
+        if previous is not None and previous["entries"] == sorted(customers, key=lambda c: c["accountId"].lower()):
+            previous["fetched"] = time.time()
+            return previous, False
+        directory = build_customer_directory(customers)
+        customer_directories[key] = directory
+    return directory, True
+
+def add_customer_to_directory(key, customer):
+    """Adds a newly registered customer to a cached directory without reloading it."""
+    if compile_exclude_matcher(excluded_account_prefixes(key[1]))(customer["accountId"]):
+        return
+    with customer_directories_lock:
+        directory = customer_directories.get(key)
+        if directory is None or customer["accountId"] in directory["by_account"]:
+            return
+        index = bisect.bisect(directory["keys"], customer["accountId"].lower())
+        directory["keys"].insert(index, customer["accountId"].lower())
+        directory["entries"].insert(index, customer)
+        directory["by_account"][customer["accountId"]] = customer
+
+def excluded_account_prefixes(env_option):
+    return config.get("accountid_exclude_uat" if env_option == UAT_OPTION else "accountid_exclude_prod", [])
+
+def show_customer_directory(directory, load_line_items=True):
+    """Shows a directory in customer_dropdown, keeping the selected customer when it is still listed."""
+    global customer_directory
+    customer_directory = directory
+    if not tab_built(existing_customer_tab):
+        return  # Shown when the tab is first selected
+    customer_dropdown["values"] = [c["accountId"] for c in find_customers(directory, customer_filter_text())]
+    selected = selected_account_var.get()
+    if selected not in directory["by_account"]:
+        selected = directory["entries"][0]["accountId"] if directory["entries"] else ""
+        selected_account_var.set(selected)  # Set first option, or clear the selection if no data
+        load_line_items = True
+    if load_line_items:
+        get_customer_line_items()  # Refresh line items
 
-def load_customer_names():
-    """Loads customer names from the API, filtering out excluded account IDs."""
-    customer_data = []
-    env_option = env_var.get()
-    excluded_prefixes = config.get("accountid_exclude_uat" if env_option == UAT_OPTION else "accountid_exclude_prod", [])
-    excluded_prefixes = [prefix.lower() for prefix in excluded_prefixes]  # Ensure case-insensitive matching
+def customer_filter_text():
+    """Returns the type-ahead text of customer_dropdown, or nothing when it shows a selected customer."""
+    typed = selected_account_var.get()
+    return "" if typed in customer_directory["by_account"] else typed
 
-    url = build_base_url() + "/instances/?size=500"
+def refresh_customer_list(load_line_items=True, force=False):
+    """Shows the customer directory of the selected environment, reloading it in the background when stale.
+
+    A cached directory is shown straight away. The reload replaces it only if the customers changed.
+    """
+    key = customer_directory_key()
+    excluded_prefixes = excluded_account_prefixes(key[1])
+    url = build_base_url() + "/instances/"
     headers = build_api_headers()
+    with customer_directories_lock:
+        directory = customer_directories.get(key)
+    if directory is not None:
+        show_customer_directory(directory, load_line_items)
+        if not force and time.time() - directory["fetched"] < config.get("customer_directory_ttl_seconds", CUSTOMER_DIRECTORY_TTL):
+            return
 
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code in [200, 201]:
-            response_data = response.json()
-            instances = response_data.get("content", [])
-            
-            for entry in instances:
-                account_id = entry.get("accountId", "").lower()
-                if any(account_id.startswith(prefix) for prefix in excluded_prefixes):
-                    continue  # Skip excluded accounts
-                
-                customer_data.append({
-                    "accountId": entry["accountId"],
-                    "shortName": entry["shortName"],
-                    "id": entry["id"]
-                })
-            
-            #customer_data.sort(key=lambda x: x["accountId"], reverse=(env_option == UAT_OPTION))  # Sort descending for UAT
-            customer_data.sort(key=lambda x: x["accountId"].lower())
-        else:
-            messagebox.showerror("Error", f"Failed to get customer list: {response.status_code}\n{response.text}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Request failed: {str(e)}")
-    
-    return customer_data
+    def reloaded(result):
+        directory, changed = result
+        if key != customer_directory_key():
+            return  # The environment changed while loading
+        if changed or customer_directory is not directory:
+            show_customer_directory(directory, load_line_items and customer_directory is not directory)
+
+    run_in_background(
+        "customers",
+        lambda: reload_customer_directory(key, url, headers, excluded_prefixes),
+        reloaded,
+        "Loading customers..."
+    )
+
+def on_customer_typed(event):
+    """Narrows customer_dropdown to the account IDs starting with the typed text."""
+    if event.keysym in ("Return", "KP_Enter", "Up", "Down", "Escape", "Tab"):
+        return
+    customer_dropdown["values"] = [c["accountId"] for c in find_customers(customer_directory, selected_account_var.get())]
+
+def on_customer_entered(event):
+    """Selects the typed customer, or the first one starting with the typed text, and loads its line items."""
+    typed = selected_account_var.get().strip()
+    customer = customer_directory["by_account"].get(typed)
+    if customer is None:
+        matches = find_customers(customer_directory, typed)
+        customer = matches[0] if matches else None
+    if customer is None:
+        messagebox.showwarning("Warning", f"No customer account ID starts with {typed}")
+        return
+    selected_account_var.set(customer["accountId"])
+    get_customer_line_items()
+
+############################################################################################################
+# Line Items
+############################################################################################################
+line_item_cache = {}  # Instance id -> (fetched, {row key: line item}), see line_item_keys
+line_item_rows = {}  # Row key -> values currently shown in line_items_table
+line_items_instance = None  # Instance whose line items line_items_table shows
 
-def get_customer_line_items():
-    """Fetches and displays line items for the selected customer in a Treeview widget."""
+def get_customer_line_items(refresh=False):
+    """Shows the line items of the selected customer, from the cache when possible.
+
+    Cached items are shown straight away and fetched again in the background once older than
+    `line_item_cache_ttl_seconds`, or right away when `refresh` is set.
+    """
     selected_account_id = selected_account_var.get()
-    selected_customer = next((c for c in customer_data if c["accountId"] == selected_account_id), None)
+    selected_customer = customer_directory["by_account"].get(selected_account_id)
     
     if not selected_customer :
-        # Clear previous content
-        for row in line_items_table.get_children():
-            line_items_table.delete(row)
+        cancel_background("line_items")
+        render_line_items(None, {})  # Clear previous content
         return
     
     customer_id = selected_customer["id"]
     edit_customer_id.set(customer_id)  # Set the customer ID for editing
 
+    cached = line_item_cache.get(customer_id)
+    if cached is not None:
+        render_line_items(customer_id, cached[1])
+        if not refresh and time.time() - cached[0] < config.get("line_item_cache_ttl_seconds", LINE_ITEM_CACHE_TTL):
+            cancel_background("line_items")
+            return
 
     url = build_base_url() + f"/instances/{customer_id}/line-items"
     headers = build_api_headers()
 
-    response = requests.get(url, headers=headers)
+    # Rapid dropdown changes supersede each other, only the last customer's items are shown
+    run_in_background(
+        "line_items",
+        lambda: api_client.get(url, headers=headers),
+        lambda response: show_customer_line_items(customer_id, response),
+        "Loading line items..."
+    )
+
+def show_customer_line_items(customer_id, response):
+    """Caches the line items from the API response for a customer and shows them."""
     if response.status_code == 200:
         data = response.json()
-
-        # Clear previous content
-        for row in line_items_table.get_children():
-            line_items_table.delete(row)
+        items = line_item_keys(data)
+        line_item_cache[customer_id] = (time.time(), items)
+        render_line_items(customer_id, items)
 
         if not data:
             messagebox.showinfo("Info", "No line items found for this customer.")
-            return
+    else:
+        messagebox.showerror("Error", f"Failed to get line items: {response.status_code}")
 
-        # Convert and sort data by Start Date
-        formatted_data = []
-        for item in data:
-            start_epoch = item.get("start", 0)
-            start_date = convert_epoch_to_date(start_epoch)[:10]  # Extract YYYY-MM-DD
-            end_epoch = item.get("end", "")
-            end_date = "Permanent" if end_epoch == PERMANENT_EPOCH else convert_epoch_to_date(end_epoch)[:10]  # Extract YYYY-MM-DD
-            quantity = item.get("quantity", "N/A")
-            used = round(float(item.get("used", 0)), 1)  # Round Used to 1 decimal place
-            percent_used = round((used / quantity) * 100, 1) if quantity and quantity != "N/A" and quantity > 0 else 0.0
-            rate_table_series = item.get("attributes", {}).get("rateTableSeries", "N/A")
-            state = item.get("state", "N/A")  # Add state field
-
-            formatted_data.append((start_date, end_date, quantity, used, percent_used, rate_table_series, state, json.dumps(item)))
-
-        # Sort by Start Date
-        formatted_data.sort()
-
-        # Populate the Treeview
-        for row in formatted_data:
-            line_items_table.insert("", "end", values=row)
-        
+def line_item_keys(data):
+    """Keys line items by activation ID, which is also the iid of their line_items_table row.
+
+    Tk rejects an empty or repeated iid, so items without an activation ID, or repeating one,
+    get a key made from their position instead.
+    """
+    items = {}
+    for number, item in enumerate(data):
+        key = item.get("activationId") or f"line-item-{number}"
+        if key in items:
+            logging.warning(f"Line item {key} is listed more than once")
+        while key in items:
+            key = f"{key}-{number}"
+        items[key] = item
+    return items
+
+def line_item_row(item):
+    """Formats a line item as the values of a line_items_table row."""
+    start_epoch = item.get("start", 0)
+    start_date = convert_epoch_to_date(start_epoch)[:10]  # Extract YYYY-MM-DD
+    end_epoch = item.get("end", "")
+    end_date = "Permanent" if end_epoch == PERMANENT_EPOCH else convert_epoch_to_date(end_epoch)[:10]  # Extract YYYY-MM-DD
+    quantity = item.get("quantity", "N/A")
+    used = round(float(item.get("used", 0)), 1)  # Round Used to 1 decimal place
+    percent_used = round((used / quantity) * 100, 1) if quantity and quantity != "N/A" and quantity > 0 else 0.0
+    rate_table_series = item.get("attributes", {}).get("rateTableSeries", "N/A")
+    state = item.get("state", "N/A")  # Add state field
+
+    return (start_date, end_date, quantity, used, percent_used, rate_table_series, state, json.dumps(item))
+
+def render_line_items(customer_id, items):
+    """Brings line_items_table in line with the items of a customer, touching only rows that changed.
+
+    Rows are keyed by activation ID and kept sorted by Start Date.
+    """
+    global line_items_instance
+    if customer_id != line_items_instance:
+        # Another customer, none of the rows carry over
+        line_items_table.delete(*line_items_table.get_children())
+        line_item_rows.clear()
+        line_items_instance = customer_id
+
+    rows = {activation_id: line_item_row(item) for activation_id, item in items.items()}
+    for activation_id in list(line_item_rows):
+        if activation_id not in rows:
+            line_items_table.delete(activation_id)
+            del line_item_rows[activation_id]
+
+    # Sort by Start Date
+    for index, (activation_id, row) in enumerate(sorted(rows.items(), key=lambda entry: entry[1])):
+        if activation_id not in line_item_rows:
+            line_items_table.insert("", index, iid=activation_id, values=row)
+        else:
+            if line_item_rows[activation_id] != row:
+                line_items_table.item(activation_id, values=row)
+            if line_items_table.index(activation_id) != index:
+                line_items_table.move(activation_id, "", index)
+        line_item_rows[activation_id] = row
+
+    if customer_id is not None:
         # Display Elastic Instance ID 
         customer_id_label.config(text=f"Instance ID: {customer_id}", padding=0)
+
+def patch_line_item(customer_id, item, deleted=False):
+    """Applies a successful PUT or DELETE to the cached line items and the rows shown."""
+    cached = line_item_cache.get(customer_id)
+    activation_id = item.get("activationId")
+    if cached is None or not activation_id:
+        # Nothing cached to patch, e.g. after a bulk import dropped it, so load the items again
+        if customer_id == line_items_instance:
+            get_customer_line_items(refresh=True)
+        return
+    if deleted:
+        cached[1].pop(activation_id, None)
     else:
-        messagebox.showerror("Error", f"Failed to get line items: {response.status_code}")
+        cached[1][activation_id] = item
+    if customer_id == line_items_instance:
+        render_line_items(customer_id, cached[1])
 
 def edit_line_item():
     """Opens a window to edit the selected line item."""
@@ -893,17 +1756,41 @@ def edit_line_item():
     edit_rate_frame.grid(row=1, column=0, sticky="w", pady=20, padx=20)
     tk.Label(edit_rate_frame, text="Rate Table:", font=FONT).grid(row=1, column=0)
     edit_rate_table_var = tk.StringVar(edit_rate_frame)
-    edit_rate_table_names = get_rate_tables_names()
-    selected_table = item_values[5] if item_values[5] in edit_rate_table_names else ""
-    edit_rate_table_var.set(selected_table)
-    edit_rate_table_dropdown = ttk.Combobox(edit_rate_frame, textvariable=edit_rate_table_var, values=edit_rate_table_names, width=15)
+    # The current series until the rate table names arrive
+    edit_rate_table_var.set(item_values[5])
+    edit_rate_table_dropdown = ttk.Combobox(edit_rate_frame, textvariable=edit_rate_table_var, values=[item_values[5]], width=15)
     edit_rate_table_dropdown.state(['readonly'])
     edit_rate_table_dropdown.grid(row=1, column=1, padx=20)
 
+    def show_rate_table_names(edit_rate_table_names):
+        if not edit_window.winfo_exists():
+            return
+        edit_rate_table_dropdown["values"] = edit_rate_table_names
+        if edit_rate_table_var.get() not in edit_rate_table_names:
+            edit_rate_table_var.set("")
+
+    def rate_table_names_failed(error):
+        # Keep the current series selectable, the line item can still be edited
+        logging.error(f"Error loading rate table names: {error}")
+        messagebox.showerror("Error", f"Failed to load rate tables: {str(error)}", parent=edit_window if edit_window.winfo_exists() else root)
+
+    key = rate_table_cache_key()
+    rate_tables_url = build_base_url() + "/rate-tables"
+    headers = build_api_headers()
+    run_in_background(
+        "edit_rate_table_names",
+        lambda: get_rate_table_index(key, rate_tables_url, headers).names,
+        show_rate_table_names,
+        "Loading rate tables...",
+        on_error=rate_table_names_failed
+    )
+
     # Token Quantity Entry
     edit_quantity_frame = tk.Frame(edit_window)
     edit_quantity_frame.grid(row=2, column=0, sticky="w", pady=20, padx=20)
     tk.Label(edit_quantity_frame, text="Quantity:", font=FONT).grid(row=2, column=0)
+    # Registered on this window, the New Customer tab's validator may not exist yet
+    vcmd = (edit_window.register(validate_token_input), "%P")
     edit_quantity_entry = tk.Entry(edit_quantity_frame, font=FONT,validate="key", validatecommand=vcmd, width=16)
     edit_quantity_entry.insert(0, item_values[2])
     edit_quantity_entry.grid(row=2, column=1, padx=37)
@@ -978,25 +1865,25 @@ def edit_line_item():
 
         # Call API:
         url = build_base_url() + f"/instances/{customer_instance_id}/line-items"
-        headers = build_api_headers()
 
         # Prepare JSON payload of the updated item
         json_payload = json.dumps(original_item)
 
-        try:
-            response = requests.put(url, headers=headers, data=json_payload)
-
+        def updated(response):
             if response.status_code in [200, 201]:         
+                patch_line_item(customer_instance_id, original_item)
                 messagebox.showinfo("Success: ", f"Successfully Updated Line Item")
-
             else:
                 messagebox.showerror("Error", f"Failed to Update Line Item: {response.status_code}\n{response.text}")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Request failed: {str(e)}")   
-
+        run_in_background(
+            f"update_line_item_{original_item.get('activationId', '')}",
+            lambda: api_client.put(url, headers=headers, data=json_payload),
+            updated,
+            "Updating line item...",
+            on_error=lambda error: messagebox.showerror("Error", f"Request failed: {str(error)}")
+        )
         edit_window.destroy()
-        get_customer_line_items()
 
     # Apply or cancel buttons
     edit_button_frame = tk.Frame(edit_window)
@@ -1032,20 +1919,24 @@ def delete_line_item():
     url = build_base_url() + f"/instances/{customer_instance_id}/line-items/{activation_id}"
     headers = build_api_headers()
 
-    try:
-        response = requests.delete(url, headers=headers)
+    def deleted(response):
         if response.status_code == 204:
+            patch_line_item(customer_instance_id, original_item, deleted=True)
             messagebox.showinfo("Success", "Successfully Deleted Line Item")
-            get_customer_line_items()  # Refresh the line items window
         else:
             messagebox.showerror("Error", f"Failed to Delete Line Item: {response.status_code}\n{response.text}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Request failed: {str(e)}")
 
-    return
+    run_in_background(
+        f"delete_line_item_{activation_id}",
+        lambda: api_client.delete(url, headers=headers),
+        deleted,
+        "Deleting line item...",
+        on_error=lambda error: messagebox.showerror("Error", f"Request failed: {str(error)}")
+    )
 
 def open_calendar(label,calendar_start_date=None):
     """ Opens a date picker and updates the given label with the selected date. """
+    from ttkbootstrap.dialogs import DatePickerDialog  # Loaded on first use to keep startup fast
     if calendar_start_date is not None:
         try:
             date = datetime.datetime.strptime(calendar_start_date.cget("text"), "%Y-%m-%d")
@@ -1091,21 +1982,64 @@ def get_default_date():
     day = today.strftime("%d")
     return f"{year}-{month}-{day}"
 
-def send_email(to_address, subject, original_item, customer_id):
-    """Send an email with a structured table for values and an embedded inline logo image."""
-    config = read_config()
-    selected_account_id = selected_account_var.get()
-    try:
-        from_address = config['from_email']
-        password = config['email_pwd']
-        smtp_server = config['smtp_server']
-        logo_url = config['logo_url']
-        bcc_address = config.get('bcc_email', '')  # Get BCC address from config
-    except KeyError as e:
-        messagebox.showerror("Configuration Error", f"Missing configuration key: {str(e)}")
-        return
+email_outbox = None  # Email_Outbox.EmailOutbox sending the emails, created with the first email
+
+def get_email_outbox():
+    """Returns the outbox sending the emails, created with the first email. Raises KeyError for missing email settings."""
+    global email_outbox
+    if email_outbox is None:
+        from Email_Outbox import EmailOutbox  # Loaded on first use to keep startup fast
+        email_outbox = EmailOutbox.from_config(config)
+    return email_outbox
+
+def when_emails_done(channel, jobs, on_done, busy_text="Sending email..."):
+    """Hands the outbox jobs to `on_done` on the Tk thread once all are sent or failed.
+
+    Checks every EMAIL_POLL_INTERVAL milliseconds, so no thread is held while the outbox sends.
+    """
+    set_busy(channel, busy_text)
+
+    def check():
+        if not all(job.done.is_set() for job in jobs):
+            root.after(EMAIL_POLL_INTERVAL, check)
+            return
+        set_busy(channel, None)
+        on_done(jobs)
+
+    check()
+
+def line_item_email_rows(original_item):
+    """Returns the table rows describing one line item in an email."""
+    return f"""
+                <tr>
+                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Token Quantity</b></td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{original_item.get('quantity', 'N/A')}</td>
+                </tr>
+                <tr>
+                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Quantity Used</b></td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{float(original_item.get('used', 0)):.2f}</td>
+                </tr>
+                <tr>
+                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Start Date</b></td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{convert_epoch_to_date(original_item.get('start', 0)).split()[0]}</td>
+                </tr>
+                <tr>
+                    <td style="padding: 10px; border: 1px solid #ddd;"><b>End Date</b></td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{'Permanent' if original_item.get('end', 0) == PERMANENT_EPOCH else convert_epoch_to_date(original_item.get('end', 0)).split()[0]}</td>
+                </tr>"""
 
-    smtp_port = 587  
+def build_line_item_email(to_address, subject, account_id, customer_id, line_items):
+    """Builds an email with a structured table for the line items of one customer and an embedded inline logo image.
+
+    Safe to run off the Tk thread. Raises KeyError for missing email settings.
+    """
+    # Loaded on first use to keep startup fast
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from email.mime.image import MIMEImage
+    from_address = config['from_email']
+    logo_url = config['logo_url']
+    bcc_address = config.get('bcc_email', '')  # Get BCC address from config
 
     msg = MIMEMultipart()
     msg['From'] = from_address
@@ -1114,25 +2048,23 @@ def send_email(to_address, subject, original_item, customer_id):
     if bcc_address:
         msg['Bcc'] = bcc_address  # Add BCC address if available
 
-    # Fetch and resize the logo image
+    # Attach the resized logo image, served from the asset cache
     try:
-        response = requests.get(logo_url)
-        response.raise_for_status()
-        
-        img = Image.open(BytesIO(response.content))
-        new_size = (int(img.width * 0.25), int(img.height * 0.25))  
-        img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-        logo_data = BytesIO()
-        img.save(logo_data, format="PNG")
-        logo_data.seek(0)
-
-        image = MIMEImage(logo_data.read(), name="logo.png")
+        image = MIMEImage(asset_cache.get(logo_url, "email"), name="logo.png")
         image.add_header('Content-ID', '<logo>')  
         msg.attach(image)
-    except requests.RequestException as e:
-        logging.error(f"Error fetching logo image: {str(e)}")
-        messagebox.showwarning("Logo Error", "Failed to fetch logo image. The email will be sent without the logo.")
+    except (requests.RequestException, OSError) as e:
+        logging.error(f"Error fetching logo image, the email to {to_address} is sent without it: {str(e)}")
+
+    # One group of rows per line item, numbered when the email holds several
+    item_rows = ""
+    for number, original_item in enumerate(line_items, start=1):
+        if len(line_items) > 1:
+            item_rows += f"""
+                <tr style="background-color: #f2f2f2;">
+                    <td colspan="2" style="padding: 10px; border: 1px solid #ddd;"><b>Line Item {number}: {original_item.get('attributes', {}).get('rateTableSeries', '')}</b></td>
+                </tr>"""
+        item_rows += line_item_email_rows(original_item)
 
     # HTML body with structured table
     html_body = f"""
@@ -1142,7 +2074,7 @@ def send_email(to_address, subject, original_item, customer_id):
                 <img src="cid:logo" alt="Company Logo" style="max-width: 150px;"/>
             </div>
             
-            <p>Here are the details of your Token Order:</p>
+            <p>Here are the details of your Token Order{'s' if len(line_items) > 1 else ''}:</p>
 
             <table style="width: 40%; border-collapse: collapse; text-align: left; border: 1px solid #ddd;">
                 <tr style="background-color: #f2f2f2;">
@@ -1151,28 +2083,12 @@ def send_email(to_address, subject, original_item, customer_id):
                 </tr>
                 <tr>
                     <td style="padding: 10px; border: 1px solid #ddd;"><b>Account ID</b></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{selected_account_id}</td>
+                    <td style="padding: 10px; border: 1px solid #ddd;">{account_id}</td>
                 </tr>
                 <tr>
                     <td style="padding: 10px; border: 1px solid #ddd;"><b>Elastic Instance ID</b></td>
                     <td style="padding: 10px; border: 1px solid #ddd;">{customer_id}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Token Quantity</b></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{original_item.get('quantity', 'N/A')}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Quantity Used</b></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{float(original_item.get('used', 0)):.2f}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><b>Start Date</b></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{convert_epoch_to_date(original_item.get('start', 0)).split()[0]}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 10px; border: 1px solid #ddd;"><b>End Date</b></td>
-                    <td style="padding: 10px; border: 1px solid #ddd;">{'Permanent' if original_item.get('end', 0) == PERMANENT_EPOCH else convert_epoch_to_date(original_item.get('end', 0)).split()[0]}</td>
-                </tr>
+                </tr>{item_rows}
             </table>
 
             <p style="margin-top: 20px;">Please contact us with any questions.</p>
@@ -1183,45 +2099,55 @@ def send_email(to_address, subject, original_item, customer_id):
     """
 
     msg.attach(MIMEText(html_body, 'html'))
+    return msg, [to_address, bcc_address]
 
+def send_email(to_address, subject, line_items, account_id, customer_id):
+    """Queues an email of the line items in the outbox and reports its delivery when it is sent."""
     try:
-        socket.gethostbyname(smtp_server)  
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(from_address, password)
-        server.sendmail(from_address, [to_address] + [bcc_address], msg.as_string())
-        server.quit()
-        messagebox.showinfo("Success", "Email sent successfully")
-    except smtplib.SMTPAuthenticationError:
-        messagebox.showerror("Authentication Error", "Failed to authenticate with the SMTP server. Please check your username and password.")
-    except smtplib.SMTPConnectError:
-        messagebox.showerror("Connection Error", "Failed to connect to the SMTP server. Please check the server address and port.")
-    except smtplib.SMTPException as e:
-        messagebox.showerror("SMTP Error", f"An SMTP error occurred: {str(e)}")
-    except socket.gaierror as e:
-        messagebox.showerror("Address Error", f"Address-related error connecting to server: {str(e)}. Please check the SMTP server address.")
-    except Exception as e:
-        messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
+        outbox = get_email_outbox()
+    except KeyError as e:
+        messagebox.showerror("Configuration Error", f"Missing configuration key: {str(e)}")
+        return
+
+    def enqueue_email():
+        # Built off the Tk thread, the logo may have to be downloaded and resized
+        msg, recipients = build_line_item_email(to_address, subject, account_id, customer_id, line_items)
+        return outbox.send(msg, recipients, label=f"{to_address} ({account_id})")
+
+    def delivered(jobs):
+        job = jobs[0]
+        if job.status == "sent":
+            messagebox.showinfo("Success", f"Email sent successfully to {to_address}")
+        else:
+            messagebox.showerror("Email Error", f"The email to {to_address} could not be sent: {job.error}")
+
+    def failed(error):
+        if isinstance(error, KeyError):
+            messagebox.showerror("Configuration Error", f"Missing configuration key: {str(error)}")
+        else:
+            messagebox.showerror("Email Error", f"The email to {to_address} could not be created: {str(error)}")
+
+    # The outbox sends it in the background, the status is shown once it is delivered or fails
+    channel = f"email_{generate_uuid()}"
+    run_in_background(channel, enqueue_email, lambda job: when_emails_done(channel, [job], delivered), "Sending email...", on_error=failed)
 
 def email_line_item():
-    """Prompt the user to enter an email address and send the selected line item."""
-    selected_item = line_items_table.selection()
-    if not selected_item:
+    """Prompt the user to enter an email address and send the selected line items in one email."""
+    selected_items = line_items_table.selection()
+    if not selected_items:
         messagebox.showerror("Error", "Please select a line item to email.")
         return
 
-    item_values = line_items_table.item(selected_item, "values")
-    item_string = item_values[7]
-    original_item = json.loads(item_string)
-
     email_window = Toplevel(root)
     email_window.title("Email Line Item Details")
-    email_window.geometry("450x150+700+450")
+    email_window.geometry("450x180+700+450")
     email_window.iconbitmap(ICON)
 
     tk.Label(email_window, text="Enter Customer Email Address:").pack(pady=5)
     email_entry = tk.Entry(email_window, width=40)
     email_entry.pack(pady=5)
+    all_items_var = tk.BooleanVar(email_window)
+    ttk.Checkbutton(email_window, text="Send all line items of this customer in one email", variable=all_items_var).pack(pady=5)
 
     def send():
         to_address = email_entry.get()
@@ -1229,191 +2155,131 @@ def email_line_item():
             messagebox.showerror("Error", "Email address is required.")
             return
 
+        rows = line_items_table.get_children() if all_items_var.get() else selected_items
+        line_items = [json.loads(line_items_table.item(row, "values")[7]) for row in rows]
         subject = "Token Order Details"
         
         # Ensure 'customer_id' is passed correctly
         customer_id = edit_customer_id.get()
-
-        body = (
-            f"Here are the details of your Token order:\n\n"
-            f"Elastic Instance ID:\t{customer_id}\n\n"
-            f"Token Quantity:\t\t{original_item.get('quantity', 'N/A')}\n"
-            f"Quantity Used:\t\t{float(original_item.get('used', 0)):.2f}\n\n"
-            f"Start Date:\t\t{convert_epoch_to_date(original_item.get('start', 0)).split()[0]}\n"
-            f"End Date:\t\t{'Permanent' if original_item.get('end', 0) == PERMANENT_EPOCH else convert_epoch_to_date(original_item.get('end', 0)).split()[0]}\n"
-        )
-
-        # Now passing customer_id as the fourth parameter
-        send_email(to_address, subject, original_item, customer_id)
+        send_email(to_address, subject, line_items, selected_account_var.get(), customer_id)
         email_window.destroy()
 
     tk.Button(email_window, text="Send Email", command=send, width=12).pack(side="left", padx=10, pady=10)
     tk.Button(email_window, text="Close", command=email_window.destroy, width=8).pack(side="right", padx=10, pady=10)
 
+application_closed = False
+
 def quit_application():
-    global reporter_process
-    """Cleanly exit the application."""
-    logging.info(f"Closing Reporter Process ID: {reporter_process.pid}")
-    if reporter_process.poll() is None:
-        reporter_process.terminate()
-        reporter_process.wait()  # Optional: wait for the process to terminate
-    if reporter_process.poll() is None:
-        reporter_process.kill()
+    """Cleanly exit the application. Runs once, from the Exit buttons or at interpreter exit, whichever comes first."""
+    global application_closed
+    if application_closed:
+        return
+    application_closed = True
+    if reporter_process is not None:
+        logging.info(f"Closing Reporter Process ID: {reporter_process.pid}")
+        if reporter_process.poll() is None:
+            # Ask the reporter to finish its requests in progress and stop
+            try:
+                requests.post(
+                    f"http://{REPORTING_APP_URL}:{reporter_port()}/shutdown",
+                    headers={REPORTER_TOKEN_HEADER: reporter_token},
+                    timeout=2
+                ).raise_for_status()
+                reporter_process.wait(timeout=REPORTER_SHUTDOWN_TIMEOUT)
+            except (requests.RequestException, subprocess.TimeoutExpired) as e:
+                logging.warning(f"Reporter did not shut down gracefully: {e}")
+        if reporter_process.poll() is None:
+            reporter_process.terminate()
+            reporter_process.wait()  # Optional: wait for the process to terminate
+        if reporter_process.poll() is None:
+            reporter_process.kill()
+    if email_outbox is not None:
+        unsent = email_outbox.close(timeout=config.get("email_close_timeout_seconds", EMAIL_CLOSE_TIMEOUT))
+        if unsent:
+            logging.warning(f"Closing with {unsent} emails unsent")
+    api_executor.shutdown(wait=False, cancel_futures=True)
+    for stop in bulk_import_stops:
+        stop.set()  # Rows not started yet are skipped
+    api_client.log_stats()
     logging.info(f"Closing Application")
-    root.quit() 
+    if root is not None:
+        root.quit() 
 
-atexit.register(quit_application)
 ############################################################################################################
 # Main Window Development
 ############################################################################################################
 config = read_config()
-initialize_reporter() # Start the reporter
-
-# Create the main application window
-root = ttkb.Window(themename=config.get("theme", "cosmo"))
-root.title("FlexNet EAST (Elastic Access Standalone Tool)")
-
-# Set window size and position
-window_width, window_height = config.get('main_window_width',1100), config.get('main_window_height',800)
-screen_width, screen_height = root.winfo_screenwidth(), root.winfo_screenheight()
-x, y = (screen_width - window_width) // 2, (screen_height - window_height) // 2
-root.geometry(f"{window_width}x{window_height}+{x}+{y-40}")
-root.iconbitmap(ICON)  
-
-# Create a Notebook (Tabbed Interface)
-notebook = ttk.Notebook(root)
-notebook.pack(expand=True, fill="both")
-
-# Create "Rate Table Generator" tab
-rate_table_tab = ttk.Frame(notebook)
-notebook.add(rate_table_tab, text="Rate Table Editor", padding= 5)
-
-# Create "Customer Entitlements" tab
-customer_entitlements_tab = ttk.Frame(notebook)
-notebook.add(customer_entitlements_tab, text="Entitle New & Existing Customers", padding= 5)
-
-# Create "Manage Existing Customers" tab
-existing_customer_tab = ttk.Frame(notebook)
-notebook.add(existing_customer_tab, text="Manage Customer Entitlements", padding=5)
-
-# Create "Reporting" tab
-reporting_tab = ttk.Frame(notebook)
-notebook.add(reporting_tab, text="Reporting", padding=5)
-
-# Create "Resources" tab
-resources_tab = ttk.Frame(notebook)
-notebook.add(resources_tab, text="Additional Resources", padding=5)
-
-############################################################################################################
-# Resources Tab
-############################################################################################################
-# Add content to the "Resources" tab
-resources_label = ttk.Label(resources_tab, text="Additional Resources", font=("Arial", 14, "bold"))
-resources_label.pack(pady=10, padx=10, anchor="nw")  # Anchor to the top-left
-
-# Create a frame for better layout
-video_frame = tk.Frame(resources_tab)
-video_frame.pack(side="top", anchor="w", padx=10, pady=10)  # Move to the top-left
-
-# Load and display the first image
-image_path = r"./static/PB_SS_2024_DM.png"
-image = Image.open(image_path)
-image = image.resize((350, 187), Image.Resampling.LANCZOS)
-photo = ImageTk.PhotoImage(image)
-
-# Create sub-frames for left (image) and right (caption)
-image_caption_frame = tk.Frame(video_frame)
-image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
-
-image_label = tk.Label(image_caption_frame, image=photo, cursor="hand2")
-image_label.image = photo  # Keep a reference to avoid garbage collection
-image_label.pack(side="left", padx=10)
-image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=1CqaeNpcF_A&t=7s"))  # Open the video link
-
-# Add the caption to the right of the image
-caption = """Revenera's Paul Bland (Senior Director, Product Management) covers the drivers and use cases for Elastic Access to your product portfolio. Ansys' Steve Del (Director, Software Research and Development) joins Paul to share his experience and thoughts on Elastic Access at Revenera's SoftSummit 2024 EMEA event."""
-caption_label = ttk.Label(image_caption_frame, text=caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
-caption_label.pack(side="left", padx=10)
-
-# Load and display the second image
-second_image_path = r"./static/DM_demo.png"
-second_image = Image.open(second_image_path)
-second_image = second_image.resize((350, 187), Image.Resampling.LANCZOS)
-second_photo = ImageTk.PhotoImage(second_image)
-
-# Create sub-frames for left (image) and right (caption)
-second_image_caption_frame = tk.Frame(video_frame)
-second_image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
-
-second_image_label = tk.Label(second_image_caption_frame, image=second_photo, cursor="hand2")
-second_image_label.image = second_photo  # Keep a reference to avoid garbage collection
-second_image_label.pack(side="left", padx=10)
-second_image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=IulvRoqC9sA"))
-
-# Add the caption to the right of the image
-second_caption = """A demonstration of an application using Revenera's Elastic Access Token-based licensing"""
-second_caption_label = ttk.Label(second_image_caption_frame, text=second_caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
-second_caption_label.pack(side="left", padx=10)
-
-# Add the caption to the right of the image
-second_caption_label.pack(side="left", padx=10)
-
-# Load and display the third image
-third_image_path = r"./static/SFDC_DM.png"
-third_image = Image.open(third_image_path)
-third_image = third_image.resize((350, 187), Image.Resampling.LANCZOS)
-third_photo = ImageTk.PhotoImage(third_image)
-
-# Create sub-frames for left (image) and right (caption)
-third_image_caption_frame = tk.Frame(video_frame)
-third_image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
-
-third_image_label = tk.Label(third_image_caption_frame, image=third_photo, cursor="hand2")
-third_image_label.image = third_photo  # Keep a reference to avoid garbage collection
-third_image_label.pack(side="left", padx=10)
-third_image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=qEAvf2agY-A"))
-
-# Add the caption to the right of the image
-third_caption = """A demonstration of how Revenera's Token Based Licensing Service can be directly integrated with Salesforce.com"""
-third_caption_label = ttk.Label(third_image_caption_frame, text=third_caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
-third_caption_label.pack(side="left", padx=10)
-
-# UI Components for "Rate Table Generator" tab
-env_var = tk.StringVar(value=UAT_OPTION)
-
-############################################################################################################
-# Manage Rate Table Tab
-############################################################################################################
-
-# Radio Buttons for Environment Selection
-radio_frame = tk.Frame(rate_table_tab)
-radio_frame.pack(side="top", anchor="nw", pady=30)
-tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
-tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
+api_client = DMClient.from_config(config)  # Pooled connections shared by all API calls
+asset_cache = AssetCache(
+    api_client,
+    LOGO_VARIANTS,
+    config.get("asset_cache_dir", ASSET_CACHE_DIR),
+    config.get("asset_revalidate_seconds", REVALIDATE_INTERVAL)
+)  # Logo and its resized variants, kept on disk between runs
+startup_phase("config")
+
+root = None  # Main window, created by main()
+tab_builders = {}  # Notebook tab -> function adding its widgets, until the tab is first selected
+logo_image = None  # Tenant logo once loaded, shown on the tabs in LOGO_TABS
+LOGO_TABS = []
+
+def build_tab(tab):
+    """Adds the widgets of a notebook tab the first time it is needed."""
+    builder = tab_builders.pop(str(tab), None)
+    if builder is None:
+        return
+    started = time.perf_counter()
+    builder()
+    if logo_image is not None and str(tab) in LOGO_TABS:
+        place_logo(tab)
+    logging.info(f"Built {notebook.tab(tab, 'text')} tab in {(time.perf_counter() - started) * 1000:.0f} ms")
 
-# Tenant label
-ttk.Label(rate_table_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
+def tab_built(tab):
+    return str(tab) not in tab_builders
 
-# Buttons for Rate Table Actions
-button_width = 23
+def place_logo(tab):
+    tk.Label(tab, image=logo_image).place(relx=0.95, y=10, anchor="ne")
 
-# Add a new button to get filtered rate tables
-filter_var = tk.BooleanVar()
-ttk.Button(rate_table_tab, text="Get Current/Future Tables", command=lambda:get_rate_tables(filtered=True), padding=(5, 7), width=button_width).place(x=10, y=120)
-ttk.Button(rate_table_tab, text="Get All Rate Tables", command=get_rate_tables, padding=(5, 7), width=button_width).place(x=10, y=170)
-increment_version_button = ttk.Button(rate_table_tab, text="Increment Series Version", command=increment_version, padding=(5, 7), width=button_width, state=tk.DISABLED)
-increment_version_button.place(x=10, y=220)
-date_button = ttk.Button(rate_table_tab, text="Select New Start Date", command=rate_table_start_date, padding=(5, 7), width=button_width, state=tk.DISABLED)
-date_button.place(x=10, y=270)
-post_site_button = ttk.Button(rate_table_tab, text="Post New Rate Table", command=post_to_site, padding=(5, 7), width=button_width, state=tk.DISABLED)
-post_site_button.place(x=10, y=320)
+def load_logo():
+    """Loads the logo in the background and shows it on the tabs built so far, later tabs add it when built.
 
-clear_editor_button = ttk.Button(rate_table_tab, text="Clear Editor", command=clear_editor, padding=(5, 7), width=button_width, state=tk.DISABLED)
-clear_editor_button.place(x=config.get('clear_edit_button_x',875), y=120)
+    The logo comes from the asset cache, so it is only downloaded on the first run or when it changed.
+    """
+    def fetch():
+        from PIL import Image  # Loaded on first use to keep startup fast
+        image = Image.open(BytesIO(asset_cache.get(config['logo_url'], "tab")))
+        image.load()
+        return image
+
+    def loaded(image):
+        global logo_image
+        from PIL import ImageTk
+        logo_image = ImageTk.PhotoImage(image)
+        for tab in LOGO_TABS:
+            if tab_built(tab):
+                place_logo(tab)
+
+    run_in_background(
+        "logo",
+        fetch,
+        loaded,
+        None,
+        on_error=lambda error: logging.error(f"Error fetching logo image: {str(error)}")
+    )
 
-# Text Area for Rate Table
-main_text_area = Text(rate_table_tab, wrap="word", height=20, width=config.get('rate_table_editor_width', 70))
-main_text_area.pack(padx=config.get('rate_table_editor_padding',230))
+def first_frame_drawn():
+    """Finishes startup once the window is on screen: reports the timing and starts the slower work."""
+    root.update_idletasks()
+    startup_phase("first frame")
+    report = startup_report()
+    logging.info(report)
+    if args.startup_report:
+        print(report)
+        root.after(0, root.quit)
+        return
+    load_logo()
+    # Fill the customer list cache so the Manage Customer Entitlements tab opens with it
+    refresh_customer_list(load_line_items=False)
 
 # Function to load welcome text into the Rate Table Editor
 def load_welcome_message():
@@ -1445,263 +2311,490 @@ def load_welcome_message():
 
     main_text_area.config(state="disabled")  # Prevent editing until user starts typing
 
-# Call the function AFTER main_text_area is initialized
-load_welcome_message()
-
-# Result Label
-result_label = tk.Label(rate_table_tab, text="", font=("Arial", 10, "bold"))
-result_label.pack(pady=10)
-
-# Create a frame for bottom buttons
-bottom_frame_rate_table_tab = ttk.Frame(rate_table_tab)
-bottom_frame_rate_table_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
-bottom_frame_customer_entitlements_tab = ttk.Frame(customer_entitlements_tab)
-bottom_frame_customer_entitlements_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
-bottom_frame_existing_customer_tab = ttk.Frame(existing_customer_tab)
-bottom_frame_existing_customer_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
-bottom_frame_reporter_tab = ttk.Frame(reporting_tab)
-bottom_frame_reporter_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
-bottom_frame_resources_tab = ttk.Frame(resources_tab)
-bottom_frame_resources_tab.pack(side="bottom", fill="x", pady=0)  # Anchors to bottom with padding
-
-# User Guide and API Reference Buttons
-dmug_button = Button(
-            bottom_frame_rate_table_tab, 
-            text="Dynamic Monetization User Guide", 
-            command=open_user_guide,
-            bootstyle="success",
-            padding=(5,7),
-            width=30
-            )
-dmug_button.pack(side="left", padx=10, pady=10)
-apiref_button = Button(
-            bottom_frame_rate_table_tab, 
-            text="Dynamic Monetization API Reference", 
-            command=open_api_ref,
-            bootstyle="success",
-            padding=(5,7),
-            width=33
-            )
-apiref_button.pack(side="left", padx=10, pady=10)
-
-# Place the "Exit" button on the bottom right
-exit_button1 = ttk.Button(bottom_frame_rate_table_tab, text="Exit", command=quit_application, padding=(20, 5))
-exit_button1.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
-exit_button2 = ttk.Button(bottom_frame_customer_entitlements_tab, text="Exit", command=quit_application, padding=(20, 5))
-exit_button2.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
-exit_button3 = ttk.Button(bottom_frame_existing_customer_tab, text="Exit", command=quit_application, padding=(20, 5))
-exit_button3.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
-exit_button4 = ttk.Button(bottom_frame_reporter_tab, text="Exit", command=quit_application, padding=(20, 5))
-exit_button4.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
-exit_button4 = ttk.Button(bottom_frame_resources_tab, text="Exit", command=quit_application, padding=(20, 5))
-exit_button4.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
-
-############################################################################################################
-# New Customer Registation Tab
-############################################################################################################
-
 def on_customer_id_change(*args):
     """Automatically copy the entered Customer ID to the Customer Name field."""
     customer_name_entry.delete(0, tk.END)
     customer_name_entry.insert(0, customer_id_entry.get())
 
-# Tenant label (Upper Left at x=30, y=10)
-ttk.Label(customer_entitlements_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
-
-# Radio Buttons for Environment Selection (Moved to x=30, y=40, Left Side)
-radio_frame = tk.Frame(customer_entitlements_tab)
-radio_frame.pack(side="top", anchor="nw", pady=30)
-
-tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
-tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
-
-# Create a frame for better layout management
-customer_frame = tk.Frame(customer_entitlements_tab)
-customer_frame.place(x=30, y=150)  # Position below the environment selection
-
-# Customer ID Label and Entry (Left side)
-ttk.Label(customer_frame, text="Customer ID:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
-customer_id_entry = ttk.Entry(customer_frame, width=25)
-customer_id_entry.pack(side="left", padx=5)
-customer_id_entry.bind("<KeyRelease>", on_customer_id_change)
-
-# Customer Name Label and Entry (Right of Customer ID)
-ttk.Label(customer_frame, text="Customer Name:", font=("Arial", 10, "normal")).pack(side="left", padx=20)
-customer_name_entry = ttk.Entry(customer_frame, width=24)
-customer_name_entry.pack(side="left", padx=6)
-
-# Create extra frame for better layout management
-entry_frame = tk.Frame(customer_entitlements_tab)
-entry_frame.place(x=30, y=220) 
-
-ttk.Label(entry_frame, text="Rate Table:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
-rate_table_var = tk.StringVar()
-
-rate_table_list = []
-rate_table_dropdown = ttk.Combobox(entry_frame, textvariable=rate_table_var, values=rate_table_list, width=23)
-rate_table_dropdown.state(['readonly'])
-rate_table_dropdown.pack(side="left", padx=20)
-ttk.Label(entry_frame, text="Number of Tokens:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
-
-vcmd = (entry_frame.register(validate_token_input), "%P")
-
-token_number_entry = ttk.Entry(entry_frame, width=22, font=("Arial", 10, "normal"), validate="key", validatecommand=vcmd)
-token_number_entry.pack(side="left", padx=3)
-
-start_date_frame = tk.Frame(customer_entitlements_tab)
-start_date_frame.place(x=30, y=300) 
+# Add copy button to the right of the Elastic Instance ID display
+def copy_to_clipboard():
+    root.clipboard_clear()
+    root.clipboard_append(edit_customer_id.get())
+    root.update()  # Now it stays on the clipboard after the window is closed
+    messagebox.showinfo("Copied", "Elastic Instance ID copied to clipboard")
 
-ttk.Label(start_date_frame, text="Start Date:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
+############################################################################################################
+# Resources Tab
+############################################################################################################
+def build_resources_tab():
+    from PIL import Image, ImageTk  # Loaded on first use to keep startup fast
+
+    bottom_frame_resources_tab = ttk.Frame(resources_tab)
+    bottom_frame_resources_tab.pack(side="bottom", fill="x", pady=0)  # Anchors to bottom with padding
+    exit_button5 = ttk.Button(bottom_frame_resources_tab, text="Exit", command=quit_application, padding=(20, 5))
+    exit_button5.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
+
+    # Add content to the "Resources" tab
+    resources_label = ttk.Label(resources_tab, text="Additional Resources", font=("Arial", 14, "bold"))
+    resources_label.pack(pady=10, padx=10, anchor="nw")  # Anchor to the top-left
+
+    # Create a frame for better layout
+    video_frame = tk.Frame(resources_tab)
+    video_frame.pack(side="top", anchor="w", padx=10, pady=10)  # Move to the top-left
+
+    # Load and display the first image
+    image_path = r"./static/PB_SS_2024_DM.png"
+    image = Image.open(image_path)
+    image = image.resize((350, 187), Image.Resampling.LANCZOS)
+    photo = ImageTk.PhotoImage(image)
+
+    # Create sub-frames for left (image) and right (caption)
+    image_caption_frame = tk.Frame(video_frame)
+    image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
+
+    image_label = tk.Label(image_caption_frame, image=photo, cursor="hand2")
+    image_label.image = photo  # Keep a reference to avoid garbage collection
+    image_label.pack(side="left", padx=10)
+    image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=1CqaeNpcF_A&t=7s"))  # Open the video link
+
+    # Add the caption to the right of the image
+    caption = """Revenera's Paul Bland (Senior Director, Product Management) covers the drivers and use cases for Elastic Access to your product portfolio. Ansys' Steve Del (Director, Software Research and Development) joins Paul to share his experience and thoughts on Elastic Access at Revenera's SoftSummit 2024 EMEA event."""
+    caption_label = ttk.Label(image_caption_frame, text=caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
+    caption_label.pack(side="left", padx=10)
+
+    # Load and display the second image
+    second_image_path = r"./static/DM_demo.png"
+    second_image = Image.open(second_image_path)
+    second_image = second_image.resize((350, 187), Image.Resampling.LANCZOS)
+    second_photo = ImageTk.PhotoImage(second_image)
+
+    # Create sub-frames for left (image) and right (caption)
+    second_image_caption_frame = tk.Frame(video_frame)
+    second_image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
+
+    second_image_label = tk.Label(second_image_caption_frame, image=second_photo, cursor="hand2")
+    second_image_label.image = second_photo  # Keep a reference to avoid garbage collection
+    second_image_label.pack(side="left", padx=10)
+    second_image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=IulvRoqC9sA"))
+
+    # Add the caption to the right of the image
+    second_caption = """A demonstration of an application using Revenera's Elastic Access Token-based licensing"""
+    second_caption_label = ttk.Label(second_image_caption_frame, text=second_caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
+    second_caption_label.pack(side="left", padx=10)
+
+    # Load and display the third image
+    third_image_path = r"./static/SFDC_DM.png"
+    third_image = Image.open(third_image_path)
+    third_image = third_image.resize((350, 187), Image.Resampling.LANCZOS)
+    third_photo = ImageTk.PhotoImage(third_image)
+
+    # Create sub-frames for left (image) and right (caption)
+    third_image_caption_frame = tk.Frame(video_frame)
+    third_image_caption_frame.pack(side="top", fill="x", padx=10, pady=10)
+
+    third_image_label = tk.Label(third_image_caption_frame, image=third_photo, cursor="hand2")
+    third_image_label.image = third_photo  # Keep a reference to avoid garbage collection
+    third_image_label.pack(side="left", padx=10)
+    third_image_label.bind("<Button-1>", lambda e: webbrowser.open("https://www.yout-ube.com/watch?v=qEAvf2agY-A"))
+
+    # Add the caption to the right of the image
+    third_caption = """A demonstration of how Revenera's Token Based Licensing Service can be directly integrated with Salesforce.com"""
+    third_caption_label = ttk.Label(third_image_caption_frame, text=third_caption, font=("Verdana", 11, "normal"), wraplength=625, justify="left")
+    third_caption_label.pack(side="left", padx=10)
 
-start_date_label = ttk.Label(start_date_frame, text=get_default_date(), font=("Arial", 10, "normal"), width=15)
-start_date_label.pack(side="left", padx=23)
+############################################################################################################
+# Manage Rate Table Tab
+############################################################################################################
+def build_rate_table_tab():
+    global filter_var, increment_version_button, date_button, post_site_button, batch_publish_button, clear_editor_button
+    global main_text_area, editor_frame, editor_series_var, editor_version_var, editor_start_var, item_grid, result_label
+
+    # Radio Buttons for Environment Selection
+    radio_frame = tk.Frame(rate_table_tab)
+    radio_frame.pack(side="top", anchor="nw", pady=30)
+    tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
+    tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
+
+    # Tenant label
+    ttk.Label(rate_table_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
+
+    # Buttons for Rate Table Actions
+    button_width = 23
+
+    # Add a new button to get filtered rate tables
+    filter_var = tk.BooleanVar()
+    ttk.Button(rate_table_tab, text="Get Current/Future Tables", command=lambda:get_rate_tables(filtered=True), padding=(5, 7), width=button_width).place(x=10, y=120)
+    ttk.Button(rate_table_tab, text="Get All Rate Tables", command=get_rate_tables, padding=(5, 7), width=button_width).place(x=10, y=170)
+    increment_version_button = ttk.Button(rate_table_tab, text="Increment Series Version", command=increment_version, padding=(5, 7), width=button_width, state=tk.DISABLED)
+    increment_version_button.place(x=10, y=220)
+    date_button = ttk.Button(rate_table_tab, text="Select New Start Date", command=rate_table_start_date, padding=(5, 7), width=button_width, state=tk.DISABLED)
+    date_button.place(x=10, y=270)
+    post_site_button = ttk.Button(rate_table_tab, text="Post New Rate Table", command=post_to_site, padding=(5, 7), width=button_width, state=tk.DISABLED)
+    post_site_button.place(x=10, y=320)
+    batch_publish_button = ttk.Button(rate_table_tab, text="Batch Publish Tables", command=batch_publish, padding=(5, 7), width=button_width)
+    batch_publish_button.place(x=10, y=370)
+
+    clear_editor_button = ttk.Button(rate_table_tab, text="Clear Editor", command=clear_editor, padding=(5, 7), width=button_width, state=tk.DISABLED)
+    clear_editor_button.place(x=config.get('clear_edit_button_x',875), y=120)
+
+    # Text Area for Rate Table
+    main_text_area = Text(rate_table_tab, wrap="word", height=20, width=config.get('rate_table_editor_width', 70))
+    main_text_area.pack(padx=config.get('rate_table_editor_padding',230))
+
+    # Call the function AFTER main_text_area is initialized
+    load_welcome_message()
+
+    # Grid editor for the rate table, shown in place of the welcome message once a rate table is copied
+    editor_frame = ttk.Frame(rate_table_tab)
+    editor_header_frame = ttk.Frame(editor_frame)
+    editor_header_frame.pack(side="top", fill="x", pady=5)
+    editor_series_var = tk.StringVar()
+    editor_version_var = tk.StringVar()
+    editor_start_var = tk.StringVar()
+    ttk.Label(editor_header_frame, text="Series Name:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="w", padx=5, pady=2)
+    ttk.Entry(editor_header_frame, textvariable=editor_series_var, width=40).grid(row=0, column=1, sticky="w", padx=5, pady=2)
+    ttk.Label(editor_header_frame, text="Series Version:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w", padx=5, pady=2)
+    ttk.Entry(editor_header_frame, textvariable=editor_version_var, width=10).grid(row=1, column=1, sticky="w", padx=5, pady=2)
+    ttk.Label(editor_header_frame, text="Start Date:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="w", padx=5, pady=2)
+    ttk.Label(editor_header_frame, textvariable=editor_start_var).grid(row=2, column=1, sticky="w", padx=5, pady=2)
+    editor_series_var.trace_add("write", on_editor_header_changed)
+    editor_version_var.trace_add("write", on_editor_header_changed)
+
+    item_grid_frame = ttk.Frame(editor_frame)
+    item_grid_frame.pack(side="top", fill="both", expand=True)
+    item_grid = ttk.Treeview(item_grid_frame, columns=ITEM_GRID_COLUMNS, show="headings", height=12)
+    for column, heading, width in zip(ITEM_GRID_COLUMNS, ("Item Name", "Version", "Rate"), (300, 100, 140)):
+        item_grid.heading(column, text=heading, anchor="w")
+        item_grid.column(column, width=width, anchor="w")
+    item_grid_scrollbar = ttk.Scrollbar(item_grid_frame, orient="vertical", command=item_grid.yview)
+    item_grid.configure(yscrollcommand=item_grid_scrollbar.set)
+    item_grid.pack(side="left", fill="both", expand=True)
+    item_grid_scrollbar.pack(side="right", fill="y")
+    item_grid.bind("<Double-1>", on_item_grid_double_click)
+
+    item_button_frame = ttk.Frame(editor_frame)
+    item_button_frame.pack(side="top", fill="x", pady=5)
+    ttk.Button(item_button_frame, text="Add Item", command=add_rate_table_item).pack(side="left", padx=5)
+    ttk.Button(item_button_frame, text="Delete Selected Items", command=delete_rate_table_items).pack(side="left", padx=5)
+    ttk.Label(item_button_frame, text="Double-click a cell to edit it").pack(side="right", padx=5)
+
+    # Result Label
+    result_label = tk.Label(rate_table_tab, text="", font=("Arial", 10, "bold"))
+    result_label.pack(pady=10)
+
+    # Create a frame for bottom buttons
+    bottom_frame_rate_table_tab = ttk.Frame(rate_table_tab)
+    bottom_frame_rate_table_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
+
+    # User Guide and API Reference Buttons
+    dmug_button = Button(
+                bottom_frame_rate_table_tab, 
+                text="Dynamic Monetization User Guide", 
+                command=open_user_guide,
+                bootstyle="success",
+                padding=(5,7),
+                width=30
+                )
+    dmug_button.pack(side="left", padx=10, pady=10)
+    apiref_button = Button(
+                bottom_frame_rate_table_tab, 
+                text="Dynamic Monetization API Reference", 
+                command=open_api_ref,
+                bootstyle="success",
+                padding=(5,7),
+                width=33
+                )
+    apiref_button.pack(side="left", padx=10, pady=10)
 
-start_date_btn = ttk.Button(start_date_frame, text="Pick Date", command=lambda: open_calendar(start_date_label), width=10)
-start_date_btn.pack(side="left", padx=5)
+    # Place the "Exit" button on the bottom right
+    exit_button1 = ttk.Button(bottom_frame_rate_table_tab, text="Exit", command=quit_application, padding=(20, 5))
+    exit_button1.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
 
-end_date_frame = tk.Frame(customer_entitlements_tab)
-end_date_frame.place(x=30, y=380) 
+############################################################################################################
+# New Customer Registation Tab
+############################################################################################################
+def build_customer_entitlements_tab():
+    global customer_id_entry, customer_name_entry, rate_table_var, rate_table_dropdown, token_number_entry
+    global start_date_label, start_date_btn, end_date_label, end_date_btn, permanent_var, generate_button, map_label, bulk_import_button
 
-ttk.Label(end_date_frame, text="End Date:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
+    bottom_frame_customer_entitlements_tab = ttk.Frame(customer_entitlements_tab)
+    bottom_frame_customer_entitlements_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
+    bulk_import_button = ttk.Button(bottom_frame_customer_entitlements_tab, text="Bulk Import from File", command=bulk_import, padding=(5, 7), width=28)
+    bulk_import_button.pack(side="left", padx=10, pady=10)
+    exit_button2 = ttk.Button(bottom_frame_customer_entitlements_tab, text="Exit", command=quit_application, padding=(20, 5))
+    exit_button2.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
 
-end_date_label = ttk.Label(end_date_frame, text="Select End Date", font=("Arial", 10, "normal"), width=15)
-end_date_label.pack(side="left", padx=28)
+    # Tenant label (Upper Left at x=30, y=10)
+    ttk.Label(customer_entitlements_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
 
-end_date_btn = ttk.Button(end_date_frame, text="Pick Date", command=lambda: open_calendar(end_date_label), width=10)
-end_date_btn.pack(side="left")
+    # Radio Buttons for Environment Selection (Moved to x=30, y=40, Left Side)
+    radio_frame = tk.Frame(customer_entitlements_tab)
+    radio_frame.pack(side="top", anchor="nw", pady=30)
 
-permanent_var = tk.BooleanVar()
-permanent_checkbox = ttk.Checkbutton(end_date_frame, text="Permanent", variable=permanent_var, command=toggle_permanent)
-permanent_checkbox.pack(side="left", padx=40)
+    tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
+    tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
 
-create_frame = tk.Frame(customer_entitlements_tab)
-create_frame.place(x=30, y=470)
+    # Create a frame for better layout management
+    customer_frame = tk.Frame(customer_entitlements_tab)
+    customer_frame.place(x=30, y=150)  # Position below the environment selection
 
-generate_button = ttk.Button(create_frame, text="Create & Entitle Customer", command=create_and_map_customer, padding=(5, 7), width=28)
-generate_button.pack(padx=10, pady=70)
+    # Customer ID Label and Entry (Left side)
+    ttk.Label(customer_frame, text="Customer ID:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
+    customer_id_entry = ttk.Entry(customer_frame, width=25)
+    customer_id_entry.pack(side="left", padx=5)
+    customer_id_entry.bind("<KeyRelease>", on_customer_id_change)
 
-map_label = ttk.Label(create_frame, text="", wraplength=400)
-map_label.pack()
+    # Customer Name Label and Entry (Right of Customer ID)
+    ttk.Label(customer_frame, text="Customer Name:", font=("Arial", 10, "normal")).pack(side="left", padx=20)
+    customer_name_entry = ttk.Entry(customer_frame, width=24)
+    customer_name_entry.pack(side="left", padx=6)
 
-############################################################################################################
-# Existing Customer Entitlements Tab
-############################################################################################################
+    # Create extra frame for better layout management
+    entry_frame = tk.Frame(customer_entitlements_tab)
+    entry_frame.place(x=30, y=220) 
 
-# Tenant label (Upper Left at x=30, y=10)
-ttk.Label(existing_customer_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
+    ttk.Label(entry_frame, text="Rate Table:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
+    rate_table_var = tk.StringVar()
 
-# Radio Buttons for Environment Selection (Updated)
-radio_frame = tk.Frame(existing_customer_tab)
-radio_frame.pack(side="top", anchor="nw", pady=30)
+    rate_table_list = []
+    rate_table_dropdown = ttk.Combobox(entry_frame, textvariable=rate_table_var, values=rate_table_list, width=23)
+    rate_table_dropdown.state(['readonly'])
+    rate_table_dropdown.pack(side="left", padx=20)
+    ttk.Label(entry_frame, text="Number of Tokens:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
 
-tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
-tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
+    vcmd = (entry_frame.register(validate_token_input), "%P")
 
-# UI Components for "Manage Existing Customer" tab
+    token_number_entry = ttk.Entry(entry_frame, width=22, font=("Arial", 10, "normal"), validate="key", validatecommand=vcmd)
+    token_number_entry.pack(side="left", padx=3)
 
-# Bind the function to tab selection
-notebook.bind("<<NotebookTabChanged>>", tab_selected_changed)
+    start_date_frame = tk.Frame(customer_entitlements_tab)
+    start_date_frame.place(x=30, y=300) 
 
-# Load customers and update UI
-ttk.Label(existing_customer_tab, text="Select Customer (Account ID):", font=FONT).pack()
-customer_data = load_customer_names()
-selected_account_var = tk.StringVar(existing_customer_tab)
+    ttk.Label(start_date_frame, text="Start Date:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
 
-if customer_data:
-    selected_account_var.set(customer_data[0]["accountId"])
-customer_dropdown = ttk.Combobox(existing_customer_tab, textvariable=selected_account_var,
-                                 values=[c["accountId"] for c in customer_data], width=40, state='readonly', height=70)
-customer_dropdown.bind("<<ComboboxSelected>>", lambda event: get_customer_line_items())
-customer_dropdown.pack()
+    start_date_label = ttk.Label(start_date_frame, text=get_default_date(), font=("Arial", 10, "normal"), width=15)
+    start_date_label.pack(side="left", padx=23)
 
-# Create a style for the Treeview heading to make it bold
-style = ttk.Style()
-style.configure("Treeview.Heading", font=("Arial", 10, "bold"), anchor="w", padding=[ 0, 20])
+    start_date_btn = ttk.Button(start_date_frame, text="Pick Date", command=lambda: open_calendar(start_date_label), width=10)
+    start_date_btn.pack(side="left", padx=5)
 
-# Creating the Treeview Widget with bold headings
-columns = ("Start Date", "End Date", "Quantity", "Used", "% Used", "Rate Table Series", "State")
-line_items_table = ttk.Treeview(existing_customer_tab, columns=columns, show="headings", height=15, style="Treeview")
+    end_date_frame = tk.Frame(customer_entitlements_tab)
+    end_date_frame.place(x=30, y=380) 
 
-line_items_table.bind("<<TreeviewSelect>>", on_table_select)
-line_items_table.bind("<Double-1>", lambda event: edit_line_item())  # Bind double-click event to edit_line_item
+    ttk.Label(end_date_frame, text="End Date:", font=("Arial", 10, "normal")).pack(side="left", padx=5)
 
-# Define column headings
-for col in columns:
-    line_items_table.heading(col, text=col, anchor="w")  # Align left
-    line_items_table.column(col, width=120, anchor="w", stretch=True)  # Align left and allow stretching
+    end_date_label = ttk.Label(end_date_frame, text="Select End Date", font=("Arial", 10, "normal"), width=15)
+    end_date_label.pack(side="left", padx=28)
 
-line_items_table.pack(fill="both", expand=True, pady=20)
+    end_date_btn = ttk.Button(end_date_frame, text="Pick Date", command=lambda: open_calendar(end_date_label), width=10)
+    end_date_btn.pack(side="left")
 
-button_frame = tk.Frame(existing_customer_tab)
-button_frame.pack(side="left", pady=10)
+    permanent_var = tk.BooleanVar()
+    permanent_checkbox = ttk.Checkbutton(end_date_frame, text="Permanent", variable=permanent_var, command=toggle_permanent)
+    permanent_checkbox.pack(side="left", padx=40)
 
-edit_customer_id = tk.StringVar(button_frame)
-edit_button = ttk.Button(button_frame, text="Edit Line Item", command=edit_line_item, state=tk.DISABLED)
-edit_button.pack(side="left", padx=10)
+    create_frame = tk.Frame(customer_entitlements_tab)
+    create_frame.place(x=30, y=470)
 
-# Add email button
-if config.get("email_enabled", True): 
-    email_button = ttk.Button(button_frame, text="Email Line Item", command=email_line_item, state=tk.DISABLED)
-    email_button.pack(side="left", padx=10)
+    generate_button = ttk.Button(create_frame, text="Create & Entitle Customer", command=create_and_map_customer, padding=(5, 7), width=28)
+    generate_button.pack(padx=10, pady=70)
 
-# Add Delete button 
-delete_button = Button(
-            button_frame, 
-            text="Delete Line Item", 
-            command=delete_line_item,
-            state=tk.DISABLED, 
-            bootstyle="danger"
-            )
-delete_button.pack(side="left", padx=10)
+    map_label = ttk.Label(create_frame, text="", wraplength=400)
+    map_label.pack()
 
-# Add customer ID label to the right of the Delete Line Item button
-customer_id_label = ttk.Label(button_frame, text="Instance ID: ", font=("Arial", 10, "normal"))
-customer_id_label.pack(side="left", padx=20)
+############################################################################################################
+# Existing Customer Entitlements Tab
+############################################################################################################
+def build_existing_customer_tab():
+    global selected_account_var, customer_dropdown, line_items_table, edit_customer_id
+    global edit_button, email_button, delete_button, refresh_line_items_button, customer_id_label, copy_button
+
+    bottom_frame_existing_customer_tab = ttk.Frame(existing_customer_tab)
+    bottom_frame_existing_customer_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
+    exit_button3 = ttk.Button(bottom_frame_existing_customer_tab, text="Exit", command=quit_application, padding=(20, 5))
+    exit_button3.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
+
+    # Tenant label (Upper Left at x=30, y=10)
+    ttk.Label(existing_customer_tab, text=f"Tenant: {config['site']}", font=("Arial", 10, "bold")).place(x=30, y=8)
+
+    # Radio Buttons for Environment Selection (Updated)
+    radio_frame = tk.Frame(existing_customer_tab)
+    radio_frame.pack(side="top", anchor="nw", pady=30)
+
+    tk.Radiobutton(radio_frame, text="Production", variable=env_var, value="Production", command=on_env_change).pack(side="left", padx=10)
+    tk.Radiobutton(radio_frame, text="UAT", variable=env_var, value=UAT_OPTION, command=on_env_change).pack(side="left", padx=10)
+
+    # UI Components for "Manage Existing Customer" tab
+
+    # Load customers and update UI
+    ttk.Label(existing_customer_tab, text="Select Customer (Account ID):", font=FONT).pack()
+    selected_account_var = tk.StringVar(existing_customer_tab)
+
+    # Filled from the customer list cache when the tab is selected. Typing narrows the list, Enter selects.
+    customer_dropdown = ttk.Combobox(existing_customer_tab, textvariable=selected_account_var,
+                                     values=[], width=40, height=70)
+    customer_dropdown.bind("<<ComboboxSelected>>", lambda event: get_customer_line_items())
+    customer_dropdown.bind("<KeyRelease>", on_customer_typed)
+    customer_dropdown.bind("<Return>", on_customer_entered)
+    customer_dropdown.pack()
+
+    # Creating the Treeview Widget with bold headings
+    columns = ("Start Date", "End Date", "Quantity", "Used", "% Used", "Rate Table Series", "State")
+    line_items_table = ttk.Treeview(existing_customer_tab, columns=columns, show="headings", height=15, style="Treeview")
+
+    line_items_table.bind("<<TreeviewSelect>>", on_table_select)
+    line_items_table.bind("<Double-1>", lambda event: edit_line_item())  # Bind double-click event to edit_line_item
+
+    # Define column headings
+    for col in columns:
+        line_items_table.heading(col, text=col, anchor="w")  # Align left
+        line_items_table.column(col, width=120, anchor="w", stretch=True)  # Align left and allow stretching
+
+    line_items_table.pack(fill="both", expand=True, pady=20)
+
+    button_frame = tk.Frame(existing_customer_tab)
+    button_frame.pack(side="left", pady=10)
+
+    edit_customer_id = tk.StringVar(button_frame)
+    edit_button = ttk.Button(button_frame, text="Edit Line Item", command=edit_line_item, state=tk.DISABLED)
+    edit_button.pack(side="left", padx=10)
+
+    # Add email button
+    if config.get("email_enabled", True): 
+        email_button = ttk.Button(button_frame, text="Email Line Item", command=email_line_item, state=tk.DISABLED)
+        email_button.pack(side="left", padx=10)
+
+    # Add Delete button 
+    delete_button = Button(
+                button_frame, 
+                text="Delete Line Item", 
+                command=delete_line_item,
+                state=tk.DISABLED, 
+                bootstyle="danger"
+                )
+    delete_button.pack(side="left", padx=10)
 
-# Add copy button to the right of the Elastic Instance ID display
-def copy_to_clipboard():
-    root.clipboard_clear()
-    root.clipboard_append(edit_customer_id.get())
-    root.update()  # Now it stays on the clipboard after the window is closed
-    messagebox.showinfo("Copied", "Elastic Instance ID copied to clipboard")
+    # Add Refresh button, line items are otherwise served from the cache
+    refresh_line_items_button = ttk.Button(button_frame, text="Refresh", command=lambda: get_customer_line_items(refresh=True))
+    refresh_line_items_button.pack(side="left", padx=10)
 
-copy_button = ttk.Button(button_frame, text="Copy", command=copy_to_clipboard, width=7)
-copy_button.pack(side="right", padx=10)
+    # Add customer ID label to the right of the Delete Line Item button
+    customer_id_label = ttk.Label(button_frame, text="Instance ID: ", font=("Arial", 10, "normal"))
+    customer_id_label.pack(side="left", padx=20)
 
-# Fetch and display logo
-response = requests.get(config['logo_url'])
-if response.status_code == 200:
-    image_data = Image.open(BytesIO(response.content)).resize((250, 56), Image.Resampling.LANCZOS)
-    logo_image = ImageTk.PhotoImage(image_data)
-    tk.Label(rate_table_tab, image=logo_image).place(relx=0.95, y=10, anchor="ne")
-    tk.Label(customer_entitlements_tab, image=logo_image).place(relx=0.95, y=10, anchor="ne")
-    tk.Label(existing_customer_tab, image=logo_image).place(relx=0.95, y=10, anchor="ne")
-    tk.Label(reporting_tab, image=logo_image).place(relx=0.95, y=10, anchor="ne")    
+    copy_button = ttk.Button(button_frame, text="Copy", command=copy_to_clipboard, width=7)
+    copy_button.pack(side="right", padx=10)
 
 ############################################################################################################
 # Reporting Tab
 ############################################################################################################
-notebook.add(reporting_tab, text="Reporting", padding=5)
-# Add Open Reporter button
-reporting_frame = ttk.Frame(reporting_tab)
-reporting_frame.pack(expand=True, fill="both")
-
-# Load and display Reporting Icon
-report_image_path = r"./static/Reporter_icon.png"
-report_image = Image.open(report_image_path)
-report_image = ImageTk.PhotoImage(report_image)
-
-report_label = tk.Label(reporting_frame, image=report_image, cursor="hand2")
-report_label.image = report_image  # Keep a reference to avoid garbage collection
-report_label.pack(pady=70)
-
-reporting_button = Button(reporting_frame, text="Open Reporting Dashboard", command=start_reporting)
-reporting_button.pack()
+def build_reporting_tab():
+    from PIL import Image, ImageTk  # Loaded on first use to keep startup fast
+
+    bottom_frame_reporter_tab = ttk.Frame(reporting_tab)
+    bottom_frame_reporter_tab.pack(side="bottom", fill="x", pady=10)  # Anchors to bottom with padding
+    exit_button4 = ttk.Button(bottom_frame_reporter_tab, text="Exit", command=quit_application, padding=(20, 5))
+    exit_button4.pack(side="right", padx=10, pady=5)  # Aligns it to the bottom-right
+
+    # Add Open Reporter button
+    reporting_frame = ttk.Frame(reporting_tab)
+    reporting_frame.pack(expand=True, fill="both")
+
+    # Load and display Reporting Icon
+    report_image_path = r"./static/Reporter_icon.png"
+    report_image = Image.open(report_image_path)
+    report_image = ImageTk.PhotoImage(report_image)
+
+    report_label = tk.Label(reporting_frame, image=report_image, cursor="hand2")
+    report_label.image = report_image  # Keep a reference to avoid garbage collection
+    report_label.pack(pady=70)
+
+    reporting_button = Button(reporting_frame, text="Open Reporting Dashboard", command=start_reporting)
+    reporting_button.pack()
+
+def main():
+    """Shows the main window with the Rate Table Editor tab. The other tabs are built when first selected."""
+    global root, x, y, notebook, env_var
+    global rate_table_tab, customer_entitlements_tab, existing_customer_tab, reporting_tab, resources_tab
+
+    # Logging and the exit handler are set up here rather than on import, so importing the module has no side effects
+    setup_logging(LOG_FILE, args.log_level)
+    atexit.register(quit_application)
+    if config:
+        logging.info(f"Configuration loaded: {config_parameter}")
+    else:
+        logging.error(f"Configuration {config_parameter} could not be loaded, the reason was printed to the console")
+    startup_phase("logging")
+
+    # Create the main application window
+    root = ttkb.Window(themename=config.get("theme", "cosmo"))
+    root.title("FlexNet EAST (Elastic Access Standalone Tool)")
+
+    # Set window size and position
+    window_width, window_height = config.get('main_window_width',1100), config.get('main_window_height',800)
+    screen_width, screen_height = root.winfo_screenwidth(), root.winfo_screenheight()
+    x, y = (screen_width - window_width) // 2, (screen_height - window_height) // 2
+    root.geometry(f"{window_width}x{window_height}+{x}+{y-40}")
+    root.iconbitmap(ICON)  
+
+    # Create a style for the Treeview heading to make it bold
+    style = ttk.Style()
+    style.configure("Treeview.Heading", font=("Arial", 10, "bold"), anchor="w", padding=[ 0, 20])
+
+    # Create a Notebook (Tabbed Interface)
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill="both")
+
+    # Create "Rate Table Generator" tab
+    rate_table_tab = ttk.Frame(notebook)
+    notebook.add(rate_table_tab, text="Rate Table Editor", padding= 5)
+
+    # Create "Customer Entitlements" tab
+    customer_entitlements_tab = ttk.Frame(notebook)
+    notebook.add(customer_entitlements_tab, text="Entitle New & Existing Customers", padding= 5)
+
+    # Create "Manage Existing Customers" tab
+    existing_customer_tab = ttk.Frame(notebook)
+    notebook.add(existing_customer_tab, text="Manage Customer Entitlements", padding=5)
+
+    # Create "Reporting" tab
+    reporting_tab = ttk.Frame(notebook)
+    notebook.add(reporting_tab, text="Reporting", padding=5)
+
+    # Create "Resources" tab
+    resources_tab = ttk.Frame(notebook)
+    notebook.add(resources_tab, text="Additional Resources", padding=5)
+
+    # UI Components for "Rate Table Generator" tab
+    env_var = tk.StringVar(value=UAT_OPTION)
+
+    tab_builders.update({
+        str(rate_table_tab): build_rate_table_tab,
+        str(customer_entitlements_tab): build_customer_entitlements_tab,
+        str(existing_customer_tab): build_existing_customer_tab,
+        str(reporting_tab): build_reporting_tab,
+        str(resources_tab): build_resources_tab
+    })
+    LOGO_TABS.extend(str(tab) for tab in (rate_table_tab, customer_entitlements_tab, existing_customer_tab, reporting_tab))
+    startup_phase("window")
+
+    # Only the tab shown first is built now
+    build_tab(rate_table_tab)
+    startup_phase("rate table tab")
+
+    # Bind the function to tab selection
+    notebook.bind("<<NotebookTabChanged>>", tab_selected_changed)
+
+    # Deliver background API results on the Tk thread, then finish startup once the window is drawn
+    root.after(API_POLL_INTERVAL, process_api_results)
+    root.after_idle(first_frame_drawn)
 
-# Start the main application
-if __name__ == "__main__":
     logging.info("Application started.")
     try:
         root.mainloop()
     except Exception as e:
-        logging.critical(f"Critical application error: {e}")
\ No newline at end of file
+        logging.critical(f"Critical application error: {e}")
+
+# Start the main application
+if __name__ == "__main__":
+    main()
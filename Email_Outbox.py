@@ -0,0 +1,184 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+SMTP_PORT = 587
+SMTP_TIMEOUT = 30  # Seconds to wait for the SMTP server on each command
+SMTP_IDLE_TIMEOUT = 60  # Seconds the connection is kept open with nothing to send
+MESSAGES_PER_CONNECTION = 100  # Messages sent before reconnecting, servers cap messages per session
+SEND_ATTEMPTS = 3  # Attempts per message, reconnecting after each failure
+RETRY_DELAY = 1  # Seconds before the second attempt, doubled for each further one
+
+logger = logging.getLogger(__name__)
+
+class EmailJob:
+    """An email in the outbox. `status` goes from queued to sent or failed, and `wait()` returns once it has."""
+
+    def __init__(self, message, recipients, label=""):
+        self.message = message
+        self.recipients = recipients
+        self.label = label or ", ".join(recipients)
+        self.status = "queued"
+        self.error = ""
+        self.attempts = 0
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        return self
+
+class EmailOutbox:
+    """Sends queued emails on a background thread over one authenticated SMTP connection.
+
+    The connection is opened for the first message, reused for everything queued after it,
+    and closed after `idle_timeout` seconds without messages. Connection failures, dropped
+    connections and temporary (4xx) replies close the connection and retry the message on a
+    new one. Refused recipients and other permanent (5xx) replies fail the message straight away.
+    """
+
+    def __init__(self, host, from_address, port=SMTP_PORT, username="", password="", starttls=True,
+                 timeout=SMTP_TIMEOUT, idle_timeout=SMTP_IDLE_TIMEOUT, messages_per_connection=MESSAGES_PER_CONNECTION,
+                 attempts=SEND_ATTEMPTS, retry_delay=RETRY_DELAY):
+        self.host = host
+        self.port = port
+        self.from_address = from_address
+        self.username = username or from_address
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.messages_per_connection = messages_per_connection
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self.jobs = queue.Queue()
+        self.server = None
+        self.sent_on_connection = 0
+        self.worker = None
+        self.delivering = None  # Job being sent by the worker
+        self.lock = threading.Lock()
+        self.stats = {"sent": 0, "failed": 0, "connections": 0, "reconnects": 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """Creates an outbox from the email settings in config.json. Raises KeyError for a missing required one."""
+        return cls(
+            config["smtp_server"],
+            config["from_email"],
+            port=config.get("smtp_port", SMTP_PORT),
+            username=config.get("smtp_username", ""),
+            password=config["email_pwd"],
+            starttls=config.get("smtp_starttls", True),
+            timeout=config.get("smtp_timeout", SMTP_TIMEOUT),
+            idle_timeout=config.get("smtp_idle_timeout", SMTP_IDLE_TIMEOUT),
+            attempts=config.get("smtp_send_attempts", SEND_ATTEMPTS)
+        )
+
+    def send(self, message, recipients, label=""):
+        """Queues a message for the recipients, Bcc included, and returns its EmailJob."""
+        job = EmailJob(message, [address for address in recipients if address], label)
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name="email-outbox", daemon=True)
+                self.worker.start()
+        self.jobs.put(job)
+        return job
+
+    def close(self, timeout=None):
+        """Sends what is queued, then closes the connection. Returns the number of messages left unsent."""
+        with self.lock:
+            worker = self.worker
+        if worker is not None and worker.is_alive():
+            self.jobs.put(None)
+            worker.join(timeout)
+        with self.jobs.mutex:
+            unsent = sum(1 for job in self.jobs.queue if job is not None)  # Not the stop marker
+        delivering = self.delivering
+        if delivering is not None and not delivering.done.is_set():
+            unsent += 1
+        return unsent
+
+    def run(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self.disconnect()  # Nothing to send, don't hold the connection
+                continue
+            if job is None:
+                break
+            self.delivering = job
+            self.deliver(job)
+            self.delivering = None
+        self.disconnect()
+
+    def connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.sent_on_connection = 0
+        self.stats["connections"] += 1
+        logger.info(f"Connected to SMTP server {self.host}:{self.port}")
+
+    def disconnect(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+    def deliver(self, job):
+        """Sends one message, reconnecting and retrying on connection and temporary failures."""
+        while True:
+            job.attempts += 1
+            try:
+                if self.server is not None and self.sent_on_connection >= self.messages_per_connection:
+                    self.disconnect()
+                if self.server is None:
+                    self.connect()
+                refused = self.server.send_message(job.message, self.from_address, job.recipients)
+                self.sent_on_connection += 1
+                job.status = "sent"
+                if refused:
+                    job.error = "Refused: " + ", ".join(refused)  # Delivered to the other recipients
+                break
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPAuthenticationError, smtplib.SMTPNotSupportedError) as e:
+                job.status, job.error = "failed", str(e)
+                break
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    job.status, job.error = "failed", str(e)
+                    break
+                error = e
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+            except Exception as e:
+                self.disconnect()  # A message that can't be sent, e.g. a bad header, must not stop the worker
+                job.status, job.error = "failed", str(e)
+                break
+            # The connection is in an unknown state after a failure, start the next attempt on a new one
+            self.disconnect()
+            if job.attempts >= self.attempts:
+                job.status, job.error = "failed", str(error)
+                break
+            self.stats["reconnects"] += 1
+            delay = self.retry_delay * 2 ** (job.attempts - 1)
+            logger.warning(f"Email to {job.label} failed: {error}, retrying in {delay} seconds (attempt {job.attempts}/{self.attempts})")
+            time.sleep(delay)
+
+        self.stats[job.status] += 1
+        if job.status == "sent":
+            logger.info(f"Email to {job.label} sent{f' ({job.error})' if job.error else ''}")
+        else:
+            logger.error(f"Email to {job.label} failed after {job.attempts} attempts: {job.error}")
+        job.done.set()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+REPORTING_APP_URL = "127.0.0.1"
+PORT = 5099
+READY_TIMEOUT = 30  # Seconds to wait for the reporter to answer
+SHUTDOWN_TOKEN_ENV = "REPORTING_SHUTDOWN_TOKEN"
+SHUTDOWN_TOKEN_HEADER = "X-Shutdown-Token"
+DEFAULT_PATH = "/accounts?environment=uat&number_days=7"
+
+def wait_until_ready(base_url, process):
+    """Polls the reporter until it answers or READY_TIMEOUT passes."""
+    deadline = time.time() + READY_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Reporter exited during startup, check reporting_{base_url.rsplit(':', 1)[1]}.log")
+        try:
+            if requests.get(base_url + "/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Reporter did not answer within {READY_TIMEOUT} seconds")
+
+def run_load(base_url, path, total_requests, concurrency):
+    """Sends total_requests GET requests with the given concurrency and returns throughput and latencies."""
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def timed_request(_):
+        start = time.perf_counter()
+        response = session.get(base_url + path, timeout=300)
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_request, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "requests": total_requests,
+        "errors": sum(1 for _, status in results if status != 200),
+        "seconds": round(elapsed, 3),
+        "throughput": round(total_requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1)
+    }
+
+def measure(args, threads):
+    """Starts a reporter with the given number of threads, warms it up and runs the load against it."""
+    base_url = f"http://{REPORTING_APP_URL}:{args.port}"
+    token = secrets.token_urlsafe(32)
+    process = subprocess.Popen(
+        [sys.executable, "Reporting.py", "-config", args.config, "-server", args.server,
+         "-threads", str(threads), "-port", str(args.port), "-no-prewarm"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, **{SHUTDOWN_TOKEN_ENV: token})
+    )
+    try:
+        wait_until_ready(base_url, process)
+        # The first request fills the cache, the load measures serving from it
+        requests.get(base_url + args.path, timeout=600)
+        result = run_load(base_url, args.path, args.requests, args.concurrency)
+        result["threads"] = threads
+        return result
+    finally:
+        try:
+            requests.post(base_url + "/shutdown", headers={SHUTDOWN_TOKEN_HEADER: token}, timeout=2).raise_for_status()
+            process.wait(timeout=15)
+        except (requests.RequestException, subprocess.TimeoutExpired):
+            process.kill()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures how reporter throughput scales with the number of server threads")
+    parser.add_argument('-config', "--config", help="Configuration in config.json to start the reporter with", default='default')
+    parser.add_argument('-server', "--server", choices=["waitress", "flask"], default="waitress")
+    parser.add_argument('-threads', "--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Thread counts to measure")
+    parser.add_argument('-concurrency', "--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument('-requests', "--requests", type=int, default=200, help="Requests sent per thread count")
+    parser.add_argument('-path', "--path", default=DEFAULT_PATH, help="Path and query string to request")
+    parser.add_argument('-port', "--port", type=int, default=PORT, help="Port to run the reporter on")
+    parser.add_argument('-output', "--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'Threads':>8} {'Req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'Errors':>7}")
+    for threads in args.threads:
+        result = measure(args, threads)
+        results.append(result)
+        print(f"{threads:>8} {result['throughput']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} {result['errors']:>7}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
@@ -0,0 +1,34 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_MAX_BYTES = 5 * 1024 * 1024  # Size at which the log file is rotated
+LOG_BACKUP_COUNT = 3  # Rotated files kept next to the current one
+LOG_FORMAT = "%(asctime)s - %(process)d - %(threadName)s - %(levelname)s - %(message)s"
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+def setup_logging(log_file, level="INFO", max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """Routes the root logger through a queue to a size-capped, rotating log file.
+
+    Logging threads only queue their records; a listener thread formats them and does the file
+    I/O. Each process must log to its own file, as rotation can't be shared between processes.
+    Returns the listener, which is stopped and flushed at exit.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Registered before the application's own exit handlers, so it runs after them and keeps their records
+    atexit.register(listener.stop)
+    return listener
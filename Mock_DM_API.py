@@ -0,0 +1,308 @@
+from flask import Flask, request, jsonify
+import argparse
+import bisect
+import logging
+import random
+import threading
+import time
+import uuid
+from Log_Setup import setup_logging, LOG_LEVELS
+
+PORT = 8099
+HOST = "127.0.0.1"
+SERVER_THREADS = 8
+PROVISIONING_PATH = "/dynamicmonetization/provisioning/api/v1.0"
+USAGE_PATH = "/data/api/v1/report/usage"
+INSTANCES = 1000
+LINE_ITEMS = 5  # Per instance
+SERIES = 50
+VERSIONS = 4  # Per series
+TABLE_ITEMS = 10  # Per rate table
+USAGE_RECORDS = 100000
+USAGE_DAYS = 60  # Usage records are spread over this many days before the reference time
+USAGE_PAGE_SIZE = 1000
+ERROR_STATUS = 503
+PERMANENT_EPOCH = 253402300799999
+DAY_MS = 24 * 60 * 60 * 1000
+
+logger = logging.getLogger(__name__)
+
+app = Flask(__name__)
+data_lock = threading.Lock()
+rate_tables = []  # As returned by GET /rate-tables
+instances = []  # Sorted by accountId
+line_items = {}  # Instance id -> {activationId: line item}
+usage_records = []  # Sorted by usageTime
+usage_times = []  # usageTime of usage_records, for bisect
+settings = {
+    "latency_ms": 0,
+    "latency_jitter_ms": 0,
+    "error_rate": 0.0,
+    "error_status": ERROR_STATUS,
+    "usage_page_size": USAGE_PAGE_SIZE,
+    "now_ms": int(time.time() * 1000)  # Reference time of the data and the usage windows, fixed so pages don't shift
+}
+stats = {"requests": 0, "errors_injected": 0}
+stats_lock = threading.Lock()
+
+############################################################################################################
+# Generated Data
+############################################################################################################
+def generate_data(instance_count, line_item_count, series_count, version_count, table_item_count,
+                  usage_count, usage_days, seed, now_ms):
+    """Fills the mock with deterministic data for the given counts, so runs with the same seed can be compared.
+
+    All dates are relative to `now_ms`, the same data is generated for the same seed and reference time.
+    """
+    rng = random.Random(seed)
+    meters = [f"Meter{number}" for number in range(1, 9)]
+
+    rate_tables.clear()
+    for series in range(series_count):
+        for version in range(1, version_count + 1):
+            rate_tables.append({
+                "series": f"Series{series:04d}",
+                "version": str(version),
+                "effectiveFrom": now_ms + (version - version_count + 1) * 30 * DAY_MS,  # One version in the future
+                "items": [
+                    {"name": f"Item{item}", "version": "1.0", "rate": round(rng.uniform(1, 20), 2)}
+                    for item in range(table_item_count)
+                ]
+            })
+
+    instances.clear()
+    line_items.clear()
+    for number in range(instance_count):
+        instance = {"id": str(uuid.UUID(int=rng.getrandbits(128))), "accountId": f"ACCOUNT-{number:07d}", "shortName": f"Customer {number}"}
+        instances.append(instance)
+        items = {}
+        for _ in range(line_item_count):
+            activation_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            quantity = rng.randint(100, 100000)
+            start = now_ms - rng.randint(0, 365) * DAY_MS
+            items[activation_id] = {
+                "activationId": activation_id,
+                "state": "DEPLOYED",
+                "quantity": quantity,
+                "start": start,
+                "end": PERMANENT_EPOCH if rng.random() < 0.3 else start + rng.randint(30, 730) * DAY_MS,
+                "used": round(rng.uniform(0, quantity), 2),
+                "attributes": {"elastic": True, "rateTableSeries": f"Series{rng.randrange(max(series_count, 1)):04d}"}
+            }
+        line_items[instance["id"]] = items
+
+    usage_records.clear()
+    accounts = instances or [{"id": "", "accountId": "ACCOUNT-0000000"}]
+    for _ in range(usage_count):
+        instance = rng.choice(accounts)
+        usage_time = now_ms - rng.randint(0, usage_days * DAY_MS)
+        quantity = rng.randint(1, 10)
+        usage_records.append({
+            "correlationId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "usageTime": usage_time,
+            "writeTime": usage_time + rng.randint(0, 60000),
+            "accountId": instance["accountId"],
+            "consumerId": f"consumer-{rng.randrange(50)}",
+            "consumerType": "DEVICE",
+            "meter": rng.choice(meters),
+            "meterType": "elastic",
+            "meterCost": round(rng.uniform(0.5, 5), 2),
+            "meterQuantity": quantity,
+            "item": f"Item{rng.randrange(max(table_item_count, 1))}",
+            "itemVersion": "1.0",
+            "itemQuantity": quantity,
+            "activationId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "instanceId": instance["id"],
+            "mappedEntitledCount": quantity,
+            "used": round(rng.uniform(0, 50), 2),
+            "sessionId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "sessionState": rng.choice(["ACTIVE", "CLOSED"]),
+            "requestResponse": rng.choice(["200", "200", "200", "409"]),
+            "overdraftCount": 0
+        })
+    usage_records.sort(key=lambda record: record["usageTime"])
+    usage_times[:] = [record["usageTime"] for record in usage_records]
+    logger.info(
+        f"Generated {len(rate_tables)} rate tables, {len(instances)} instances with {line_item_count} line items each "
+        f"and {len(usage_records)} usage records over {usage_days} days"
+    )
+
+############################################################################################################
+# Latency and Error Injection
+############################################################################################################
+@app.before_request
+def simulate_network():
+    """Delays every API request by the configured latency and fails the configured share of them."""
+    if not request.path.startswith((PROVISIONING_PATH, USAGE_PATH)):
+        return None
+    with stats_lock:
+        stats["requests"] += 1
+    delay_ms = settings["latency_ms"] + random.uniform(0, settings["latency_jitter_ms"])
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+    if settings["error_rate"] and random.random() < settings["error_rate"]:
+        with stats_lock:
+            stats["errors_injected"] += 1
+        return jsonify({"error": "Injected error"}), settings["error_status"]
+    return None
+
+############################################################################################################
+# Rate Tables
+############################################################################################################
+@app.route(PROVISIONING_PATH + "/rate-tables", methods=["GET"], strict_slashes=False)
+def get_rate_tables():
+    with data_lock:
+        return jsonify(rate_tables)
+
+@app.route(PROVISIONING_PATH + "/rate-tables", methods=["POST"], strict_slashes=False)
+def post_rate_table():
+    rate_table = request.get_json()
+    with data_lock:
+        if any(table["series"] == rate_table.get("series") and table["version"] == str(rate_table.get("version")) for table in rate_tables):
+            return jsonify({"error": "Rate table already exists"}), 409
+        rate_tables.append(dict(rate_table, version=str(rate_table.get("version"))))
+    return jsonify(rate_table), 201
+
+@app.route(PROVISIONING_PATH + "/rate-tables", methods=["DELETE"], strict_slashes=False)
+def delete_rate_table():
+    series, version = request.args.get("series"), request.args.get("version")
+    with data_lock:
+        remaining = [table for table in rate_tables if not (table["series"] == series and table["version"] == version)]
+        if len(remaining) == len(rate_tables):
+            return jsonify({"error": "Rate table not found"}), 404
+        rate_tables[:] = remaining
+    return "", 204
+
+############################################################################################################
+# Instances and Line Items
+############################################################################################################
+@app.route(PROVISIONING_PATH + "/instances", methods=["GET"], strict_slashes=False)
+def get_instances():
+    """Pages through the instances, or finds those of an account when accountId is given."""
+    size = max(1, request.args.get("size", 20, type=int))
+    page = max(0, request.args.get("page", 0, type=int))
+    with data_lock:
+        matches = instances
+        account_id = request.args.get("accountId")
+        if account_id:
+            matches = [instance for instance in instances if instance["accountId"] == account_id]
+        content = matches[page * size:(page + 1) * size]
+        return jsonify({
+            "content": content,
+            "number": page,
+            "size": size,
+            "totalElements": len(matches),
+            "totalPages": (len(matches) + size - 1) // size
+        })
+
+@app.route(PROVISIONING_PATH + "/instances", methods=["POST"], strict_slashes=False)
+def post_instance():
+    payload = request.get_json()
+    with data_lock:
+        if any(instance["accountId"] == payload.get("accountId") for instance in instances):
+            return jsonify({"error": "Account already registered"}), 409
+        instance = {"id": str(uuid.uuid4()), "accountId": payload.get("accountId"), "shortName": payload.get("shortName")}
+        instances.append(instance)
+        instances.sort(key=lambda entry: entry["accountId"])
+        line_items[instance["id"]] = {}
+    return jsonify(instance), 201
+
+@app.route(PROVISIONING_PATH + "/instances/<instance_id>/line-items", methods=["GET"])
+def get_line_items(instance_id):
+    with data_lock:
+        if instance_id not in line_items:
+            return jsonify({"error": "Instance not found"}), 404
+        return jsonify(list(line_items[instance_id].values()))
+
+@app.route(PROVISIONING_PATH + "/instances/<instance_id>/line-items", methods=["PUT"])
+def put_line_item(instance_id):
+    item = request.get_json(force=True)
+    with data_lock:
+        if instance_id not in line_items:
+            return jsonify({"error": "Instance not found"}), 404
+        created = item.get("activationId") not in line_items[instance_id]
+        line_items[instance_id][item.get("activationId")] = item
+    return jsonify(item), 201 if created else 200
+
+@app.route(PROVISIONING_PATH + "/instances/<instance_id>/line-items/<activation_id>", methods=["DELETE"])
+def delete_line_item(instance_id, activation_id):
+    with data_lock:
+        if line_items.get(instance_id, {}).pop(activation_id, None) is None:
+            return jsonify({"error": "Line item not found"}), 404
+    return "", 204
+
+############################################################################################################
+# Usage
+############################################################################################################
+@app.route(USAGE_PATH, methods=["GET"])
+def get_usage():
+    """Returns one page (numbered from 1) of the usage records of the pastDays before the reference time, oldest first.
+
+    The window doesn't move with the clock, so the pages of a paginated download never shift
+    between requests.
+    """
+    past_days = request.args.get("pastDays", 1, type=int)
+    page = max(1, request.args.get("pageNumber", 1, type=int))
+    size = settings["usage_page_size"]
+    start = bisect.bisect_left(usage_times, settings["now_ms"] - past_days * DAY_MS) + (page - 1) * size
+    return jsonify({"data": usage_records[start:start + size]})
+
+############################################################################################################
+# Status
+############################################################################################################
+@app.route("/health")
+def health():
+    return jsonify({"service": "mock-dm-api", "status": "ok"})
+
+@app.route("/mock/stats")
+def mock_statistics():
+    with stats_lock:
+        current = dict(stats)
+    with data_lock:
+        current.update(rate_tables=len(rate_tables), instances=len(instances), usage_records=len(usage_records))
+    return jsonify(current)
+
+def run_server(port, threads):
+    """Runs the mock on waitress, or on the Flask server when waitress isn't installed."""
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress is not installed, falling back to the Flask server")
+        app.run(debug=False, host=HOST, port=port, threaded=True)
+        return
+    logger.info(f"Serving the mock API with waitress on port {port} with {threads} threads")
+    serve(app, host=HOST, port=port, threads=threads)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the Dynamic Monetization provisioning and usage APIs")
+    parser.add_argument('-port', "--port", type=int, default=PORT)
+    parser.add_argument('-threads', "--threads", type=int, default=SERVER_THREADS, help="Request threads when served by waitress")
+    parser.add_argument('-instances', "--instances", type=int, default=INSTANCES, help="Customer instances")
+    parser.add_argument('-line-items', "--line-items", type=int, default=LINE_ITEMS, help="Line items per instance")
+    parser.add_argument('-series', "--series", type=int, default=SERIES, help="Rate table series")
+    parser.add_argument('-versions', "--versions", type=int, default=VERSIONS, help="Versions per rate table series")
+    parser.add_argument('-table-items', "--table-items", type=int, default=TABLE_ITEMS, help="Items per rate table")
+    parser.add_argument('-usage-records', "--usage-records", type=int, default=USAGE_RECORDS)
+    parser.add_argument('-usage-days', "--usage-days", type=int, default=USAGE_DAYS, help="Days the usage records are spread over")
+    parser.add_argument('-usage-page-size', "--usage-page-size", type=int, default=USAGE_PAGE_SIZE, help="Usage records per page")
+    parser.add_argument('-latency-ms', "--latency-ms", type=float, default=0, help="Delay added to every API request")
+    parser.add_argument('-latency-jitter-ms', "--latency-jitter-ms", type=float, default=0, help="Random extra delay of up to this much")
+    parser.add_argument('-error-rate', "--error-rate", type=float, default=0.0, help="Share of API requests answered with -error-status, 0 to 1")
+    parser.add_argument('-error-status', "--error-status", type=int, default=ERROR_STATUS)
+    parser.add_argument('-seed', "--seed", type=int, default=1, help="Seed of the generated data")
+    parser.add_argument('-now-ms', "--now-ms", type=int, help="Reference time of the data and usage windows as epoch milliseconds, the start time by default")
+    parser.add_argument('-log-level', "--log-level", choices=LOG_LEVELS, default="INFO")
+    args = parser.parse_args()
+
+    setup_logging(f"mock_dm_api_{args.port}.log", args.log_level)
+    settings.update(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        usage_page_size=args.usage_page_size,
+        now_ms=args.now_ms or int(time.time() * 1000)
+    )
+    generate_data(args.instances, args.line_items, args.series, args.versions, args.table_items,
+                  args.usage_records, args.usage_days, args.seed, settings["now_ms"])
+    run_server(args.port, args.threads)
@@ -1,22 +1,109 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 import pandas as pd
-import requests, argparse
+import numpy as np
+import argparse
 import json
 import logging
-from datetime import datetime
+import time
+import math
+import re
+import sqlite3
+import hashlib
+import hmac
+import secrets
+import threading
+import gzip
+import tempfile
+import os
+import signal
+import _thread
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from DM_Client import DMClient
+from Log_Setup import setup_logging, LOG_LEVELS
+try:
+    import orjson  # Optional, faster JSON encoding
+except ImportError:
+    orjson = None
+try:
+    import brotli  # Optional, brotli response compression
+except ImportError:
+    brotli = None
+try:
+    import pyarrow as pa  # Optional, Parquet export
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 PORT = 5000
+HOST = "127.0.0.1"
+SERVER = "waitress"
+SERVER_THREADS = 8
+SERVER_CONNECTION_LIMIT = 100
+MAX_CONCURRENT_BUILDS = 2  # Frames built from the API at the same time, across all request threads
 CONFIG_FILE = "config.json"
-LOG_FILE = "rate_table_editor.log"
-
-# Set up logging
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    filemode='a'  # 'a' for append mode, which adds to existing file
-)
+LOG_FILE = "reporting.log"
+FETCH_MAX_WORKERS = 8
+FETCH_PAGE_RETRIES = 3
+STORE_FILE = "usage_store.db"
+STORE_VERSION = 2  # Stores written with another version are rebuilt
+STORE_SYNC_INTERVAL = 60  # Seconds before the store asks the API for newer records again
+DAY_MS = 24 * 60 * 60 * 1000
+STREAM_CHUNK_SIZE = 5000  # Records per NDJSON line when streaming from the store
+CACHE_TTL = 300  # Seconds a cached result is served as fresh
+CACHE_MAX_ENTRIES = 16
+PREWARM_INTERVAL = 0  # Seconds between pre-warm runs, 0 disables pre-warming. Keep it below CACHE_TTL.
+PREWARM_WINDOWS = [1, 7, 30, 60]  # Days that may be kept warm, 60 is the dashboard default
+PREWARM_ENVIRONMENTS = ["uat", "prod"]
+PREWARM_STAGGER = 5  # Seconds between windows within a run
+SHUTDOWN_TOKEN_ENV = "REPORTING_SHUTDOWN_TOKEN"  # Set by the process starting the reporter, which may then stop it
+SHUTDOWN_TOKEN_HEADER = "X-Shutdown-Token"
+COLUMNAR_MIMETYPE = "application/vnd.revethon.columnar+json"
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/html", "text/csv", COLUMNAR_MIMETYPE)
+EXPORT_CHUNK_ROWS = 5000
+# Column order and headings of the CSV export
+EXPORT_COLUMNS = {
+    "correlationId": "Correlation ID",
+    "usageTime": "Usage Time",
+    "writeTime": "Write Time",
+    "accountId": "Account ID",
+    "consumerId": "Consumer ID",
+    "consumerType": "Consumer Type",
+    "meter": "Meter",
+    "meterType": "Meter Type",
+    "meterCost": "Meter Cost",
+    "meterQuantity": "Meter Quantity",
+    "item": "Item",
+    "itemVersion": "Item Version",
+    "itemQuantity": "Item Quantity",
+    "activationId": "Activation ID",
+    "instanceId": "Instance ID",
+    "mappedEntitledCount": "Mapped Entitled Count",
+    "used": "Tokens Used",
+    "sessionId": "Session ID",
+    "sessionState": "Session State",
+    "requestResponse": "Request Response Code",
+    "overdraftCount": "Overdraft Count",
+}
+BUCKET_FREQUENCIES = {"hour": "h", "day": "D", "week": "W-MON"}
+BUCKET_LABELS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-%m-%d"}
+# Column types of the processed usage frame. Repeated identifiers are held as categoricals.
+USAGE_SCHEMA = {
+    "usageTime": "datetime64[ms]",
+    "used": "float64",
+    "meterQuantity": "float64",
+    "accountId": "category",
+    "consumerId": "category",
+    "consumerType": "category",
+    "meter": "category",
+    "meterType": "category",
+    "item": "category",
+    "itemVersion": "category",
+    "requestResponse": "category",
+    "sessionState": "category",
+}
+
 logger = logging.getLogger(__name__)
 
 def read_config():
@@ -40,52 +127,331 @@ def read_config():
         logger.error(error_msg)
         return error_msg
 
-def fetch_data(number_days, environment):
-    logger.info(f"Fetching data for {number_days} days in {environment} environment")
+def build_usage_url(environment):
+    """Builds the usage report URL for the selected environment. `api_host` in config.json replaces the tenant host."""
+    if config.get("api_host"):
+        return config["api_host"].rstrip("/") + "/data/api/v1/report/usage"
     base_url = f"https://{config['site']}"
     if environment == "uat":
         base_url += "-uat"
-    url = f"{base_url}.flexnetoperations.{config['geo']}/data/api/v1/report/usage"
-    
+    return f"{base_url}.flexnetoperations.{config['geo']}/data/api/v1/report/usage"
+
+def build_usage_headers():
     basic_Auth = config["basic_Auth"]
-    headers = {"Authorization": f"Basic {basic_Auth}", "Content-Type": "application/json"}
-    page_number = 1
-    all_data = []
+    return {"Authorization": f"Basic {basic_Auth}", "Content-Type": "application/json"}
+
+usage_client = None
+usage_client_lock = threading.Lock()
+
+def get_usage_client():
+    """Returns the pooled client shared by all page fetches, sized to the fetch workers."""
+    global usage_client
+    with usage_client_lock:
+        if usage_client is None:
+            pool_size = max(int(config.get("fetch_max_workers", FETCH_MAX_WORKERS)), config.get("http_pool_size", 0))
+            usage_client = DMClient.from_config(config, pool_size=pool_size)
+        return usage_client
+
+def fetch_page(url, headers, number_days, page_number):
+    """Fetches a single page of usage data, retrying only this page on failure."""
     params = {
         "mode": "batch",
         "format": "json",
         "pastDays": number_days,
         "meterType": "elastic",
         "pageNumber": page_number
-        
     }
+    attempts = config.get("fetch_page_retries", FETCH_PAGE_RETRIES)
+    logger.debug("Fetching page %s of data from %s", page_number, url)
     try:
-        logger.info(f"Fetching page {page_number} of data from {url}")
-        response = requests.get(url=url, headers=headers, params=params)
-        if response.status_code in [200, 201]:
-            data = response.json().get("data", [])
-            logger.info(f"Retrieved {len(data)} records from page {page_number}")
-            
-            while data: # Keep fetching data until there is no more data
-                all_data.extend(data)
-                page_number += 1
-                params["pageNumber"] = page_number
-                logger.info(f"Fetching page {page_number} of data")
-                response = requests.get(url=url, headers=headers, params=params)
-                data = response.json().get("data", [])
-                logger.info(f"Retrieved {len(data)} records from page {page_number}")
-                
-            logger.info(f"Total records fetched: {len(all_data)}")
-            return all_data
-        else:
-            logger.error(f"API request failed with status code: {response.status_code}")
-            logger.error(f"Response: {response.text}")
+        response = get_usage_client().get(url, headers=headers, params=params, retries=attempts - 1)
+    except Exception as e:
+        raise RuntimeError(f"Page {page_number} failed: {str(e)}")
+    if response.status_code not in [200, 201]:
+        logger.warning(f"Response: {response.text}")
+        raise RuntimeError(f"Page {page_number} failed with status code {response.status_code}")
+    data = response.json().get("data", [])
+    logger.debug("Retrieved %s records from page %s", len(data), page_number)
+    return data
+
+def iter_usage_pages(number_days, environment):
+    """Yields pages of usage data in page order while fetching several pages concurrently.
+
+    Pages are requested in increasing order with at most `fetch_max_workers` requests in
+    flight. The first empty page marks the end of the data, so at most one window of
+    requests is spent past the last page.
+    """
+    url = build_usage_url(environment)
+    headers = build_usage_headers()
+    max_workers = max(1, int(config.get("fetch_max_workers", FETCH_MAX_WORKERS)))
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch_page")
+    in_flight = {}
+    results = {}
+    next_page = 1
+    next_to_yield = 1
+    end_page = None  # First page known to be empty
+    try:
+        while True:
+            # Keep the window full, but don't run too far ahead of a slow page
+            while (len(in_flight) < max_workers
+                   and (end_page is None or next_page < end_page)
+                   and next_page < next_to_yield + 2 * max_workers):
+                future = executor.submit(fetch_page, url, headers, number_days, next_page)
+                in_flight[future] = next_page
+                next_page += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_number = in_flight.pop(future)
+                data = future.result()
+                if data:
+                    results[page_number] = data
+                elif end_page is None or page_number < end_page:
+                    end_page = page_number
+
+            # Hand back pages in order as soon as they are contiguous
+            while next_to_yield in results and (end_page is None or next_to_yield < end_page):
+                yield results.pop(next_to_yield)
+                next_to_yield += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        get_usage_client().log_stats()
+
+def fetch_data(number_days, environment):
+    logger.info(f"Fetching data for {number_days} days in {environment} environment")
+    all_data = []
+    try:
+        for data in iter_usage_pages(number_days, environment):
+            all_data.extend(data)
+        logger.info(f"Total records fetched: {len(all_data)}")
+        return all_data
     except Exception as e:
         error_msg = f"Error fetching data: {str(e)}"
         logger.error(error_msg)
         print(error_msg)
     return []
 
+############################################################################################################
+# Local Usage Store
+############################################################################################################
+store_locks = {}
+store_locks_guard = threading.Lock()
+
+def store_environment(environment):
+    """Normalizes the environment name used as a store partition."""
+    return "uat" if environment == "uat" else "prod"
+
+def get_store_lock(site, environment):
+    """Returns the lock serializing syncs of one site and environment."""
+    with store_locks_guard:
+        return store_locks.setdefault((site, environment), threading.Lock())
+
+def open_store():
+    """Opens the local usage store, creating the tables on first use.
+
+    A store written with an older STORE_VERSION keyed its records differently, so it is
+    dropped and downloaded again rather than mixed with new records.
+    """
+    connection = sqlite3.connect(config.get("store_file", STORE_FILE), timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("BEGIN IMMEDIATE")  # Other processes may share the file
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version != STORE_VERSION:
+        if version:
+            logger.info(f"Rebuilding usage store version {version} as version {STORE_VERSION}")
+        connection.execute("DROP TABLE IF EXISTS usage")
+        connection.execute("DROP TABLE IF EXISTS sync_state")
+        connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS usage (
+            site TEXT NOT NULL,
+            environment TEXT NOT NULL,
+            record_key TEXT NOT NULL,
+            usage_time INTEGER,
+            write_time INTEGER,
+            record TEXT NOT NULL,
+            PRIMARY KEY (site, environment, record_key)
+        )
+    """)
+    connection.execute("CREATE INDEX IF NOT EXISTS usage_time_index ON usage (site, environment, usage_time)")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            site TEXT NOT NULL,
+            environment TEXT NOT NULL,
+            coverage_start INTEGER,
+            newest_usage_time INTEGER,
+            newest_write_time INTEGER,
+            last_sync REAL,
+            retention_days INTEGER,
+            PRIMARY KEY (site, environment)
+        )
+    """)
+    connection.commit()
+    return connection
+
+def to_epoch_ms(value):
+    """Converts an epoch milliseconds value from the API to an int, or None if missing."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def record_key(record, record_json):
+    """Returns the identity of a usage record in the store.
+
+    Records are identified upstream by their correlation ID and usage time, so a record sent
+    again with a corrected field replaces the copy held. Records without a correlation ID fall
+    back to a hash of their content.
+    """
+    if record.get("correlationId"):
+        return f"{record['correlationId']}/{record.get('usageTime')}"
+    return hashlib.sha1(record_json.encode("utf-8")).hexdigest()
+
+def store_records(connection, site, environment, records):
+    """Inserts usage records, replacing the copies of records already held.
+
+    A record without a usage time is filed under its write time, and one without either is
+    kept out of every window.
+    """
+    rows = []
+    for record in records:
+        record_json = json.dumps(record, sort_keys=True)
+        usage_time = to_epoch_ms(record.get("usageTime"))
+        write_time = to_epoch_ms(record.get("writeTime"))
+        rows.append((
+            site,
+            environment,
+            record_key(record, record_json),
+            usage_time if usage_time is not None else write_time,
+            write_time,
+            record_json
+        ))
+    connection.executemany("INSERT OR REPLACE INTO usage VALUES (?, ?, ?, ?, ?, ?)", rows)
+    connection.commit()
+
+def read_sync_state(connection, site, env):
+    return connection.execute(
+        "SELECT coverage_start, newest_usage_time, last_sync, retention_days FROM sync_state WHERE site = ? AND environment = ?",
+        (site, env)
+    ).fetchone()
+
+def store_covers(connection, number_days, environment):
+    """Returns True if the store already holds the whole window, so a sync only tops it up."""
+    state = read_sync_state(connection, config.get("site", ""), store_environment(environment))
+    window_start = int(time.time() * 1000) - number_days * DAY_MS
+    return bool(state and state[0] is not None and state[0] <= window_start)
+
+def sync_store_pages(connection, number_days, environment):
+    """Brings the store up to date for the requested window, yielding each fetched page once stored.
+
+    If the store already covers the window, only the days since the newest usage time held
+    are fetched again (plus one day of overlap for late writes). A wider window than the store
+    covers is fetched in full once. Errors are logged and raised, leaving the sync state as it was.
+
+    Records older than the widest window served so far are pruned once the sync is done.
+    """
+    site = config.get("site", "")
+    env = store_environment(environment)
+    now_ms = int(time.time() * 1000)
+    window_start = now_ms - number_days * DAY_MS
+
+    with get_store_lock(site, env):
+        state = read_sync_state(connection, site, env)
+
+        if state and state[0] is not None and state[0] <= window_start:
+            coverage_start, newest_usage_time, last_sync, _ = state
+            if time.time() - (last_sync or 0) < config.get("store_sync_interval_seconds", STORE_SYNC_INTERVAL):
+                logger.info(f"Store for {site} {env} is fresh, skipping sync")
+                return
+            if newest_usage_time:
+                past_days = min(number_days, math.ceil((now_ms - newest_usage_time) / DAY_MS) + 1)
+            else:
+                past_days = number_days
+        else:
+            coverage_start = window_start
+            past_days = number_days
+
+        logger.info(f"Syncing store for {site} {env}: fetching {past_days} of {number_days} days")
+        try:
+            for data in iter_usage_pages(past_days, environment):
+                store_records(connection, site, env, data)
+                yield data
+        except Exception as e:
+            logger.error(f"Error syncing store: {str(e)}")
+            raise
+
+        newest_usage_time, newest_write_time = connection.execute(
+            "SELECT MAX(usage_time), MAX(write_time) FROM usage WHERE site = ? AND environment = ?",
+            (site, env)
+        ).fetchone()
+        retention_days = number_days
+        if state and state[0] is not None:
+            coverage_start = min(coverage_start, state[0])
+            retention_days = max(retention_days, state[3] or 0)
+
+        # Nothing older than the widest window served is read again
+        retention_start = now_ms - retention_days * DAY_MS
+        pruned = connection.execute(
+            "DELETE FROM usage WHERE site = ? AND environment = ? AND usage_time < ?",
+            (site, env, retention_start)
+        ).rowcount
+        if pruned:
+            logger.info(f"Pruned {pruned} records older than {retention_days} days from the store for {site} {env}")
+        connection.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (site, env, max(coverage_start, retention_start), newest_usage_time, newest_write_time, time.time(), retention_days)
+        )
+        connection.commit()
+
+def sync_store(connection, number_days, environment):
+    """Brings the store up to date for the requested window. Errors leave the store as it was."""
+    try:
+        for _ in sync_store_pages(connection, number_days, environment):
+            pass
+    except Exception:
+        pass  # Already logged, the store answers with what it holds
+
+def query_window(connection, number_days, environment):
+    """Returns a cursor over the stored records of the last number_days, oldest first."""
+    window_start = int(time.time() * 1000) - number_days * DAY_MS
+    return connection.execute(
+        "SELECT record FROM usage WHERE site = ? AND environment = ? AND usage_time >= ? ORDER BY usage_time",
+        (config.get("site", ""), store_environment(environment), window_start)
+    )
+
+def load_usage(number_days, environment):
+    """Returns the usage records of the last number_days, answered from the local store."""
+    connection = open_store()
+    try:
+        sync_store(connection, number_days, environment)
+        rows = query_window(connection, number_days, environment).fetchall()
+    finally:
+        connection.close()
+    logger.info(f"Loaded {len(rows)} records from store for {config.get('site', '')} {store_environment(environment)}")
+    return [json.loads(row[0]) for row in rows]
+
+def iter_usage_records(number_days, environment):
+    """Yields the usage records of a window in chunks as soon as they are available.
+
+    When the store has to download the whole window, the chunks are the upstream pages as they
+    arrive. Otherwise the store is topped up and its records are read back in chunks.
+    """
+    connection = open_store()
+    try:
+        if store_covers(connection, number_days, environment):
+            sync_store(connection, number_days, environment)
+            cursor = query_window(connection, number_days, environment)
+            rows = cursor.fetchmany(STREAM_CHUNK_SIZE)
+            while rows:
+                yield [json.loads(row[0]) for row in rows]
+                rows = cursor.fetchmany(STREAM_CHUNK_SIZE)
+        else:
+            yield from sync_store_pages(connection, number_days, environment)
+    finally:
+        connection.close()
+
 app = Flask(__name__)
 
 @app.route('/')
@@ -93,53 +459,652 @@ def index():
     logger.info("Main page accessed")
     return render_template('index.html')
 
+def ingest_usage_records(records):
+    """Builds a typed usage frame from API records following USAGE_SCHEMA.
+
+    usageTime becomes a native timestamp (missing values map to the epoch, as before) and the
+    frame is sorted on it. Numeric columns are rounded to two decimals with missing values as 0.
+    """
+    df = pd.DataFrame.from_records(records)
+    if df.empty:
+        return df
+
+    for column, dtype in USAGE_SCHEMA.items():
+        if column not in df:
+            continue
+        if dtype == "category":
+            df[column] = df[column].astype("category")
+        elif dtype == "float64":
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).round(2).astype(dtype)
+        else:
+            epoch_ms = pd.to_numeric(df[column], errors='coerce').fillna(0).astype("int64")
+            df[column] = epoch_ms.to_numpy().astype(dtype)
+
+    if "usageTime" in df:
+        df = df.sort_values(by="usageTime", ascending=True, kind="stable", ignore_index=True)
+    return df
+
+def format_usage_time(timestamps):
+    """Formats native timestamps as 'YYYY-MM-DD HH:MM:SS.mmm' strings for the dashboard."""
+    formatted = np.datetime_as_string(timestamps.to_numpy().astype("datetime64[ms]"), unit="ms")
+    return pd.Series(np.char.replace(formatted, "T", " "), index=timestamps.index)
+
+def frame_to_records(df):
+    """Serializes a processed usage frame to the record list sent to the dashboard."""
+    if "usageTime" in df:
+        df = df.assign(usageTime=format_usage_time(df["usageTime"]))
+    return df.to_dict(orient='records')
+
+def column_values(series):
+    """Returns a column as a list with missing values as None."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+def frame_to_columns(df):
+    """Serializes a processed usage frame column by column.
+
+    Each column becomes one array. Categorical columns are sent as a shared dictionary of values
+    plus one integer code per row (-1 for a missing value), so repeated IDs are sent only once.
+    """
+    columns = {}
+    for column in df.columns:
+        series = format_usage_time(df[column]) if column == "usageTime" else df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = {
+                'dictionary': column_values(pd.Series(series.cat.categories)),
+                'codes': series.cat.codes.tolist()
+            }
+        else:
+            columns[column] = column_values(series)
+    return {'length': len(df), 'columns': columns}
+
+def dumps_json(payload):
+    """Encodes a payload as JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+def json_response(payload, mimetype="application/json"):
+    """Builds a JSON response, logging how long serialization took and the payload size."""
+    start = time.perf_counter()
+    body = dumps_json(payload)
+    serialize_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Serialized {len(body)} bytes as {mimetype} in {serialize_ms:.1f} ms")
+    response = Response(body, mimetype=mimetype)
+    response.headers["X-Serialize-Time-Ms"] = f"{serialize_ms:.1f}"
+    response.headers["X-Payload-Bytes"] = str(len(body))
+    return response
+
+build_slots = threading.BoundedSemaphore(MAX_CONCURRENT_BUILDS)
+shutdown_event = threading.Event()
+started_at = time.time()
+# Without a token from the parent nobody can know it, and the reporter is only stopped with SIGTERM
+shutdown_token = os.environ.get(SHUTDOWN_TOKEN_ENV) or secrets.token_urlsafe(32)
+
+def build_usage_frame(number_days, environment):
+    """Loads the usage records for a window and transforms them for the dashboard.
+
+    At most `max_concurrent_builds` frames are built at once so a burst of requests doesn't
+    flood the usage API; other requests wait for a free slot.
+    """
+    with build_slots:
+        df = ingest_usage_records(load_usage(number_days, environment))
+    if not df.empty:
+        logger.info(f"Processed {len(df)} records")
+    else:
+        logger.warning("No data returned from API")
+    return df
+
+############################################################################################################
+# Response Cache
+############################################################################################################
+usage_cache = OrderedDict()  # (environment, number_days) -> (created, frame), least recently used first
+usage_cache_lock = threading.Lock()
+cache_build_locks = {}
+cache_refreshing = set()
+cache_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0}
+
+def cache_key(environment, number_days):
+    return (store_environment(environment), int(number_days))
+
+def cache_put(key, frame):
+    """Stores a frame in the cache, evicting the least recently used entries past the size limit."""
+    if frame.empty:
+        return  # Don't hold on to a failed or empty fetch
+    with usage_cache_lock:
+        usage_cache[key] = (time.time(), frame)
+        usage_cache.move_to_end(key)
+        while len(usage_cache) > config.get("cache_max_entries", CACHE_MAX_ENTRIES):
+            evicted_key, _ = usage_cache.popitem(last=False)
+            cache_stats["evictions"] += 1
+            logger.info(f"Evicted cache entry {evicted_key}")
+
+def refresh_cache_entry(key):
+    """Rebuilds a stale cache entry in the background.
+
+    Takes the key's build lock, so it doesn't build the window a second time alongside a request
+    that found the entry evicted, or the pre-warm scheduler.
+    """
+    with usage_cache_lock:
+        build_lock = cache_build_locks.setdefault(key, threading.Lock())
+    try:
+        logger.info(f"Refreshing cache entry {key}")
+        with build_lock:
+            cache_put(key, build_usage_frame(key[1], key[0]))
+        with usage_cache_lock:
+            cache_stats["refreshes"] += 1
+    except Exception as e:
+        logger.error(f"Error refreshing cache entry {key}: {str(e)}")
+    finally:
+        with usage_cache_lock:
+            cache_refreshing.discard(key)
+
+def get_usage_frame(number_days, environment):
+    """Returns the processed usage frame for a window, served from the cache when possible.
+
+    Entries older than `cache_ttl_seconds` are still returned straight away while a background
+    thread rebuilds them (stale-while-revalidate).
+    """
+    key = cache_key(environment, number_days)
+    ttl = config.get("cache_ttl_seconds", CACHE_TTL)
+    note_requested(key)
+    with usage_cache_lock:
+        entry = usage_cache.get(key)
+        if entry:
+            usage_cache.move_to_end(key)
+            created, frame = entry
+            if time.time() - created < ttl:
+                cache_stats["hits"] += 1
+                return frame
+            cache_stats["stale_hits"] += 1
+            if key not in cache_refreshing:
+                cache_refreshing.add(key)
+                threading.Thread(target=refresh_cache_entry, args=(key,), daemon=True).start()
+            return frame
+        build_lock = cache_build_locks.setdefault(key, threading.Lock())
+
+    # Only one request builds a missing entry, the others wait for it
+    with build_lock:
+        with usage_cache_lock:
+            entry = usage_cache.get(key)
+            if entry:
+                cache_stats["hits"] += 1
+                return entry[1]
+            cache_stats["misses"] += 1
+        frame = build_usage_frame(number_days, environment)
+        cache_put(key, frame)
+        return frame
+
+def get_cache_stats():
+    """Returns a snapshot of the cache counters."""
+    with usage_cache_lock:
+        stats = dict(cache_stats)
+        stats["entries"] = [list(key) for key in usage_cache]
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 3) if lookups else 0.0
+    return stats
+
+def filter_usage_frame(df, account=None, consumers=None):
+    """Filters a processed usage frame by account and, optionally, a set of consumers."""
+    if df.empty:
+        return df
+    if account:
+        df = df[df["accountId"] == account]
+    if consumers:
+        df = df[df["consumerId"].isin(consumers)]
+    return df
+
 @app.route('/data', methods=['POST'])
 def get_data():
     logger.info("Data endpoint accessed")
-    number_days = request.json.get('number_days', 3)
+    number_days = int(request.json.get('number_days', 3))
     environment = request.json.get('environment', 'uat')
-    logger.info(f"Request parameters: number_days={number_days}, environment={environment}")
-    
-    data = fetch_data(number_days, environment)
-    df = pd.DataFrame(data)
+    account = request.json.get('account')
+    consumers = request.json.get('consumers')
+    logger.info(f"Request parameters: number_days={number_days}, environment={environment}, account={account}")
     
+    df = get_usage_frame(number_days, environment)
     if not df.empty:
-        logger.info(f"Processing {len(df)} records")
-        # Handle empty values in usageTime
-        df["usageTime"] = df["usageTime"].fillna(0)
-        df["usageTime"] = df["usageTime"].astype(float) / 1000
-        df["usageTime"] = df["usageTime"].apply(lambda x: datetime.utcfromtimestamp(x).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3])
-        
-        # Handle empty values in used and meterQuantity
-        df["used"] = pd.to_numeric(df["used"], errors='coerce').fillna(0).round(2)
-        df["meterQuantity"] = pd.to_numeric(df["meterQuantity"], errors='coerce').fillna(0).round(2)
-        
-        df = df.sort_values(by="usageTime", ascending=True)
         account_options = df["accountId"].unique().tolist()
         logger.info(f"Found {len(account_options)} unique accounts")
     else:
-        logger.warning("No data returned from API")
         account_options = []
 
+    # Column-oriented encoding is selected by the Accept header or a format flag
+    columnar = (COLUMNAR_MIMETYPE in request.headers.get('Accept', '')
+                or request.args.get('format') == 'columnar'
+                or request.json.get('format') == 'columnar')
+    df = filter_usage_frame(df, account, consumers)
+
     # Include the site information from config
     response_data = {
         'accounts': account_options, 
-        'data': df.to_dict(orient='records'),
         'site': config.get('site', '')
     }
-    logger.info("Data processed and returned successfully")
-    return jsonify(response_data)
+    if columnar:
+        response_data.update(frame_to_columns(df))
+    else:
+        response_data['data'] = frame_to_records(df)
+    logger.info(f"Data processed and returned successfully. Cache stats: {get_cache_stats()}")
+    return json_response(response_data, COLUMNAR_MIMETYPE if columnar else "application/json")
+
+@app.route('/data/stream')
+def stream_data():
+    """Streams the transformed usage records as newline-delimited JSON as upstream pages arrive.
+
+    Lines are {"type": "meta"}, then any number of {"type": "records"}, then {"type": "done"}
+    or {"type": "error"}. Records lines carry a page in the columnar encoding of frame_to_columns. When the window is already cached, no records are sent and the client
+    is expected to use the query endpoints. Otherwise the full frame is cached once the stream ends.
+    """
+    number_days = request.args.get('number_days', 3, type=int)
+    environment = request.args.get('environment', 'uat')
+    key = cache_key(environment, number_days)
+    logger.info(f"Stream endpoint accessed: number_days={number_days}, environment={environment}")
+    note_requested(key)
+
+    with usage_cache_lock:
+        cached = key in usage_cache
+    if cached:
+        get_usage_frame(number_days, environment)  # Counts the hit and refreshes a stale entry
+
+    def generate():
+        yield dumps_json({'type': 'meta', 'cached': cached, 'site': config.get('site', '')}) + b"\n"
+        if cached:
+            yield dumps_json({'type': 'done', 'count': 0}) + b"\n"
+            return
+
+        all_records = []
+        try:
+            with build_slots:
+                for records in iter_usage_records(number_days, environment):
+                    all_records.extend(records)
+                    page = frame_to_columns(ingest_usage_records(records))
+                    yield dumps_json(dict(page, type='records')) + b"\n"
+        except Exception as e:
+            logger.error(f"Error streaming data: {str(e)}")
+            yield dumps_json({'type': 'error', 'message': str(e)}) + b"\n"
+            return
+
+        cache_put(key, ingest_usage_records(all_records))
+        logger.info(f"Streamed {len(all_records)} records")
+        yield dumps_json({'type': 'done', 'count': len(all_records)}) + b"\n"
+
+    response = Response(generate(), mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compresses larger responses with brotli or gzip when the client accepts it."""
+    accept_encoding = request.headers.get('Accept-Encoding', '').lower()
+    if (response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.status_code < 200 or response.status_code >= 300):
+        return response
+    body = response.get_data()
+    if len(body) < config.get("compress_min_bytes", COMPRESS_MIN_BYTES):
+        return response
+
+    start = time.perf_counter()
+    if brotli is not None and 'br' in accept_encoding:
+        encoding, compressed = 'br', brotli.compress(body, quality=5)
+    elif 'gzip' in accept_encoding:
+        encoding, compressed = 'gzip', gzip.compress(body, compresslevel=6)
+    else:
+        return response
+    logger.info(f"Compressed {request.path} with {encoding}: {len(body)} -> {len(compressed)} bytes in {(time.perf_counter() - start) * 1000:.1f} ms")
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+############################################################################################################
+# Query Endpoints
+############################################################################################################
+def query_frame():
+    """Returns the usage frame selected by the request's environment, number_days, account and consumer parameters."""
+    number_days = request.args.get('number_days', 3, type=int)
+    environment = request.args.get('environment', 'uat')
+    df = get_usage_frame(number_days, environment)
+    return filter_usage_frame(df, request.args.get('account'), request.args.getlist('consumer'))
+
+@app.route('/accounts')
+def get_accounts():
+    df = query_frame()
+    accounts = df["accountId"].unique().tolist() if not df.empty else []
+    return jsonify({'accounts': accounts, 'site': config.get('site', '')})
+
+@app.route('/consumers')
+def get_consumers():
+    df = query_frame()
+    consumers = sorted(str(c) for c in df["consumerId"].dropna().unique() if c) if not df.empty else []
+    return jsonify({'consumers': consumers})
+
+@app.route('/usage_series')
+def get_usage_series():
+    """Returns the average usage and record count per hour, day or week, with empty buckets filled."""
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in BUCKET_FREQUENCIES:
+        return jsonify({'error': f"Unknown bucket: {bucket}"}), 400
+
+    df = query_frame()
+    series = []
+    if not df.empty:
+        # Records without a usage time sit at the epoch and would stretch the axis back to 1970
+        df = df[df["usageTime"] > pd.Timestamp(0)]
+    if not df.empty:
+        grouped = (df.set_index("usageTime")["used"]
+                   .resample(BUCKET_FREQUENCIES[bucket], label="left", closed="left")
+                   .agg(["mean", "count"]))
+        grouped["mean"] = grouped["mean"].fillna(0).round(4)
+        labels = grouped.index.strftime(BUCKET_LABELS[bucket])
+        series = [
+            {'usageTime': label, 'used': float(used), 'count': int(count)}
+            for label, used, count in zip(labels, grouped["mean"], grouped["count"])
+        ]
+    return jsonify({'bucket': bucket, 'series': series})
+
+@app.route('/response_codes')
+def get_response_codes():
+    df = query_frame()
+    codes = {}
+    if not df.empty and "requestResponse" in df:
+        responses = df["requestResponse"].astype(object)
+        counts = responses[responses.notna() & (responses != "")].astype(str).value_counts()
+        codes = {code: int(count) for code, count in counts.items()}
+    return jsonify({'codes': codes})
+
+@app.route('/item_summary')
+def get_item_summary():
+    """Returns the total meter quantity per item and item version, leaving out zero totals."""
+    df = query_frame()
+    items = {}
+    if not df.empty:
+        keys = df["item"].astype(str) + " - " + df["itemVersion"].astype(str)
+        totals = df["meterQuantity"].groupby(keys, sort=False).sum()
+        items = {key: round(float(total), 4) for key, total in totals.items() if total > 0}
+    return jsonify({'items': items})
+
+############################################################################################################
+# Export
+############################################################################################################
+def iter_csv_export(df):
+    """Yields the CSV export of a usage frame in chunks of EXPORT_CHUNK_ROWS rows."""
+    yield ",".join(EXPORT_COLUMNS.values()) + "\n"
+    columns = list(EXPORT_COLUMNS)
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].reindex(columns=columns)
+        if "usageTime" in df:
+            chunk["usageTime"] = format_usage_time(chunk["usageTime"])
+        # Empty values are exported as N/A, as the dashboard always has
+        chunk = chunk.astype(object)
+        chunk = chunk.where(chunk.notna() & (chunk != ""), "N/A")
+        yield chunk.to_csv(header=False, index=False)
+
+def parquet_chunk(chunk):
+    """Converts text and categorical columns to strings so every row group has the same schema.
+
+    The API mixes types in some fields (e.g. response codes as numbers and strings), which Arrow
+    cannot hold in a single column.
+    """
+    chunk = chunk.copy()
+    for column in chunk.columns:
+        if chunk[column].dtype == object or isinstance(chunk[column].dtype, pd.CategoricalDtype):
+            values = chunk[column].astype(object)
+            chunk[column] = values.where(values.isna(), values.astype(str)).astype("string")
+    return chunk
+
+def iter_parquet_export(df):
+    """Writes a usage frame to Parquet one row group at a time and yields the file in chunks."""
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as buffer:
+        writer = None
+        for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+            table = pa.Table.from_pandas(parquet_chunk(df.iloc[start:start + EXPORT_CHUNK_ROWS]), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(buffer, table.schema)
+            writer.write_table(table)
+        writer.close()
+
+        buffer.seek(0)
+        data = buffer.read(64 * 1024)
+        while data:
+            yield data
+            data = buffer.read(64 * 1024)
+
+@app.route('/export')
+def export_data():
+    """Downloads the filtered usage records as CSV or, with format=parquet, as Parquet."""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'parquet'):
+        return jsonify({'error': f"Unknown export format: {export_format}"}), 400
+    if export_format == 'parquet' and pq is None:
+        return jsonify({'error': "Parquet export requires the pyarrow package"}), 501
+
+    df = query_frame()
+    # The account comes from the request, only safe characters go into the header
+    account = re.sub(r'[^A-Za-z0-9._-]', '_', request.args.get('account') or 'all')
+    filename = f"{time.strftime('%Y-%m-%d')}_{account}_usage_data.{export_format}"
+    logger.info(f"Exporting {len(df)} records as {export_format}")
+
+    if export_format == 'csv':
+        response = Response(iter_csv_export(df), mimetype="text/csv")
+    else:
+        response = Response(iter_parquet_export(df), mimetype="application/vnd.apache.parquet")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/cache/stats')
+def cache_statistics():
+    return jsonify(get_cache_stats())
+
+@app.route('/prewarm/status')
+def prewarm_statistics():
+    return jsonify(get_prewarm_status())
+
+@app.route('/health')
+def health():
+    """Readiness probe: answers once the server accepts requests, so callers don't have to guess a start delay."""
+    status = "stopping" if shutdown_event.is_set() else "ok"
+    return jsonify({
+        'service': "reporting",
+        'status': status,
+        'config': config_parameter,
+        'pid': os.getpid(),
+        'uptime_seconds': round(time.time() - started_at, 1)
+    }), 503 if status == "stopping" else 200
+
+@app.route('/shutdown', methods=['POST'])
+def shutdown():
+    """Stops the server gracefully. Only accepted from the local machine with the token of the process that started it.
+
+    The token header also keeps web pages out: a browser won't send a custom header cross-origin.
+    """
+    if request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({'error': "Shutdown is only accepted from the local machine"}), 403
+    if not hmac.compare_digest(request.headers.get(SHUTDOWN_TOKEN_HEADER, ""), shutdown_token):
+        return jsonify({'error': "Invalid shutdown token"}), 403
+    logger.info("Shutdown requested")
+    # Let this response go out before the server stops
+    threading.Timer(0.2, request_shutdown).start()
+    return jsonify({'status': 'shutting down'})
+
+############################################################################################################
+# Cache Pre-warming
+############################################################################################################
+prewarm_lock = threading.Lock()
+prewarm_requested = {}  # (environment, number_days) -> time of the last request for the window
+prewarm_status = {
+    "enabled": False,
+    "interval_seconds": None,
+    "running": False,
+    "runs": 0,
+    "last_run_started": None,
+    "last_run_seconds": None,
+    "next_run": None,
+    "windows": {}
+}
+
+def note_requested(key):
+    """Records a request for a window, which keeps it warm until the request is older than the cache TTL."""
+    with prewarm_lock:
+        prewarm_requested[key] = time.time()
+
+def prewarm_windows():
+    """Returns the (environment, number_days) windows to keep warm, widest first.
+
+    Only configured windows requested within the cache TTL are kept warm, so a reporter nobody
+    uses stops calling the API. Building the widest window first fills the local store, so the
+    narrower ones are then read from it without another download.
+    """
+    environments = {store_environment(environment) for environment in config.get("prewarm_environments", PREWARM_ENVIRONMENTS)}
+    days = set(config.get("prewarm_windows", PREWARM_WINDOWS))
+    oldest = time.time() - config.get("cache_ttl_seconds", CACHE_TTL)
+    with prewarm_lock:
+        requested = [key for key, last_request in prewarm_requested.items() if last_request > oldest]
+    return sorted((key for key in requested if key[0] in environments and key[1] in days), key=lambda key: (-key[1], key[0]))
+
+def prewarm_window(environment, number_days):
+    """Rebuilds the cache entry for one window and records the outcome."""
+    key = cache_key(environment, number_days)
+    with usage_cache_lock:
+        build_lock = cache_build_locks.setdefault(key, threading.Lock())
+    start = time.perf_counter()
+    try:
+        # Share the per-key lock with interactive requests so the window is built only once
+        with build_lock:
+            frame = build_usage_frame(number_days, environment)
+            cache_put(key, frame)
+        outcome = {"records": len(frame), "error": None}
+    except Exception as e:
+        logger.error(f"Error pre-warming {key}: {str(e)}")
+        outcome = {"records": None, "error": str(e)}
+    outcome["seconds"] = round(time.perf_counter() - start, 3)
+    with prewarm_lock:
+        prewarm_status["windows"][f"{key[0]}/{key[1]}"] = outcome
+
+def prewarm_cache():
+    """Refreshes every window to keep warm once, pausing `prewarm_stagger_seconds` between them."""
+    windows = prewarm_windows()
+    if not windows:
+        return
+    stagger = config.get("prewarm_stagger_seconds", PREWARM_STAGGER)
+    started = time.time()
+    with prewarm_lock:
+        prewarm_status["running"] = True
+        prewarm_status["last_run_started"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started))
+    logger.info("Cache pre-warm started")
+    for index, (environment, number_days) in enumerate(windows):
+        if index and shutdown_event.wait(stagger):
+            break
+        prewarm_window(environment, number_days)
+    duration = round(time.time() - started, 3)
+    with prewarm_lock:
+        prewarm_status["running"] = False
+        prewarm_status["runs"] += 1
+        prewarm_status["last_run_seconds"] = duration
+    logger.info(f"Cache pre-warm finished in {duration} seconds")
+
+def run_prewarm_scheduler(interval):
+    """Pre-warms the recently requested windows every `interval` seconds until shutdown."""
+    while True:
+        with prewarm_lock:
+            prewarm_status["next_run"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + interval))
+        if shutdown_event.wait(interval):
+            break
+        prewarm_cache()
+
+def start_prewarm_scheduler():
+    """Starts the pre-warm thread if `prewarm_interval_seconds` is set."""
+    interval = config.get("prewarm_interval_seconds", PREWARM_INTERVAL)
+    with prewarm_lock:
+        prewarm_status["enabled"] = bool(interval)
+        prewarm_status["interval_seconds"] = interval
+    if not interval:
+        logger.info("Cache pre-warming disabled")
+        return
+    logger.info(f"Pre-warming requested windows every {interval} seconds")
+    threading.Thread(target=run_prewarm_scheduler, args=(interval,), daemon=True).start()
+
+def get_prewarm_status():
+    """Returns a snapshot of the pre-warm scheduler state."""
+    with prewarm_lock:
+        status = dict(prewarm_status)
+        status["windows"] = dict(prewarm_status["windows"])
+    status["warm"] = [f"{environment}/{number_days}" for environment, number_days in prewarm_windows()]
+    return status
+
+############################################################################################################
+# Serving
+############################################################################################################
+def request_shutdown(*_):
+    """Stops background work and interrupts the server loop in the main thread.
+
+    The server treats the interrupt as a shutdown: it stops accepting connections and lets
+    requests in progress finish.
+    """
+    if shutdown_event.is_set():
+        return
+    shutdown_event.set()
+    _thread.interrupt_main()
+
+def run_server(port, server_type, threads):
+    """Runs the app on waitress (multi-threaded) or, if unavailable or requested, on the Flask server."""
+    global build_slots
+    build_slots = threading.BoundedSemaphore(config.get("max_concurrent_builds", MAX_CONCURRENT_BUILDS))
+    signal.signal(signal.SIGTERM, lambda *_: request_shutdown())
+    start_prewarm_scheduler()
+
+    if server_type == "waitress":
+        try:
+            from waitress import create_server
+        except ImportError:
+            logger.warning("waitress is not installed, falling back to the Flask server")
+            server_type = "flask"
+
+    if server_type == "waitress":
+        server = create_server(
+            app,
+            host=HOST,
+            port=port,
+            threads=threads,
+            connection_limit=config.get("server_connection_limit", SERVER_CONNECTION_LIMIT)
+        )
+        logger.info(f"Serving with waitress on port {port} with {threads} threads")
+        server.run()
+    else:
+        logger.info(f"Serving with the Flask server on port {port}")
+        try:
+            app.run(debug=False, host=HOST, port=port, threaded=True)
+        except KeyboardInterrupt:
+            pass
+    shutdown_event.set()
+    logger.info("Server stopped")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-config', "--config", help="Specify the configuration to override default config.json file", default='default')
+    parser.add_argument('-server', "--server", choices=["waitress", "flask"], help="Server to run on, overrides the server config option")
+    parser.add_argument('-threads', "--threads", type=int, help="Number of request threads, overrides the server_threads config option")
+    parser.add_argument('-port', "--port", type=int, help="Port to listen on, overrides the port config option")
+    parser.add_argument('-log-level', "--log-level", choices=LOG_LEVELS, default="INFO", help="Lowest level written to the log, DEBUG includes every page fetched")
+    parser.add_argument('-no-prewarm', "--no-prewarm", action="store_true", help="Don't pre-warm the cache whatever the configuration says")
     args = parser.parse_args()
     config_parameter = args.config
+
+    # Reporters started on their own port get their own log file, rotation can't be shared between processes
+    setup_logging(f"reporting_{args.port}.log" if args.port else LOG_FILE, args.log_level)
     
     logger.info(f"Starting application with config parameter: {config_parameter}")
     config = read_config()
+    if args.no_prewarm:
+        config["prewarm_interval_seconds"] = 0
     
-    port = config["port"] if "port" in config else PORT
+    port = args.port or (config["port"] if "port" in config else PORT)
     logger.info(f"Server starting on port {port}")
     
-    app.run(debug=False, port=port)
\ No newline at end of file
+    run_server(
+        port,
+        args.server or config.get("server", SERVER),
+        args.threads or config.get("server_threads", SERVER_THREADS)
+    )
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+DAY_MS = 24 * 60 * 60 * 1000
+
+@pytest.fixture(scope="session")
+def tool():
+    """The tool module. Importing it parses the command line and reads config.json, but builds no window."""
+    argv = sys.argv
+    sys.argv = argv[:1]
+    try:
+        import Elastic_Access_Standalone_Tool as tool
+    finally:
+        sys.argv = argv
+    return tool
+
+class UsageAPIStub:
+    """Stands in for the reporter's DMClient, answering usage pages from a list of records.
+
+    Records are served newest window first as the usage API does, `page_size` per page, and
+    every request's pastDays and pageNumber are kept in `requests`.
+    """
+    def __init__(self, records=(), page_size=2):
+        self.records = list(records)
+        self.page_size = page_size
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, retries=None):
+        self.requests.append((params["pastDays"], params["pageNumber"]))
+        window_start = int(time.time() * 1000) - params["pastDays"] * DAY_MS
+        records = [record for record in self.records if (record.get("usageTime") or record.get("writeTime") or 0) >= window_start]
+        start = (params["pageNumber"] - 1) * self.page_size
+        return UsageResponse(records[start:start + self.page_size])
+
+    def log_stats(self):
+        pass
+
+class UsageResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return {"data": self.data}
+
+@pytest.fixture
+def reporting(tmp_path, monkeypatch):
+    """The reporter module configured against a UsageAPIStub and a store in a temporary directory."""
+    import Reporting as reporting
+    monkeypatch.setattr(reporting, "config", {
+        "site": "test",
+        "geo": "com",
+        "basic_Auth": "dGVzdDp0ZXN0",
+        "api_host": "http://usage.invalid",
+        "store_file": str(tmp_path / "usage_store.db"),
+        "fetch_max_workers": 2
+    }, raising=False)
+    monkeypatch.setattr(reporting, "config_parameter", "test", raising=False)
+    monkeypatch.setattr(reporting, "usage_client", UsageAPIStub())
+    reporting.usage_cache.clear()
+    reporting.cache_build_locks.clear()
+    reporting.cache_refreshing.clear()
+    reporting.cache_stats.update(dict.fromkeys(reporting.cache_stats, 0))
+    yield reporting
+    reporting.usage_cache.clear()
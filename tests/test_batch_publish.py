@@ -0,0 +1,122 @@
+import json
+import threading
+
+import pytest
+
+URL = "http://dm.invalid/api/v1/rate-tables"
+KEY = ("test", "uat")
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+class RateTablesAPIStub:
+    """Stands in for the tool's api_client, holding the server's rate tables in memory.
+
+    Posting a table named in `rejected` answers that status instead of storing it.
+    """
+    def __init__(self, tables=()):
+        self.tables = list(tables)
+        self.rejected = {}
+        self.gets = 0
+        self.posted = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None):
+        self.gets += 1
+        return Response(200, list(self.tables))
+
+    def post(self, url, headers=None, json=None):
+        with self.lock:
+            self.posted.append((json["series"], json["version"]))
+            status = self.rejected.get(json["series"])
+            if status:
+                return Response(status, {"message": "Rejected"})
+            self.tables.append(json)
+            return Response(201, json)
+
+@pytest.fixture
+def api(tool, monkeypatch):
+    api = RateTablesAPIStub([rate_table("Gold", "1")])
+    monkeypatch.setattr(tool, "api_client", api)
+    tool.invalidate_rate_tables(KEY)
+    yield api
+    tool.invalidate_rate_tables(KEY)
+
+def rate_table(series, version):
+    return {"series": series, "version": version, "effectiveFrom": 1_800_000_000_000, "items": [{"name": "token", "version": "1.0", "rate": 1.5}]}
+
+def summary(results):
+    return [(result["row"], result["series"], result["version"], result["status"], result["message"]) for result in results]
+
+def test_only_tables_missing_on_the_server_are_posted(tool, api):
+    batch = [rate_table("Gold", "1"), rate_table("Gold", "2"), rate_table("Silver", "1")]
+
+    results = tool.publish_rate_tables(batch, KEY, URL, {})
+
+    assert summary(results) == [
+        (1, "Gold", "1", "skipped", "Already on the server"),
+        (2, "Gold", "2", "posted", ""),
+        (3, "Silver", "1", "posted", "")
+    ]
+    assert sorted(api.posted) == [("Gold", "2"), ("Silver", "1")]
+
+def test_server_is_diffed_fresh_and_the_cache_is_invalidated(tool, api):
+    tool.get_rate_table_index(KEY, URL, {})  # Cached before someone else posted Silver 1
+    api.tables.append(rate_table("Silver", "1"))
+
+    results = tool.publish_rate_tables([rate_table("Silver", "1")], KEY, URL, {})
+
+    assert results[0]["status"] == "skipped"
+    assert api.posted == []
+    tool.publish_rate_tables([rate_table("Silver", "2")], KEY, URL, {})
+    assert ("Silver", "2") in tool.get_rate_table_index(KEY, URL, {}).by_key
+
+def test_repeated_table_is_posted_for_its_first_row(tool, api):
+    batch = [rate_table("Bronze", "1"), rate_table("Silver", "1"), rate_table("Bronze", "1")]
+
+    results = tool.publish_rate_tables(batch, KEY, URL, {})
+
+    assert summary(results) == [
+        (1, "Bronze", "1", "posted", ""),
+        (2, "Silver", "1", "posted", ""),
+        (3, "Bronze", "1", "skipped", "Repeat of row 1")
+    ]
+    assert api.posted.count(("Bronze", "1")) == 1
+
+def test_rejected_tables_are_reported_in_their_rows(tool, api):
+    api.rejected = {"Bronze": 409, "Platinum": 400}
+    batch = [rate_table("Platinum", "1"), rate_table("Bronze", "1"), rate_table("Silver", "1")]
+
+    results = tool.publish_rate_tables(batch, KEY, URL, {})
+
+    assert [result["status"] for result in results] == ["failed", "skipped", "posted"]
+    assert results[0]["message"].startswith("400")
+    assert results[1]["message"] == "Already on the server (409)"
+
+def test_nothing_to_post(tool, api):
+    results = tool.publish_rate_tables([rate_table("Gold", "1")], KEY, URL, {})
+
+    assert summary(results) == [(1, "Gold", "1", "skipped", "Already on the server")]
+    assert api.posted == []
+
+def test_batch_files_are_read_as_payloads(tool, tmp_path):
+    (tmp_path / "gold.json").write_text(json.dumps([rate_table("Gold", "2"), rate_table("Gold", "3")]))
+    (tmp_path / "silver.json").write_text(json.dumps(rate_table("Silver", "1")))
+    (tmp_path / "notes.txt").write_text("not a rate table")
+
+    tables = tool.read_rate_table_batch([str(tmp_path)])
+
+    assert [(table["series"], table["version"]) for table in tables] == [("Gold", "2"), ("Gold", "3"), ("Silver", "1")]
+
+def test_batch_file_without_items_is_refused(tool, tmp_path):
+    path = tmp_path / "gold.json"
+    path.write_text(json.dumps(dict(rate_table("Gold", "2"), items=[])))
+
+    with pytest.raises(ValueError, match="gold.json"):
+        tool.read_rate_table_batch([str(path)])
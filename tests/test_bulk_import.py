@@ -0,0 +1,130 @@
+import json
+import uuid
+
+import pytest
+
+BASE_URL = "http://dm.invalid/api/v1"
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+class InstancesAPIStub:
+    """Stands in for the tool's api_client, holding instances and their line items in memory."""
+    def __init__(self):
+        self.instances = {}  # accountId -> instance
+        self.line_items = {}  # instance id -> {activationId: line item}
+        self.calls = []
+
+    def get(self, url, headers=None, params=None):
+        self.calls.append(("GET", url))
+        if url.endswith("/line-items"):
+            instance_id = url.split("/")[-2]
+            return Response(200, list(self.line_items.get(instance_id, {}).values()))
+        instance = self.instances.get(params["accountId"])
+        return Response(200, {"content": [instance] if instance else []})
+
+    def post(self, url, headers=None, json=None):
+        self.calls.append(("POST", url))
+        if json["accountId"] in self.instances:
+            return Response(409, {"message": "Conflict"})
+        instance = {"id": f"instance-{len(self.instances) + 1}", "accountId": json["accountId"], "shortName": json["shortName"]}
+        self.instances[json["accountId"]] = instance
+        return Response(201, instance)
+
+    def put(self, url, headers=None, data=None):
+        self.calls.append(("PUT", url))
+        line_item = json.loads(data)
+        self.line_items.setdefault(url.split("/")[-2], {})[line_item["activationId"]] = line_item
+        return Response(200, line_item)
+
+@pytest.fixture
+def api(tool, monkeypatch):
+    api = InstancesAPIStub()
+    monkeypatch.setattr(tool, "api_client", api)
+    return api
+
+def import_row(**values):
+    row = {"accountId": "ACME-1", "name": "Acme", "quantity": "1000", "start": "2026-01-01", "end": "2027-01-01",
+           "rateTableSeries": "Gold", "email": ""}
+    row.update(values)
+    return row
+
+def test_activation_id_is_derived_from_the_row(tool):
+    row = import_row()
+
+    assert tool.bulk_activation_id(row) == tool.bulk_activation_id(dict(row, name="Other name", email="a@example.com"))
+    assert tool.bulk_activation_id(row) != tool.bulk_activation_id(import_row(quantity="2000"))
+    assert tool.bulk_activation_id(row) == str(uuid.uuid5(uuid.NAMESPACE_URL, "ACME-1|1000|2026-01-01|2027-01-01|Gold"))
+
+def test_importing_a_row_again_is_skipped(tool, api):
+    first = tool.provision_bulk_row(1, import_row(), BASE_URL, {})
+    second = tool.provision_bulk_row(1, import_row(), BASE_URL, {})
+
+    assert first["status"] == "registered"
+    assert second["status"] == "skipped"
+    assert second["activationId"] == first["activationId"]
+    assert [call[0] for call in api.calls].count("PUT") == 1
+    assert len(api.line_items[first["instanceId"]]) == 1
+
+def test_row_without_start_keeps_its_activation_id(tool, api, monkeypatch):
+    first = tool.provision_bulk_row(1, import_row(start=""), BASE_URL, {})
+    monkeypatch.setattr(tool, "get_default_date", lambda: "2026-06-01")
+    second = tool.provision_bulk_row(1, import_row(start=""), BASE_URL, {})
+
+    assert second["status"] == "skipped"
+    assert second["activationId"] == first["activationId"]
+
+def test_other_entitlement_of_an_existing_account_is_added(tool, api):
+    first = tool.provision_bulk_row(1, import_row(), BASE_URL, {})
+    second = tool.provision_bulk_row(2, import_row(quantity="500"), BASE_URL, {})
+
+    assert second["status"] == "entitled"
+    assert second["instanceId"] == first["instanceId"]
+    assert len(api.line_items[first["instanceId"]]) == 2
+
+def test_account_registered_in_the_meantime_is_used(tool, api, monkeypatch):
+    # The account appears between the lookup and the registration, as with two imports at once
+    find_instance = tool.find_instance
+    lookups = []
+
+    def racing_find_instance(url, headers, customer_id):
+        lookups.append(customer_id)
+        if len(lookups) == 1:
+            api.instances[customer_id] = {"id": "instance-other", "accountId": customer_id}
+            return None
+        return find_instance(url, headers, customer_id)
+
+    monkeypatch.setattr(tool, "find_instance", racing_find_instance)
+    result = tool.provision_bulk_row(1, import_row(), BASE_URL, {})
+
+    assert result["status"] == "entitled"
+    assert result["instanceId"] == "instance-other"
+
+@pytest.mark.parametrize("values, message", [
+    ({"accountId": ""}, "are required"),
+    ({"quantity": "-5"}, "positive whole number"),
+    ({"end": "2027-13-40"}, "must be dates"),
+    ({"end": "2025-01-01"}, "end must be after start"),
+])
+def test_invalid_rows_fail_without_calls(tool, api, values, message):
+    result = tool.provision_bulk_row(1, import_row(**values), BASE_URL, {})
+
+    assert result["status"] == "failed"
+    assert message in result["message"]
+    assert api.calls == []
+
+def test_import_file_columns_are_matched_by_alias(tool, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text("Customer ID,Customer Name,Tokens,Start Date,End_Date,Rate Table,Contact-Email\n"
+                    "ACME-1, Acme ,1000,2026-01-01,,Gold,ops@example.com\n", encoding="utf-8-sig")
+
+    assert tool.read_bulk_import_file(str(path)) == [{
+        "accountId": "ACME-1", "name": "Acme", "quantity": "1000", "start": "2026-01-01", "end": "",
+        "rateTableSeries": "Gold", "email": "ops@example.com"
+    }]
@@ -0,0 +1,148 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import DM_Client
+from DM_Client import DMClient
+
+class ScriptedServer(ThreadingHTTPServer):
+    """Local HTTP server answering each request with the next status in `statuses`, then 200."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ScriptedHandler)
+        self.statuses = []
+        self.requests = []
+        self.retry_after = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.requests.append(self.command)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        if self.server.retry_after is not None:
+            self.send_header("Retry-After", self.server.retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = do_PUT = do_DELETE = answer
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ScriptedServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Waits between attempts, recorded instead of slept."""
+    delays = []
+    monkeypatch.setattr(DM_Client.time, "sleep", delays.append)
+    return delays
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_get_is_retried_on_server_errors(server, delays):
+    server.statuses = [503, 502]
+    client = DMClient(max_retries=3)
+
+    response = client.get(server.url)
+
+    assert response.status_code == 200
+    assert server.requests == ["GET"] * 3
+    assert len(delays) == 2
+    assert client.get_stats()["retries"] == 2
+
+def test_post_is_not_retried_on_server_errors(server, delays):
+    server.statuses = [503]
+    client = DMClient(max_retries=3)
+
+    response = client.post(server.url, json={"name": "Gold"})
+
+    assert response.status_code == 503
+    assert server.requests == ["POST"]
+    assert delays == []
+
+def test_post_is_retried_on_too_many_requests(server, delays):
+    server.statuses = [429]
+    client = DMClient(max_retries=3)
+
+    assert client.post(server.url, json={}).status_code == 200
+    assert server.requests == ["POST", "POST"]
+
+def test_last_response_is_returned_once_retries_run_out(server, delays):
+    server.statuses = [500] * 5
+    client = DMClient(max_retries=2)
+
+    response = client.get(server.url)
+
+    assert response.status_code == 500
+    assert len(server.requests) == 3
+    assert client.get_stats()["failures"] == 1
+
+def test_retries_can_be_set_per_call(server, delays):
+    server.statuses = [503] * 5
+    client = DMClient(max_retries=3)
+
+    assert client.get(server.url, retries=0).status_code == 503
+    assert len(server.requests) == 1
+
+def test_backoff_is_capped_and_respects_retry_after(server, delays, monkeypatch):
+    monkeypatch.setattr(DM_Client.random, "uniform", lambda low, high: high)
+    server.statuses = [503, 503, 503]
+    client = DMClient(max_retries=3, backoff_base=4)
+
+    client.get(server.url)
+
+    assert delays == [4, 8, DM_Client.BACKOFF_MAX]
+
+    delays.clear()
+    server.statuses = [429]
+    server.retry_after = "7"
+    DMClient(max_retries=1, backoff_base=0.5).post(server.url)
+    assert delays == [7]
+
+def test_connection_errors_are_retried_only_for_idempotent_requests(delays):
+    client = DMClient(max_retries=2)
+    url = f"http://127.0.0.1:{closed_port()}/"
+
+    with pytest.raises(requests.ConnectionError):
+        client.get(url)
+    assert len(delays) == 2
+
+    delays.clear()
+    with pytest.raises(requests.ConnectionError):
+        client.post(url)
+    assert delays == []
+    assert client.get_stats()["connection_errors"] == 4
+
+def test_connections_are_reused(server):
+    client = DMClient()
+
+    for _ in range(3):
+        client.get(server.url)
+
+    stats = client.get_stats()
+    assert stats["connections_opened"] == 1
+    assert stats["pool_requests"] == 3
@@ -0,0 +1,163 @@
+import socketserver
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from Email_Outbox import EmailOutbox
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server recording connections and messages.
+
+    `drop_after_data` closes the connection instead of accepting that many messages, and
+    recipients starting with "refused" are rejected, to exercise the outbox's retries.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.drop_after_data = 0
+        self.lock = threading.Lock()
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stub ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                if command.split(":", 1)[1].strip("<> ").startswith("refused"):
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(command)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    data += chunk
+                with server.lock:
+                    if server.drop_after_data:
+                        server.drop_after_data -= 1
+                        return  # Connection lost before the message was accepted
+                    server.messages.append(data)
+                self.reply("250 OK queued")
+            elif verb == "RSET" or verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_outbox(server, **options):
+    options.setdefault("retry_delay", 0)
+    return EmailOutbox("127.0.0.1", "sales@example.com", port=server.server_address[1], starttls=False, timeout=5, **options)
+
+def message(number):
+    msg = EmailMessage()
+    msg["Subject"] = f"Token Order {number}"
+    msg["From"] = "sales@example.com"
+    msg["To"] = f"customer{number}@example.com"
+    msg.set_content("Line items")
+    return msg
+
+def test_messages_share_one_connection(smtp_server):
+    outbox = make_outbox(smtp_server)
+
+    jobs = [outbox.send(message(number), [f"customer{number}@example.com"]) for number in range(5)]
+
+    assert [job.wait(10).status for job in jobs] == ["sent"] * 5
+    assert outbox.close(timeout=10) == 0
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+    assert outbox.stats == {"sent": 5, "failed": 0, "connections": 1, "reconnects": 0}
+
+def test_reconnects_after_messages_per_connection(smtp_server):
+    outbox = make_outbox(smtp_server, messages_per_connection=2)
+
+    jobs = [outbox.send(message(number), [f"customer{number}@example.com"]) for number in range(5)]
+
+    assert all(job.wait(10).status == "sent" for job in jobs)
+    outbox.close(timeout=10)
+    assert smtp_server.connections == 3
+
+def test_dropped_connection_is_retried(smtp_server):
+    smtp_server.drop_after_data = 1
+    outbox = make_outbox(smtp_server)
+
+    job = outbox.send(message(1), ["customer1@example.com"]).wait(10)
+
+    assert job.status == "sent"
+    assert job.attempts == 2
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.connections == 2
+    assert outbox.stats["reconnects"] == 1
+    outbox.close(timeout=10)
+
+def test_gives_up_after_the_last_attempt(smtp_server):
+    smtp_server.drop_after_data = 5
+    outbox = make_outbox(smtp_server, attempts=3)
+
+    job = outbox.send(message(1), ["customer1@example.com"]).wait(10)
+
+    assert job.status == "failed"
+    assert job.attempts == 3
+    assert smtp_server.messages == []
+    outbox.close(timeout=10)
+
+def test_refused_recipient_fails_without_retry(smtp_server):
+    outbox = make_outbox(smtp_server)
+
+    refused = outbox.send(message(1), ["refused@example.com"]).wait(10)
+    partly_refused = outbox.send(message(2), ["customer2@example.com", "refused@example.com"]).wait(10)
+
+    assert refused.status == "failed"
+    assert refused.attempts == 1
+    assert partly_refused.status == "sent"
+    assert "refused@example.com" in partly_refused.error
+    assert smtp_server.connections == 1
+    outbox.close(timeout=10)
+
+def test_close_counts_unsent_messages():
+    # A server that accepts connections but never greets keeps the first message in flight
+    silent = socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler, bind_and_activate=True)
+    try:
+        outbox = EmailOutbox("127.0.0.1", "sales@example.com", port=silent.server_address[1], starttls=False, timeout=2, attempts=1)
+        jobs = [outbox.send(message(number), [f"customer{number}@example.com"]) for number in range(3)]
+
+        assert outbox.close(timeout=0.2) == 3
+        assert outbox.close(timeout=0.2) == 3  # The stop markers aren't messages
+        assert jobs[0].wait(10).status == "failed"
+    finally:
+        silent.server_close()
@@ -0,0 +1,29 @@
+class OutboxStub:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self, timeout=None):
+        self.closed += 1
+        return 0
+
+class ExecutorStub:
+    def __init__(self):
+        self.shutdowns = 0
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns += 1
+
+def test_quit_application_runs_once(tool, monkeypatch):
+    outbox = OutboxStub()
+    executor = ExecutorStub()
+    monkeypatch.setattr(tool, "application_closed", False)
+    monkeypatch.setattr(tool, "reporter_process", None)
+    monkeypatch.setattr(tool, "email_outbox", outbox)
+    monkeypatch.setattr(tool, "api_executor", executor)
+    monkeypatch.setattr(tool, "root", None)
+
+    tool.quit_application()  # The Exit button
+    tool.quit_application()  # atexit once the main loop has returned
+
+    assert outbox.closed == 1
+    assert executor.shutdowns == 1
@@ -0,0 +1,42 @@
+DAY_MS = 24 * 60 * 60 * 1000
+NOW_MS = 1_800_000_000_000
+
+def rate_table(series, version, effective_from, **extra):
+    return dict({"series": series, "version": version, "effectiveFrom": effective_from, "items": []}, **extra)
+
+def test_current_and_future(tool):
+    tables = [
+        rate_table("Gold", "1", NOW_MS - 20 * DAY_MS),
+        rate_table("Gold", "2", NOW_MS - 10 * DAY_MS),
+        rate_table("Gold", "3", NOW_MS + 10 * DAY_MS),
+        rate_table("Silver", "1", NOW_MS - 5 * DAY_MS)
+    ]
+    index = tool.RateTableIndex(tables)
+
+    selected = index.current_and_future(NOW_MS)
+
+    assert [(table["series"], table["version"]) for table in selected] == [("Silver", "1"), ("Gold", "3"), ("Gold", "2")]
+    assert index.names == ["Gold", "Silver"]
+    assert index.by_key[("Gold", "2")] is tables[1]
+
+def test_tables_without_series_are_skipped(tool):
+    tables = [
+        rate_table("Gold", "1", NOW_MS - DAY_MS),
+        {"version": "1", "effectiveFrom": NOW_MS - DAY_MS, "items": []},
+        rate_table("", "2", NOW_MS - DAY_MS),
+        rate_table(None, "3", NOW_MS - DAY_MS),
+        "not a rate table"
+    ]
+    index = tool.RateTableIndex(tables)
+
+    assert index.tables == [tables[0]]
+    assert index.names == ["Gold"]
+    assert list(index.series) == ["Gold"]
+    assert index.current_and_future(NOW_MS) == [tables[0]]
+
+def test_empty_index(tool):
+    index = tool.RateTableIndex([])
+
+    assert index.tables == []
+    assert index.names == []
+    assert index.current_and_future(NOW_MS) == []
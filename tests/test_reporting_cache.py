@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pandas as pd
+
+def counting_builds(reporting, monkeypatch, delay=0):
+    """Replaces the frame build with one returning a frame per call, and returns the list of calls."""
+    calls = []
+
+    def build_usage_frame(number_days, environment):
+        calls.append((environment, number_days))
+        time.sleep(delay)
+        return pd.DataFrame({"accountId": ["ACME"], "build": [len(calls)]})
+
+    monkeypatch.setattr(reporting, "build_usage_frame", build_usage_frame)
+    return calls
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "Timed out"
+        time.sleep(0.01)
+
+def test_fresh_entry_is_served_from_the_cache(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch)
+
+    first = reporting.get_usage_frame(7, "uat")
+    second = reporting.get_usage_frame(7, "uat")
+
+    assert second is first
+    assert calls == [("uat", 7)]
+    assert reporting.cache_stats["misses"] == 1
+    assert reporting.cache_stats["hits"] == 1
+
+def test_stale_entry_is_served_while_it_is_rebuilt(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch)
+    reporting.config["cache_ttl_seconds"] = 60
+    first = reporting.get_usage_frame(7, "uat")
+    key = reporting.cache_key("uat", 7)
+    reporting.usage_cache[key] = (time.time() - 61, first)
+
+    assert reporting.get_usage_frame(7, "uat") is first
+    wait_for(lambda: reporting.cache_stats["refreshes"] == 1)
+
+    assert reporting.cache_stats["stale_hits"] == 1
+    assert len(calls) == 2
+    assert reporting.get_usage_frame(7, "uat")["build"].tolist() == [2]
+
+def test_refresh_shares_the_build_lock(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch)
+    frame = reporting.get_usage_frame(7, "uat")
+    key = reporting.cache_key("uat", 7)
+    reporting.usage_cache[key] = (time.time() - reporting.CACHE_TTL - 1, frame)
+
+    # While a request builds the window, the refresh waits for it instead of building alongside
+    build_lock = reporting.cache_build_locks[key]
+    build_lock.acquire()
+    refresh = threading.Thread(target=reporting.refresh_cache_entry, args=(key,))
+    refresh.start()
+    time.sleep(0.1)
+    assert len(calls) == 1
+    build_lock.release()
+    refresh.join(5)
+
+    assert len(calls) == 2
+
+def test_concurrent_misses_build_once(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch, delay=0.2)
+
+    threads = [threading.Thread(target=reporting.get_usage_frame, args=(7, "uat")) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [("uat", 7)]
+    assert reporting.cache_stats["misses"] == 1
+    assert reporting.cache_stats["hits"] == 3
+
+def test_least_recently_used_entry_is_evicted(reporting, monkeypatch):
+    counting_builds(reporting, monkeypatch)
+    reporting.config["cache_max_entries"] = 2
+    reporting.get_usage_frame(1, "uat")
+    reporting.get_usage_frame(7, "uat")
+    reporting.get_usage_frame(1, "uat")  # Now the most recently used
+
+    reporting.get_usage_frame(30, "uat")
+
+    assert list(reporting.usage_cache) == [("uat", 1), ("uat", 30)]
+    assert reporting.cache_stats["evictions"] == 1
+
+def test_empty_frame_is_not_cached(reporting, monkeypatch):
+    monkeypatch.setattr(reporting, "build_usage_frame", lambda number_days, environment: pd.DataFrame())
+
+    reporting.get_usage_frame(7, "uat")
+
+    assert len(reporting.usage_cache) == 0
+
+def test_prewarm_keeps_only_requested_windows_warm(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch)
+    monkeypatch.setattr(reporting, "prewarm_requested", {})
+    reporting.config.update(prewarm_stagger_seconds=0, prewarm_windows=[1, 7, 30], prewarm_environments=["uat", "prod"])
+    reporting.prewarm_cache()
+    assert calls == []
+
+    reporting.get_usage_frame(7, "uat")
+    reporting.get_usage_frame(30, "production")
+    reporting.get_usage_frame(14, "uat")  # Not configured for pre-warming
+    calls.clear()
+    reporting.prewarm_cache()
+
+    assert calls == [("prod", 30), ("uat", 7)]
+    assert reporting.get_prewarm_status()["warm"] == ["prod/30", "uat/7"]
+
+def test_prewarm_stops_once_requests_age_out(reporting, monkeypatch):
+    calls = counting_builds(reporting, monkeypatch)
+    monkeypatch.setattr(reporting, "prewarm_requested", {})
+    reporting.config.update(prewarm_stagger_seconds=0, cache_ttl_seconds=60)
+    reporting.get_usage_frame(7, "uat")
+    reporting.get_usage_frame(1, "uat")
+    reporting.prewarm_requested[("uat", 7)] -= 61
+    calls.clear()
+
+    reporting.prewarm_cache()
+
+    assert calls == [("uat", 1)]
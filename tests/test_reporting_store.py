@@ -0,0 +1,135 @@
+import time
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+def usage_record(correlation_id, days_ago, used=1.0, **extra):
+    usage_time = int(time.time() * 1000) - int(days_ago * DAY_MS)
+    record = {"correlationId": correlation_id, "usageTime": usage_time, "writeTime": usage_time + 1000,
+              "accountId": "ACME", "consumerId": "c1", "used": used, "meterQuantity": used}
+    record.update(extra)
+    return record
+
+def stored(reporting, days, environment="uat"):
+    connection = reporting.open_store()
+    try:
+        return [reporting.json.loads(row[0]) for row in reporting.query_window(connection, days, environment)]
+    finally:
+        connection.close()
+
+def test_records_sent_again_are_stored_once(reporting):
+    reporting.usage_client.records = [usage_record("a", 3), usage_record("b", 2), usage_record("c", 1)]
+    reporting.config["store_sync_interval_seconds"] = 0
+    assert len(reporting.load_usage(7, "uat")) == 3
+
+    # The same record with a corrected field replaces the copy held
+    reporting.usage_client.records[2] = dict(reporting.usage_client.records[2], used=5.0)
+    records = reporting.load_usage(7, "uat")
+
+    assert sorted(record["correlationId"] for record in records) == ["a", "b", "c"]
+    assert [record["used"] for record in records if record["correlationId"] == "c"] == [5.0]
+
+def test_sync_fetches_only_since_the_newest_record(reporting):
+    reporting.usage_client.records = [usage_record("a", 20), usage_record("b", 5), usage_record("c", 1.5)]
+    reporting.config["store_sync_interval_seconds"] = 0
+    reporting.load_usage(30, "uat")
+    assert {past_days for past_days, _ in reporting.usage_client.requests} == {30}
+
+    reporting.usage_client.requests.clear()
+    reporting.usage_client.records.append(usage_record("d", 0.5))
+    records = reporting.load_usage(30, "uat")
+
+    # Two days since the newest record held plus one of overlap
+    assert {past_days for past_days, _ in reporting.usage_client.requests} == {3}
+    assert sorted(record["correlationId"] for record in records) == ["a", "b", "c", "d"]
+
+def test_fresh_store_is_not_synced(reporting):
+    reporting.usage_client.records = [usage_record("a", 1)]
+    reporting.load_usage(7, "uat")
+    reporting.usage_client.requests.clear()
+
+    assert len(reporting.load_usage(7, "uat")) == 1
+    assert reporting.usage_client.requests == []
+
+def test_wider_window_is_fetched_in_full(reporting):
+    reporting.usage_client.records = [usage_record("a", 20), usage_record("b", 2)]
+    assert len(reporting.load_usage(7, "uat")) == 1
+
+    reporting.usage_client.requests.clear()
+    assert len(reporting.load_usage(30, "uat")) == 2
+    assert {past_days for past_days, _ in reporting.usage_client.requests} == {30}
+
+def test_records_without_usage_time_use_their_write_time(reporting):
+    undated = usage_record("a", 0, usageTime=None)
+    undated["writeTime"] = int(time.time() * 1000) - 2 * DAY_MS
+    unknown = usage_record("b", 0, usageTime=None, writeTime=None)
+    reporting.usage_client.records = [undated, unknown]
+    reporting.load_usage(7, "uat")
+
+    assert [record["correlationId"] for record in stored(reporting, 7)] == ["a"]
+    assert stored(reporting, 1) == []
+
+def test_records_past_the_widest_window_are_pruned(reporting):
+    reporting.usage_client.records = [usage_record("a", 20), usage_record("b", 2)]
+    reporting.config["store_sync_interval_seconds"] = 0
+    reporting.load_usage(30, "uat")
+    connection = reporting.open_store()
+    try:
+        # As if the record had aged past the window since it was stored
+        connection.execute("UPDATE usage SET usage_time = usage_time - ? WHERE record_key LIKE 'a/%'", (15 * DAY_MS,))
+        connection.commit()
+        reporting.load_usage(7, "uat")
+
+        assert connection.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 1
+    finally:
+        connection.close()
+
+def test_store_of_another_version_is_rebuilt(reporting):
+    reporting.usage_client.records = [usage_record("a", 1)]
+    reporting.load_usage(7, "uat")
+    connection = reporting.open_store()
+    connection.execute("PRAGMA user_version = 1")
+    connection.commit()
+    connection.close()
+
+    connection = reporting.open_store()
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 0
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == reporting.STORE_VERSION
+    finally:
+        connection.close()
+
+def test_data_endpoint_answers_from_the_store(reporting):
+    reporting.usage_client.records = [usage_record("a", 3, accountId="ACME"), usage_record("b", 1, accountId="Initech")]
+    client = reporting.app.test_client()
+
+    response = client.post("/data", json={"number_days": 7, "environment": "uat", "account": "ACME"})
+
+    assert response.status_code == 200
+    assert response.json["accounts"] == ["ACME", "Initech"]
+    assert [record["correlationId"] for record in response.json["data"]] == ["a"]
+
+def test_stream_sends_columnar_pages(reporting):
+    reporting.usage_client.records = [usage_record("a", 3, accountId="ACME"), usage_record("b", 2, accountId="ACME"),
+                                      usage_record("c", 1, accountId="Initech")]
+    client = reporting.app.test_client()
+
+    lines = [reporting.json.loads(line) for line in client.get("/data/stream?number_days=7&environment=uat").data.splitlines()]
+
+    assert [line["type"] for line in lines] == ["meta", "records", "records", "done"]
+    first = lines[1]
+    assert first["length"] == 2
+    assert first["columns"]["correlationId"] == ["a", "b"]
+    assert first["columns"]["accountId"] == {"dictionary": ["ACME"], "codes": [0, 0]}
+    assert lines[-1]["count"] == 3
+    assert ("uat", 7) in reporting.usage_cache
+
+def test_export_filename_is_sanitized(reporting):
+    reporting.usage_client.records = [usage_record("a", 1, accountId='A"; x=\r\n/..')]
+    client = reporting.app.test_client()
+
+    response = client.get("/export", query_string={"number_days": 7, "environment": "uat", "account": 'A"; x=\r\n/..'})
+
+    assert response.status_code == 200
+    disposition = response.headers["Content-Disposition"]
+    assert disposition.startswith('attachment; filename="') and disposition.endswith('_A___x____.._usage_data.csv"')
+    assert '"A""; x=\r\n/.."' in response.data.decode("utf-8")  # The records are still filtered on the account as sent